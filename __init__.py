@@ -0,0 +1,50 @@
+"""Parsing for recipe file formats.
+
+Use open to detect the format of a file and parse its recipes, or use the
+module for a format (mmf, mxp, mx2 or fdx) directly.
+
+Submodules and the names below are imported when they are first accessed,
+so importing the package itself is fast and does not load XML parsers,
+compression libraries or compile regular expressions.
+"""
+
+import importlib
+
+# open is left out so that a star import does not shadow the builtin open;
+# use recipeformats.open.
+__all__ = ['detect_format', 'RecipeFile', 'FORMATS', 'open_source',
+           'detect_encoding', 'mmf', 'mxp', 'mx2', 'fdx', 'cache', 'charsets',
+           'convert', 'detect', 'export', 'files', 'index', 'inverted',
+           'lazy', 'parallel', 'profiling', 'records', 'serve', 'sources']
+
+_submodules = {'mmf', 'mxp', 'mx2', 'fdx', 'cache', 'charsets', 'convert',
+               'detect', 'export', 'files', 'index', 'inverted', 'lazy',
+               'parallel', 'profiling', 'records', 'serve', 'sources',
+               'benchmarks'}
+
+# Module each top-level name is imported from.
+_attributes = {
+    'open': 'detect',
+    'detect_format': 'detect',
+    'RecipeFile': 'detect',
+    'FORMATS': 'detect',
+    'open_source': 'sources',
+    'detect_encoding': 'charsets',
+}
+
+
+def __getattr__(name):
+    """Imports a submodule or a top-level name when it is first accessed."""
+    if name in _submodules:
+        value = importlib.import_module('.' + name, __name__)
+    elif name in _attributes:
+        module = importlib.import_module('.' + _attributes[name], __name__)
+        value = getattr(module, name)
+    else:
+        raise AttributeError('module %r has no attribute %r' % (__name__, name))
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | _submodules | set(_attributes))
@@ -0,0 +1,27 @@
+"""Command line entry point.
+
+Usage: python -m recipeformats COMMAND [options]
+
+Commands:
+    convert  Convert recipe files to JSON Lines (see convert).
+    serve    Run the parsing daemon (see serve).
+"""
+
+import importlib
+import sys
+
+# Module with a main function for each command.
+_commands = {'convert': 'convert', 'serve': 'serve'}
+
+
+def main(argv=None):
+    argv = sys.argv[1:] if argv is None else argv
+    if not argv or argv[0] not in _commands:
+        print(__doc__.strip(), file=sys.stderr)
+        return 2
+    module = importlib.import_module('.' + _commands[argv[0]], __package__)
+    return module.main(argv[1:])
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,9 @@
+"""Benchmarks for the recipe format parsers.
+
+Run a benchmark as a module:
+    python -m recipeformats.benchmarks.throughput  (recipes/s, MB/s, peak RSS)
+    python -m recipeformats.benchmarks.memory      (bytes per parsed recipe)
+    python -m recipeformats.benchmarks.startup     (import time, modules loaded)
+
+The corpus module generates the synthetic files they parse.
+"""
@@ -0,0 +1,279 @@
+"""Generates synthetic recipe files for benchmarks.
+
+Recipes are built from random choices of realistic words and quantities, so
+that they exercise the same code paths as real files: two column Meal-Master
+ingredients with continuation lines and headings, '\\x14' paragraph breaks,
+text between recipes, MasterCook category columns and notes, the malformed
+MasterCook 5 XML declaration and base 64 images in Living Cookbook files.
+The same seed always generates the same file.
+
+Use generate to write a file in any format.
+"""
+
+import base64
+import random
+from xml.sax.saxutils import quoteattr, escape
+
+__all__ = ['FORMATS', 'generate']
+
+FORMATS = ('mmf', 'mxp', 'mx2', 'fdx')
+
+_ADJECTIVES = ['Spicy', 'Grandma\'s', 'Easy', 'Baked', 'Creamy', 'Quick',
+               'Country', 'Lemon', 'Garlic', 'Honey', 'Smoky', 'Old-Fashioned']
+_DISHES = ['Chicken', 'Potato Casserole', 'Buttermilk Biscuits', 'Chili',
+           'Apple Pie', 'Salsa', 'Pot Roast', 'Corn Bread', 'Lentil Soup',
+           'Banana Bread', 'Meat Loaf', 'Coleslaw', 'Pound Cake']
+_CATEGORIES = ['Breads', 'Desserts', 'Main dish', 'Soups', 'Vegetables',
+               'Poultry', 'Beef', 'Salads', 'Cakes', 'Mexican', 'Appetizers']
+_INGREDIENTS = ['all-purpose flour', 'buttermilk', 'butter', 'sugar', 'salt',
+                'baking soda', 'eggs', 'onion', 'garlic cloves', 'milk',
+                'ground beef', 'chicken breasts', 'tomatoes', 'cheddar cheese',
+                'sour cream', 'black pepper', 'brown sugar', 'cinnamon',
+                'vegetable oil', 'dried chiles', 'lemon juice', 'celery']
+_PREPARATIONS = ['chopped', 'diced', 'melted', 'beaten', 'softened',
+                 'finely minced', 'cut into 1/4-inch rounds', 'to taste']
+_QUANTITIES = ['1', '2', '3', '4', '1/2', '1/4', '3/4', '1 1/2', '2 1/2', '12', '']
+_MMF_UNITS = ['c', 'ts', 'tb', 'lb', 'oz', 'cn', 'pk', 'md', 'lg', 'x', '']
+_MXP_UNITS = ['cup', 'cups', 'teaspoon', 'tablespoons', 'pound', 'ounces',
+              'can', 'package', 'medium', 'large', '']
+_HEADINGS = ['TOPPING', 'SAUCE', 'FILLING', 'CRUST', 'GARNISH']
+_SENTENCES = [
+    'Preheat the oven to 350 degrees.',
+    'Mix the dry ingredients in a large bowl.',
+    'Stir in the buttermilk and butter until just combined.',
+    'Thaw potatoes about 30 min., then mix all ingredients together.',
+    'Place in a 9 X 13 baking dish and bake for one hour.',
+    'Wash the chiles in water and discard the seeds.',
+    'Let stand at least 2 or 3 hours or overnight.',
+    'Simmer, covered, until the vegetables are tender.',
+    'Season with salt and pepper to taste.',
+    'Serve warm with sour cream.',
+    ]
+
+
+def generate(format, path, recipes, seed=0, image_size=20000, noise=True):
+    """Writes a synthetic recipe file.
+
+    Args:
+        format: One of FORMATS ('mmf', 'mxp', 'mx2' or 'fdx').
+        path: Path of the file to write.
+        recipes: Number of recipes to write.
+        seed: Seed for the random choices.
+        image_size: Number of bytes of the image in each .fdx recipe
+            (0 for no images).
+        noise: Boolean indicating whether to put text between the recipes
+            of a .mmf file, as in Usenet digests.
+    """
+    if format not in FORMATS:
+        raise ValueError('format must be one of %s' % ', '.join(FORMATS))
+    rng = random.Random(seed)
+    if format == 'mmf':
+        with open(path, 'w', encoding='cp437', newline='\r\n') as f:
+            for n in range(recipes):
+                if noise and rng.random() < 0.3:
+                    f.write(_digest_noise(rng))
+                f.write(_mmf_recipe(rng))
+    elif format == 'mxp':
+        with open(path, 'w', encoding='cp1252', newline='\r\n') as f:
+            for n in range(recipes):
+                f.write(_mxp_recipe(rng))
+    elif format == 'mx2':
+        with open(path, 'w', encoding='iso-8859-1', newline='\r\n') as f:
+            f.write('<?xml version="1.0" standalone="yes" encoding="ISO-8859-1"?>\n')
+            f.write('<!DOCTYPE mx2 SYSTEM "mx2.dtd">\n')
+            f.write('<mx2 source="MasterCook" date="September 19, 2014">\n')
+            for n in range(recipes):
+                f.write(_mx2_recipe(rng))
+            f.write('</mx2>\n')
+    else:
+        with open(path, 'w', encoding='utf-8', newline='\r\n') as f:
+            f.write('<?xml version="1.0" encoding="UTF-8"?>\n')
+            f.write('<fdx Source="Living Cookbook" FileVersion="1.0" date="2014-09-19">\n')
+            f.write('<Recipes>\n')
+            for n in range(recipes):
+                f.write(_fdx_recipe(rng, n + 1, image_size))
+            f.write('</Recipes>\n</fdx>\n')
+
+
+def _title(rng):
+    return rng.choice(_ADJECTIVES) + ' ' + rng.choice(_DISHES)
+
+
+def _categories(rng):
+    return rng.sample(_CATEGORIES, rng.randint(1, 4))
+
+
+def _ingredient(rng):
+    """Returns a tuple of quantity, ingredient and preparation strings."""
+    preparation = rng.choice(_PREPARATIONS) if rng.random() < 0.4 else ''
+    return rng.choice(_QUANTITIES), rng.choice(_INGREDIENTS), preparation
+
+
+def _paragraphs(rng):
+    return [' '.join(rng.choice(_SENTENCES) for i in range(rng.randint(1, 5)))
+            for j in range(rng.randint(1, 4))]
+
+
+def _wrap(text, width):
+    """Wraps text into lines of at most width characters."""
+    lines = []
+    line = ''
+    for word in text.split():
+        if line and len(line) + 1 + len(word) > width:
+            lines.append(line)
+            line = word
+        else:
+            line = (line + ' ' + word).strip()
+    if line:
+        lines.append(line)
+    return lines
+
+
+def _digest_noise(rng):
+    return ('From: someone@example.com\nSubject: Recipes (%d of %d)\n\n'
+            '%s\n\n' % (rng.randint(1, 9), rng.randint(10, 20), rng.choice(_SENTENCES)))
+
+
+def _mmf_ingredient_lines(rng):
+    """Returns lines for a Meal-Master ingredient and its continuations."""
+    quantity, text, preparation = _ingredient(rng)
+    unit = rng.choice(_MMF_UNITS) if quantity else ''
+    if preparation:
+        text += '; ' + preparation
+    words = _wrap(text, 28)
+    lines = ['%7s %-2s %s' % (quantity, unit, words[0])]
+    lines.extend('           - ' + line for line in words[1:])
+    return lines
+
+
+def _mmf_recipe(rng):
+    mmmmm = rng.random() < 0.5
+    lines = [
+        ('MMMMM----- ' if mmmmm else '---------- ') + 'Recipe via Meal-Master (tm) v8.05',
+        ' ',
+        '      Title: ' + _title(rng),
+        ' Categories: ' + ', '.join(_categories(rng)),
+        '      Yield: ' + (rng.choice(['4 servings', '8 Servings', '24 muffins', '1 loaf'])),
+        ' ',
+        ]
+    for group in range(rng.randint(1, 3)):
+        if group:
+            heading = rng.choice(_HEADINGS)
+            dashes = 66 - len(heading)
+            lines.append(('MMMMM' if mmmmm else '') + '-' * (dashes // 2) +
+                         heading + '-' * (dashes - dashes // 2))
+        column1 = []
+        column2 = []
+        two_column = rng.random() < 0.4
+        for i in range(rng.randint(2, 8)):
+            column = column2 if two_column and i % 2 else column1
+            column.extend(_mmf_ingredient_lines(rng))
+        for i in range(len(column1)):
+            if i < len(column2):
+                lines.append('%-41s%s' % (column1[i], column2[i]))
+            else:
+                lines.append(column1[i])
+    lines.append('')
+    paragraph_marks = rng.random() < 0.3
+    for paragraph in _paragraphs(rng):
+        wrapped = ['  ' + line for line in _wrap(paragraph, 70)]
+        if paragraph_marks:
+            wrapped[-1] += '\x14'
+        else:
+            wrapped.append('')
+        lines.extend(wrapped)
+    lines.append('MMMMM' if mmmmm else '-----')
+    lines.append('')
+    return '\n'.join(lines) + '\n'
+
+
+def _mxp_recipe(rng):
+    categories = _categories(rng)
+    lines = [
+        '                     * Exported from MasterCook *',
+        '',
+        '                               ' + _title(rng),
+        '',
+        'Recipe By     :' + rng.choice(['Sam', 'Martha', '', 'Betty Crocker']),
+        'Serving Size  : %-4d  Preparation Time :%d:%02d' % (
+            rng.randint(1, 12), rng.randint(0, 2), rng.randint(0, 59)),
+        ]
+    for i in range(0, len(categories), 2):
+        prefix = 'Categories    : ' if i == 0 else ' ' * 16
+        lines.append(prefix + '%-32s%s' % tuple((categories[i:i + 2] + [''])[:2]))
+    lines.extend([
+        '',
+        '  Amount  Measure       Ingredient -- Preparation Method',
+        '--------  ------------  --------------------------------',
+        ])
+    for i in range(rng.randint(3, 14)):
+        quantity, text, preparation = _ingredient(rng)
+        unit = rng.choice(_MXP_UNITS) if quantity else ''
+        if preparation:
+            text += ' -- ' + preparation
+        lines.append('  %6s  %-12s  %s' % (quantity, unit, text))
+    lines.append('')
+    for paragraph in _paragraphs(rng):
+        lines.append(paragraph)
+        lines.append('')
+    lines.extend([
+        '                   - - - - - - - - - - - - - - - - - - ',
+        '',
+        'NOTES : ' + rng.choice(_SENTENCES),
+        '',
+        ])
+    return '\n'.join(lines) + '\n'
+
+
+def _mx2_recipe(rng):
+    parts = ['<RcpE name=%s author=%s>' % (quoteattr(_title(rng)), quoteattr('Sam'))]
+    parts.append('<Serv qty="%d"/><PrpT elapsed="0:%02d"/>' % (rng.randint(1, 12), rng.randint(5, 59)))
+    parts.append('<CatS>%s</CatS>' % ''.join(
+        '<CatT>%s</CatT>' % escape(c) for c in _categories(rng)))
+    for i in range(rng.randint(3, 14)):
+        quantity, text, preparation = _ingredient(rng)
+        unit = rng.choice(_MXP_UNITS) if quantity else ''
+        parts.append('<IngR name=%s unit=%s qty=%s>%s</IngR>' % (
+            quoteattr(text), quoteattr(unit), quoteattr(quantity),
+            '<IPrp>%s</IPrp>' % escape(preparation) if preparation else ''))
+    parts.append('<DirS>%s</DirS>' % ''.join(
+        '<DirT>%s</DirT>' % escape(p) for p in _paragraphs(rng)))
+    parts.append('<RatS><RatE name="Taste" value="%d"/></RatS>' % rng.randint(0, 10))
+    parts.append('<Yield unit="servings" qty="%d"/>' % rng.randint(1, 12))
+    parts.append('</RcpE>')
+    return '\n'.join(parts) + '\n'
+
+
+def _fdx_image(rng, size, tag, attributes=''):
+    data = base64.encodebytes(rng.randbytes(size)).decode('ascii')
+    return '<%s FileType="JPG"%s>\n%s</%s>' % (tag, attributes, data, tag)
+
+
+def _fdx_recipe(rng, id, image_size):
+    parts = ['<Recipe Name=%s ID="%d" CookbookID="1" Servings="%d" Author="Sam" '
+             'RecipeTypes=%s CreateDate="2014-09-19">' % (
+                 quoteattr(_title(rng)), id, rng.randint(1, 12),
+                 quoteattr(', '.join(_categories(rng))))]
+    if image_size:
+        parts.append(_fdx_image(rng, image_size, 'RecipeImage'))
+    parts.append('<RecipeIngredients>')
+    for i in range(rng.randint(3, 14)):
+        quantity, text, preparation = _ingredient(rng)
+        unit = rng.choice(_MXP_UNITS) if quantity else ''
+        if preparation:
+            text += ', ' + preparation
+        parts.append('<RecipeIngredient Quantity=%s Unit=%s Ingredient=%s/>' % (
+            quoteattr(quantity), quoteattr(unit), quoteattr(text)))
+    parts.append('</RecipeIngredients>')
+    parts.append('<RecipeProcedures>')
+    for paragraph in _paragraphs(rng):
+        parts.append('<RecipeProcedure><ProcedureText>%s</ProcedureText></RecipeProcedure>'
+                     % escape(paragraph))
+    parts.append('</RecipeProcedures>')
+    if image_size and rng.random() < 0.3:
+        parts.append('<RecipeImages>%s</RecipeImages>' % _fdx_image(
+            rng, image_size // 2, 'RecipeImages', ' Description="Plated"'))
+    parts.append('<RecipeNutrition Calories="%d" TotalFat="%d"/>' % (
+        rng.randint(50, 900), rng.randint(0, 60)))
+    parts.append('</Recipe>')
+    return '\n'.join(parts) + '\n'
@@ -0,0 +1,101 @@
+"""Measures the memory held by parsed recipes, in bytes per recipe.
+
+Each format is parsed from a synthetic file (see corpus) and every recipe
+is kept in a list. The memory still allocated once parsing has finished (as
+traced by tracemalloc) is divided by the number of recipes.
+
+To show what __slots__ saves, each format is measured twice: once with the
+record classes as they are, and once with copies of them that have no
+__slots__ (so every object has a __dict__, as before the classes had slots).
+
+Usage: python -m recipeformats.benchmarks.memory [number of recipes]
+"""
+
+import json
+import os
+import sys
+import tempfile
+import tracemalloc
+from unittest import mock
+
+from recipeformats import fdx, mmf, mx2, mxp
+from recipeformats.benchmarks import corpus
+
+
+def parse_mmf(path):
+    with open(path, encoding='cp437') as f:
+        return list(mmf.parse_recipes(f))
+
+
+def parse_mxp(path):
+    with open(path, encoding='cp1252') as f:
+        return list(mxp.parse_recipes(f))
+
+
+def parse_mx2(path):
+    return mx2.parse_file(path)[1]
+
+
+def parse_fdx(path):
+    return fdx.parse_file(path, images='skip')
+
+
+PARSERS = {'mmf': parse_mmf, 'mxp': parse_mxp, 'mx2': parse_mx2, 'fdx': parse_fdx}
+
+# Record classes made by the parser of each format. The parsers look these up
+# as module globals, so they can be replaced by copies without __slots__.
+RECORDS = {
+    'mmf': (mmf, ('Recipe', 'Ingredient')),
+    'mxp': (mxp, ('Recipe', 'Ingredient')),
+    'mx2': (mx2, ('Info', 'Recipe', 'Rating', 'Ingredient')),
+    'fdx': (fdx, ('Recipe', 'RecipeIngredient', 'RecipeProcedure',
+                  'RecipeAuthorNote', 'RecipeTip', 'RecipeReview',
+                  'RecipeMeasure', 'RecipeImage')),
+    }
+
+
+def unslotted(cls):
+    """Returns a copy of a record class without __slots__, whose objects
+    keep their attributes in a __dict__ instead."""
+    slots = cls.__dict__.get('__slots__', ())
+    namespace = {name: value for name, value in cls.__dict__.items()
+                 if name not in slots and name != '__slots__'}
+    return type(cls.__name__, (object,), namespace)
+
+
+def without_slots(format):
+    """Returns a context manager that replaces the record classes of the
+    parser for a format by copies without __slots__."""
+    module, names = RECORDS[format]
+    classes = {name: unslotted(getattr(module, name)) for name in names}
+    return mock.patch.multiple(module, **classes)
+
+
+def measure(parse, path):
+    """Returns the number of bytes per recipe held after parsing a file."""
+    tracemalloc.start()
+    recipes = parse(path)
+    current, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return current / len(recipes)
+
+
+def main(count=10000):
+    results = {}
+    with tempfile.TemporaryDirectory() as directory:
+        for format, parse in PARSERS.items():
+            path = os.path.join(directory, 'corpus.' + format)
+            corpus.generate(format, path, count)
+            slots = measure(parse, path)
+            with without_slots(format):
+                dicts = measure(parse, path)
+            results[format] = {
+                'dict': round(dicts),
+                'slots': round(slots),
+                'saved': '%.0f%%' % (100 * (dicts - slots) / dicts),
+                }
+    print(json.dumps({'recipes': count, 'bytes_per_recipe': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,70 @@
+"""Measures how long it takes to import the package and each parser.
+
+Each import is timed in a fresh interpreter (started without the site
+module), since modules are only imported once per process. The heavy standard library modules that
+each import loads (e.g. xml.etree.ElementTree) are listed, so that a
+change that loads one too early is easy to spot.
+
+Usage: python -m recipeformats.benchmarks.startup [repeat]
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+import recipeformats
+
+# What to import (or access) in each run.
+TARGETS = {
+    'recipeformats': 'import recipeformats',
+    'recipeformats.open': 'import recipeformats; recipeformats.open',
+    'recipeformats.mmf': 'import recipeformats.mmf',
+    'recipeformats.mxp': 'import recipeformats.mxp',
+    'recipeformats.mx2': 'import recipeformats.mx2',
+    'recipeformats.fdx': 'import recipeformats.fdx',
+}
+
+# Modules that are slow to import or are not needed by every parser.
+HEAVY_MODULES = ('xml.etree.ElementTree', 'pyexpat', 'concurrent.futures',
+                 'gzip', 'bz2', 'lzma', 'zipfile', 'hashlib', 're')
+
+_script = '''
+import sys, time
+start = time.perf_counter()
+%s
+seconds = time.perf_counter() - start
+print(seconds, ' '.join(m for m in %r if m in sys.modules))
+'''
+
+
+def measure(statement, repeat=5):
+    """Returns a tuple of the fastest time in seconds to run an import
+    statement in a fresh interpreter, and a list of heavy modules that were
+    loaded by the end of it."""
+    # The package must be importable from the parent of its directory.
+    parent = os.path.dirname(os.path.dirname(os.path.abspath(recipeformats.__file__)))
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [parent, env.get('PYTHONPATH')]))
+    best = None
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, '-S', '-c', _script % (statement, HEAVY_MODULES)],
+            env=env, check=True, stdout=subprocess.PIPE, universal_newlines=True).stdout
+        seconds, _, modules = output.strip().partition(' ')
+        seconds = float(seconds)
+        if best is None or seconds < best:
+            best = seconds
+    return best, modules.split()
+
+
+def main(repeat=5):
+    results = {}
+    for name, statement in TARGETS.items():
+        seconds, modules = measure(statement, repeat)
+        results[name] = {'ms': round(seconds * 1000, 3), 'heavy_modules': modules}
+    print(json.dumps({'repeat': repeat, 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main(*[int(arg) for arg in sys.argv[1:]])
@@ -0,0 +1,233 @@
+"""Measures the throughput and peak memory of each parser entry point.
+
+A synthetic file is generated for each format (see corpus), and each entry
+point parses it in a fresh process so that its peak resident set size is
+not affected by the others. Results are written as JSON so that they can be
+compared between releases.
+
+Usage: python -m recipeformats.benchmarks.throughput [options]
+"""
+
+import argparse
+import json
+import mmap
+import multiprocessing
+import os
+import platform
+import sys
+import tempfile
+import time
+
+try:
+    import resource
+except ImportError:  # Not available on Windows.
+    resource = None
+
+from recipeformats.benchmarks import corpus
+
+# Encoding that corpus writes each text format in.
+_ENCODINGS = {'mmf': 'cp437', 'mxp': 'cp1252'}
+
+
+def _mmf_parse_recipes(path):
+    from recipeformats import mmf
+    with open(path, encoding=_ENCODINGS['mmf']) as f:
+        return sum(1 for recipe in mmf.parse_recipes(f))
+
+
+def _mmf_split_recipe_buffer(path):
+    from recipeformats import mmf
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        recipes = map(mmf.parse_recipe, mmf.split_recipe_buffer(buffer, _ENCODINGS['mmf']))
+        return sum(1 for recipe in recipes)
+
+
+def _mmf_parse_recipes_parallel(path):
+    from recipeformats import mmf
+    return sum(1 for recipe in mmf.parse_recipes_parallel(path, encoding=_ENCODINGS['mmf']))
+
+
+def _mxp_parse_recipes(path):
+    from recipeformats import mxp
+    with open(path, encoding=_ENCODINGS['mxp']) as f:
+        return sum(1 for recipe in mxp.parse_recipes(f))
+
+
+def _mxp_split_recipe_buffer(path):
+    from recipeformats import mxp
+    with open(path, 'rb') as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        recipes = map(mxp.parse_recipe, mxp.split_recipe_buffer(buffer, _ENCODINGS['mxp']))
+        return sum(1 for recipe in recipes)
+
+
+def _mxp_parse_recipes_parallel(path):
+    from recipeformats import mxp
+    return sum(1 for recipe in mxp.parse_recipes_parallel(path, encoding=_ENCODINGS['mxp']))
+
+
+def _mx2_parse_file(path):
+    from recipeformats import mx2
+    return len(mx2.parse_file(path)[1])
+
+
+def _mx2_iter_recipes(path):
+    from recipeformats import mx2
+    info, recipes = mx2.iter_recipes(path)
+    return sum(1 for recipe in recipes)
+
+
+def _fdx_parse_file(path):
+    from recipeformats import fdx
+    return len(fdx.parse_file(path))
+
+
+def _fdx_iter_recipes(path):
+    from recipeformats import fdx
+    return sum(1 for recipe in fdx.iter_recipes(path))
+
+
+def _fdx_iter_recipes_skip_images(path):
+    from recipeformats import fdx
+    return sum(1 for recipe in fdx.iter_recipes(path, images='skip'))
+
+
+# Entry point names, mapped to the format they parse and the function that
+# parses a file and returns the number of recipes.
+ENTRY_POINTS = {
+    'mmf.parse_recipes': ('mmf', _mmf_parse_recipes),
+    'mmf.split_recipe_buffer': ('mmf', _mmf_split_recipe_buffer),
+    'mmf.parse_recipes_parallel': ('mmf', _mmf_parse_recipes_parallel),
+    'mxp.parse_recipes': ('mxp', _mxp_parse_recipes),
+    'mxp.split_recipe_buffer': ('mxp', _mxp_split_recipe_buffer),
+    'mxp.parse_recipes_parallel': ('mxp', _mxp_parse_recipes_parallel),
+    'mx2.parse_file': ('mx2', _mx2_parse_file),
+    'mx2.iter_recipes': ('mx2', _mx2_iter_recipes),
+    'fdx.parse_file': ('fdx', _fdx_parse_file),
+    'fdx.iter_recipes': ('fdx', _fdx_iter_recipes),
+    'fdx.iter_recipes(images=skip)': ('fdx', _fdx_iter_recipes_skip_images),
+}
+
+
+def _peak_rss_bytes():
+    """Returns the peak resident set size of this process and its finished
+    child processes in bytes, or None if not available."""
+    if resource is None:
+        return None
+    peak = max(resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+               resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss)
+    # Linux reports kilobytes, macOS reports bytes.
+    return peak if sys.platform == 'darwin' else peak * 1024
+
+
+def _measure(name, path, connection):
+    """Parses a file with an entry point and sends the number of recipes, the
+    elapsed seconds, and the peak resident set size through a connection."""
+    parse = ENTRY_POINTS[name][1]
+    start = time.perf_counter()
+    count = parse(path)
+    seconds = time.perf_counter() - start
+    connection.send((count, seconds, _peak_rss_bytes()))
+    connection.close()
+
+
+def _measure_in_process(context, name, path):
+    """Runs _measure in a fresh process and returns what it sent."""
+    receiver, sender = context.Pipe(duplex=False)
+    # Not a Pool worker, since those are daemons and so cannot start the
+    # worker processes of the parallel entry points.
+    process = context.Process(target=_measure, args=(name, path, sender))
+    process.start()
+    sender.close()
+    try:
+        return receiver.recv()
+    except EOFError:
+        raise RuntimeError('%s failed with exit code %s' % (name, process.exitcode))
+    finally:
+        process.join()
+
+
+def run(names, paths, repeat=1):
+    """Runs each entry point in a fresh process and returns a list of result
+    dictionaries (the best of repeat runs for each)."""
+    context = multiprocessing.get_context('spawn')
+    results = []
+    for name in names:
+        format = ENTRY_POINTS[name][0]
+        path = paths[format]
+        runs = []
+        for i in range(repeat):
+            runs.append(_measure_in_process(context, name, path))
+        count, seconds, peak_rss = min(runs, key=lambda r: r[1])
+        megabytes = os.path.getsize(path) / (1024 * 1024)
+        results.append({
+            'entry_point': name,
+            'format': format,
+            'recipes': count,
+            'file_mb': round(megabytes, 3),
+            'seconds': round(seconds, 4),
+            'recipes_per_second': round(count / seconds, 1),
+            'mb_per_second': round(megabytes / seconds, 3),
+            'peak_rss_mb': round(peak_rss / (1024 * 1024), 1) if peak_rss else None,
+        })
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m recipeformats.benchmarks.throughput',
+        description='Measures recipes/s, MB/s and peak RSS for each parser entry point.')
+    parser.add_argument('--recipes', type=int, default=20000,
+                        help='number of recipes in each generated file (default 20000)')
+    parser.add_argument('--image-size', type=int, default=20000,
+                        help='bytes of image data in each .fdx recipe (default 20000)')
+    parser.add_argument('--seed', type=int, default=0, help='seed for the generated files')
+    parser.add_argument('--repeat', type=int, default=1,
+                        help='runs of each entry point; the fastest is reported')
+    parser.add_argument('--corpus-dir',
+                        help='directory to keep generated files in (reused if present)')
+    parser.add_argument('--output', help='file to write JSON results to (default stdout)')
+    parser.add_argument('entry_points', nargs='*', metavar='ENTRY_POINT',
+                        help='entry points to run (default all): %s' % ', '.join(ENTRY_POINTS))
+    args = parser.parse_args(argv)
+
+    names = args.entry_points or list(ENTRY_POINTS)
+    for name in names:
+        if name not in ENTRY_POINTS:
+            parser.error('unknown entry point: %s' % name)
+
+    with tempfile.TemporaryDirectory() as temp:
+        directory = args.corpus_dir or temp
+        os.makedirs(directory, exist_ok=True)
+        paths = {}
+        for format in sorted({ENTRY_POINTS[name][0] for name in names}):
+            paths[format] = os.path.join(directory, 'corpus-%d-%d-%d.%s' % (
+                args.recipes, args.seed, args.image_size, format))
+            if not os.path.exists(paths[format]):
+                corpus.generate(format, paths[format], args.recipes, args.seed,
+                                args.image_size)
+        results = run(names, paths, args.repeat)
+
+    report = {
+        'python': platform.python_version(),
+        'implementation': platform.python_implementation(),
+        'platform': platform.platform(),
+        'cpu_count': os.cpu_count(),
+        'recipes': args.recipes,
+        'image_size': args.image_size,
+        'seed': args.seed,
+        'results': results,
+    }
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    for result in results:
+        print('%-32s %10.0f recipes/s %8.2f MB/s %8s MB peak RSS' % (
+            result['entry_point'], result['recipes_per_second'],
+            result['mb_per_second'], result['peak_rss_mb']), file=sys.stderr)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,336 @@
+"""A cache of parsed recipe files in a local SQLite database.
+
+Files are looked up by a hash of their bytes, so a file that arrives again
+under another name is not parsed again. The key also covers the options
+passed to detect.open and a version of the parsers (a hash of the source
+of the modules that parsing depends on), so entries made by other versions
+of the parsers are never returned. A file is read into memory once, and the
+bytes that are hashed are the bytes that are parsed, so a file that changes
+while it is read is never stored under the key of other bytes.
+
+Each recipe is stored as nested tuples of its attribute values, serialized
+with marshal, and the recipes of a file are stored together (compressed
+with zlib unless that saves little, e.g. for base 64 images). A hit only
+loads the serialized recipes; each Recipe object is built when it is first
+accessed, so a hit is much faster than parsing. Only use a cache database
+that no one else can write to, since marshal is not secure against
+maliciously constructed data. When the stored data grows past max_bytes,
+the least recently used entries are deleted.
+
+Example:
+    cache = ParseCache('recipes.cache')
+    parsed = cache.parse('upload.mx2')
+    for recipe in parsed.recipes:
+        pass
+"""
+
+import collections.abc
+import hashlib
+import importlib
+import io
+import marshal
+import os
+import sqlite3
+import time
+import zlib
+
+from . import detect
+
+__all__ = ['ParseCache', 'ParsedFile', 'parser_version']
+
+# Modules whose source is hashed into parser_version.
+_parser_modules = ('mmf', 'mxp', 'mx2', 'fdx', 'detect', 'charsets',
+                   'sources', 'index', 'lazy', 'cache')
+
+_version = None
+
+# The data of each entry is kept apart from the time it was last used, since
+# SQLite rewrites a whole row (with all of its data) to update any column.
+_schema = '''
+CREATE TABLE IF NOT EXISTS entries (
+    key BLOB PRIMARY KEY,
+    size INTEGER NOT NULL,
+    used REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS entries_used ON entries (used);
+CREATE TABLE IF NOT EXISTS entry_data (
+    key BLOB PRIMARY KEY,
+    data BLOB NOT NULL
+);
+'''
+
+
+def parser_version():
+    """Returns a hex string that changes whenever the parsers change."""
+    global _version
+    if _version is None:
+        digest = hashlib.sha1()
+        directory = os.path.dirname(os.path.abspath(__file__))
+        for name in _parser_modules:
+            with open(os.path.join(directory, name + '.py'), 'rb') as f:
+                digest.update(f.read())
+        _version = digest.hexdigest()
+    return _version
+
+
+class ParsedFile:
+    """Represents the parsed recipes of a file.
+
+    Attributes:
+        format: Format of the file (one of detect.FORMATS).
+        encoding: Text encoding of a .mmf or .mxp file, or None.
+        info: An mx2.Info object for a .mx2 file, or None.
+        recipes: Sequence of Recipe objects of the module for the format.
+            On a hit, each Recipe is built when it is first accessed.
+        hit: Boolean indicating whether the recipes came from the cache.
+    """
+
+    __slots__ = ('format', 'encoding', 'info', 'recipes', 'hit')
+
+    def __init__(self, format, encoding, info, recipes, hit=False):
+        """Initializes ParsedFile with the specified values."""
+        self.format = format
+        self.encoding = encoding
+        self.info = info
+        self.recipes = recipes
+        self.hit = hit
+
+
+class ParseCache:
+    """Parses recipe files, reusing the results for files parsed before.
+
+    Attributes:
+        path: File name of the SQLite database.
+        max_bytes: Maximum number of bytes of stored data before the least
+            recently used entries are deleted.
+    """
+
+    def __init__(self, path, max_bytes=256 * 1024 * 1024):
+        """Initializes ParseCache, creating the database if needed."""
+        self.path = path
+        self.max_bytes = max_bytes
+        self._db = sqlite3.connect(path, timeout=30, isolation_level=None)
+        self._db.execute('PRAGMA journal_mode=WAL')
+        self._db.executescript(_schema)
+
+    def close(self):
+        """Closes the database."""
+        self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def parse(self, filename, format=None, encoding=None, member=None):
+        """Parses a file of any supported format, or returns its recipes
+        from the cache.
+
+        Args:
+            filename: File name of the file (see detect.open).
+            format: See detect.open.
+            encoding: See detect.open.
+            member: See detect.open.
+
+        Returns:
+            A ParsedFile for the file.
+        """
+        with open(filename, 'rb') as f:
+            data = f.read()
+        key = self.key(data, format, encoding, member)
+        row = self._db.execute('SELECT data FROM entry_data WHERE key = ?', (key,)).fetchone()
+        if row is not None:
+            self._db.execute('UPDATE entries SET used = ? WHERE key = ?', (time.time(), key))
+            parsed = _loads(row[0])
+            parsed.hit = True
+            return parsed
+        with detect.open(io.BytesIO(data), format, encoding, member) as recipes:
+            parsed = ParsedFile(recipes.format, recipes.encoding, recipes.info, list(recipes))
+        self._put(key, _dumps(parsed))
+        return parsed
+
+    def key(self, data, format=None, encoding=None, member=None):
+        """Returns the cache key bytes for the bytes of a file and the
+        options to parse it with."""
+        # SHA-256 is hashed in hardware on most CPUs, so it is the fastest
+        # digest in hashlib for large files.
+        digest = hashlib.sha256(data)
+        options = '\0'.join([parser_version(), format or '', encoding or '', member or ''])
+        digest.update(b'\0' + options.encode('utf-8'))
+        return digest.digest()
+
+    def size(self):
+        """Returns the number of bytes of stored data."""
+        return self._db.execute('SELECT COALESCE(SUM(size), 0) FROM entries').fetchone()[0]
+
+    def clear(self):
+        """Deletes every entry."""
+        self._db.executescript('BEGIN IMMEDIATE; DELETE FROM entries; '
+                               'DELETE FROM entry_data; COMMIT;')
+
+    def _put(self, key, data):
+        """Stores data for a key and evicts the least recently used entries
+        if the cache has grown too big."""
+        if len(data) > self.max_bytes:
+            return
+        db = self._db
+        db.execute('BEGIN IMMEDIATE')
+        try:
+            db.execute('INSERT OR REPLACE INTO entries VALUES (?, ?, ?)',
+                       (key, len(data), time.time()))
+            db.execute('INSERT OR REPLACE INTO entry_data VALUES (?, ?)', (key, data))
+            excess = self.size() - self.max_bytes
+            if excess > 0:
+                total = 0
+                for oldest, size in db.execute(
+                        'SELECT key, size FROM entries WHERE key != ? ORDER BY used',
+                        (key,)).fetchall():
+                    db.execute('DELETE FROM entries WHERE key = ?', (oldest,))
+                    db.execute('DELETE FROM entry_data WHERE key = ?', (oldest,))
+                    total += size
+                    if total >= excess:
+                        break
+            db.execute('COMMIT')
+        except BaseException:
+            db.execute('ROLLBACK')
+            raise
+
+
+# First byte of stored data, telling whether the rest is compressed.
+_RAW = b'm'
+_COMPRESSED = b'z'
+
+
+def _dumps(parsed):
+    """Returns the stored form of a ParsedFile.
+
+    The stored form is the marshaled tuple (format, encoding, info, classes,
+    recipes), where recipes is a list of the marshaled form of each recipe
+    (see _Encoder), and classes lists the module and class name of each
+    record class used.
+    """
+    encoder = _Encoder()
+    info = encoder.encode(parsed.info)
+    recipes = [marshal.dumps(encoder.encode(r)) for r in parsed.recipes]
+    data = marshal.dumps((parsed.format, parsed.encoding, info,
+                          encoder.classes, recipes))
+    compressed = zlib.compress(data, 1)
+    if len(compressed) < len(data) // 2:
+        return _COMPRESSED + compressed
+    return _RAW + data
+
+
+def _loads(data):
+    """Returns a ParsedFile from its stored form."""
+    data = memoryview(data)
+    if data[:1] == _COMPRESSED:
+        data = zlib.decompress(data[1:])
+    else:
+        data = data[1:]
+    format, encoding, info, classes, recipes = marshal.loads(data)
+    decoder = _Decoder(classes)
+    return ParsedFile(format, encoding, decoder.decode(info),
+                      _RecipeSequence(decoder, recipes))
+
+
+class _Encoder:
+    """Converts record objects to values that marshal can store.
+
+    A record becomes a tuple of the number of its class (its position in
+    classes) followed by its attribute values, in the order of the
+    __slots__ of the class and its bases. Lists are converted item by item,
+    and other values (strings, numbers, None and dictionaries of them) are
+    kept as they are.
+    """
+
+    def __init__(self):
+        self.classes = []
+        self.numbers = {}
+
+    def encode(self, value):
+        if isinstance(value, list):
+            return [self.encode(v) for v in value]
+        cls = type(value)
+        if not hasattr(cls, '__slots__'):
+            return value
+        number = self.numbers.get(cls)
+        if number is None:
+            number = self.numbers[cls] = len(self.classes)
+            self.classes.append((cls.__module__.rpartition('.')[2], cls.__name__))
+        return (number,) + tuple(self.encode(getattr(value, name))
+                                 for name in _slots(cls))
+
+
+class _Decoder:
+    """Converts values from _Encoder back to record objects."""
+
+    def __init__(self, classes):
+        self.classes = []
+        for module, name in classes:
+            cls = getattr(importlib.import_module('.' + module, __package__), name)
+            self.classes.append((cls, _slots(cls)))
+
+    def decode(self, value):
+        if type(value) is tuple:
+            return self.decode_record(value)
+        if type(value) is list:
+            return [self.decode(v) for v in value]
+        return value
+
+    def decode_record(self, value):
+        cls, slots = self.classes[value[0]]
+        record = cls.__new__(cls)
+        decode = self.decode
+        # Most values are strings, so only call decode for the others.
+        for name, v in zip(slots, value[1:]):
+            if type(v) is tuple or type(v) is list:
+                v = decode(v)
+            setattr(record, name, v)
+        return record
+
+
+_slot_cache = {}
+
+
+def _slots(cls):
+    """Returns a tuple of the slot names of a class and its bases."""
+    try:
+        return _slot_cache[cls]
+    except KeyError:
+        pass
+    slots = []
+    for c in reversed(cls.__mro__):
+        names = c.__dict__.get('__slots__', ())
+        slots.extend((names,) if isinstance(names, str) else names)
+    _slot_cache[cls] = slots = tuple(slots)
+    return slots
+
+
+class _RecipeSequence(collections.abc.Sequence):
+    """A sequence of the recipes of a cache entry, each of which is built
+    from its marshaled form when it is first accessed."""
+
+    __slots__ = ('_decoder', '_data', '_recipes')
+
+    def __init__(self, decoder, data):
+        self._decoder = decoder
+        self._data = data
+        self._recipes = [None] * len(data)
+
+    def __len__(self):
+        return len(self._data)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self._data)))]
+        recipe = self._recipes[index]
+        if recipe is None:
+            recipe = self._recipes[index] = self._decoder.decode_record(
+                marshal.loads(self._data[index]))
+            self._data[index] = None
+        return recipe
+
+    def __iter__(self):
+        for i in range(len(self._data)):
+            yield self[i]
@@ -0,0 +1,156 @@
+"""Detection of the text encoding of legacy recipe files.
+
+Meal-Master ran on DOS and usually wrote cp437 text, MasterCook 1-4 ran on
+Windows and usually wrote cp1252 text, and files that have been passed
+around since are often converted to UTF-8. detect_encoding looks only at a
+bounded prefix of the raw bytes (SAMPLE_SIZE bytes) and picks an encoding
+from, in order:
+
+* A byte order mark.
+* Whether the prefix is valid UTF-8 with at least one non-ASCII character.
+* Bytes that cp1252 does not define, which rule it out.
+* Bytes that are much more common in one of cp437 and cp1252 than the
+  other, such as cp437 accented letters, box drawing characters and the
+  '\\x14' paragraph marks of Meal-Master, or cp1252 apostrophes and
+  accented letters. cp1252 smart quotes, dashes and ellipses share bytes
+  with cp437 accented letters, so they only count where they are used as
+  punctuation (e.g. a pair of quotes around words).
+
+If there is no evidence either way (e.g. the prefix is plain ASCII), the
+default encoding for the format is returned.
+
+Use mmf.parse_buffer or mxp.parse_buffer to detect the encoding of a buffer
+and parse it.
+"""
+
+import codecs
+from collections import Counter
+import re
+
+__all__ = ['detect_encoding', 'SAMPLE_SIZE', 'BOMS']
+
+# Number of bytes at the start of a buffer that are looked at.
+SAMPLE_SIZE = 64 * 1024
+
+# Byte order marks and the encodings they start, longest first.
+BOMS = (
+    (codecs.BOM_UTF8, 'utf-8-sig'),
+    (codecs.BOM_UTF32_LE, 'utf-32'),
+    (codecs.BOM_UTF32_BE, 'utf-32'),
+    (codecs.BOM_UTF16_LE, 'utf-16'),
+    (codecs.BOM_UTF16_BE, 'utf-16'),
+)
+
+
+def _weights():
+    """Returns a table of a tuple of the cp437 and cp1252 weights of each
+    byte. A weight is how strongly the byte suggests the encoding."""
+    weights = [(0, 0)] * 256
+    # cp437 accented letters. Some of them are also cp1252 smart quotes,
+    # dashes and an ellipsis, which only count for cp1252 where they are
+    # used as such (see _punctuation).
+    for b in range(0x80, 0xa6):
+        weights[b] = (1, 0)
+    # cp1252 apostrophes (cp437 'æ' and 'Æ', which are rare).
+    weights[0x91] = (0, 2)
+    weights[0x92] = (0, 3)
+    # cp437 box drawing and block characters, which come in runs.
+    for b in range(0xb0, 0xe0):
+        weights[b] = (1, 0)
+    # cp1252 lowercase accented letters (cp437 Greek letters and symbols).
+    for b in range(0xe0, 0x100):
+        weights[b] = (0, 1)
+    # cp437 fractions and degree sign, common in recipes.
+    for b in (0xab, 0xac, 0xf8):
+        weights[b] = (2, 0)
+    # cp1252 degree sign and fractions (cp437 box drawing characters).
+    for b in (0xb0, 0xbc, 0xbd, 0xbe):
+        weights[b] = (0, 2)
+    return weights
+
+
+_WEIGHTS = _weights()
+
+# Bytes that cp1252 does not define.
+_UNDEFINED_CP1252 = re.compile(rb'[\x81\x8d\x8f\x90\x9d]')
+
+# cp1252 punctuation that is also cp437 accented letters, in the context it
+# is used in: a pair of double quotes ('“…”', cp437 'ô…ö') around words, a
+# dash ('–' or '—', cp437 'û' or 'ù') between spaces or digits, and an
+# ellipsis ('…', cp437 'à') at the end of a line. The
+# bytes of each match count twice for cp1252 instead of once for cp437.
+# Each pattern is paired with the number of bytes in a match.
+_punctuation = (
+    (re.compile(rb'(?:^|(?<=[\s(]))\x93[^\s\x93\x94][^\r\n\x93\x94]{0,200}?'
+                rb'(?<=\S)\x94(?=[\s.,;:!?)]|$)'), 2),
+    (re.compile(rb'(?<=[ 0-9])[\x96\x97](?=[ 0-9])'), 1),
+    (re.compile(rb'(?<=[A-Za-z.!?])\x85(?=\r?\n|$)'), 1),
+)
+
+_ASCII = bytes(range(0x80))
+
+
+def detect_encoding(buffer, default='cp437'):
+    """Guesses the text encoding of a bytes-like object from its first bytes.
+
+    Args:
+        buffer: A bytes-like object (e.g. bytes or mmap.mmap).
+        default: Encoding to return if there is no evidence for any other
+            (e.g. 'cp437' for .mmf files, 'cp1252' for .mxp files).
+
+    Returns:
+        An encoding name: 'utf-8-sig', 'utf-16' or 'utf-32' if the buffer
+        starts with a byte order mark, otherwise one of 'utf-8', 'cp437',
+        'cp1252' or default.
+    """
+    sample = bytes(buffer[:SAMPLE_SIZE])
+    for bom, encoding in BOMS:
+        if sample.startswith(bom):
+            return encoding
+    high = sample.translate(None, _ASCII)
+    if not high:
+        return 'cp437' if b'\x14' in sample else default
+    try:
+        # A multi-byte character may be cut off at the end of the sample.
+        decoder = codecs.getincrementaldecoder('utf-8')()
+        decoder.decode(sample, len(sample) < SAMPLE_SIZE)
+        return 'utf-8'
+    except UnicodeDecodeError:
+        pass
+    if _UNDEFINED_CP1252.search(high):
+        return 'cp437'
+    cp437 = 2 * sample.count(b'\x14')
+    cp1252 = 0
+    for b, count in Counter(high).items():
+        w437, w1252 = _WEIGHTS[b]
+        cp437 += w437 * count
+        cp1252 += w1252 * count
+    for regex, length in _punctuation:
+        matches = len(regex.findall(sample))
+        cp437 -= length * matches
+        cp1252 += 2 * length * matches
+    if cp437 > cp1252:
+        return 'cp437'
+    if cp1252 > cp437:
+        return 'cp1252'
+    return default
+
+
+def _prepare_buffer(buffer, encoding, default):
+    """Returns a tuple of a buffer and an encoding that can be passed to
+    split_recipe_buffer.
+
+    Detects the encoding if it is None. A byte order mark is skipped, so
+    that a header on the first line is still found at the start of the
+    buffer. A buffer in an encoding that is not compatible with ASCII
+    (UTF-16 or UTF-32) is decoded to a string as a whole.
+    """
+    if encoding is None:
+        encoding = detect_encoding(buffer, default)
+    if encoding == 'utf-8-sig':
+        if bytes(buffer[:len(codecs.BOM_UTF8)]) == codecs.BOM_UTF8:
+            buffer = memoryview(buffer)[len(codecs.BOM_UTF8):]
+        encoding = 'utf-8'
+    elif encoding in ('utf-16', 'utf-32'):
+        buffer = str(buffer, encoding)
+    return buffer, encoding
@@ -0,0 +1,344 @@
+"""Bulk conversion of recipe files to JSON Lines.
+
+Every file is parsed with the parser for its detected format (see
+detect.open) in a pool of worker processes, and each recipe is written as
+one line of JSON, either with the attributes of the Recipe class of its
+format (see records.to_dict) or with the same keys for every format (see
+records.to_unified). Large plain .mmf and .mxp files are split into byte
+ranges at recipe boundaries (as in parse_recipes_parallel), so that a
+single file also keeps every worker busy. Files that cannot be parsed are
+reported and skipped.
+
+At the end, the number of recipes, recipes per second and MB per second of
+the whole run and of each file are written to standard error.
+
+Usage: python -m recipeformats convert [options] PATH...
+"""
+
+import argparse
+import glob
+import importlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+
+from . import detect, records
+from .charsets import detect_encoding, SAMPLE_SIZE
+from .parallel import map_ranges
+from .sources import detect_compression
+
+__all__ = ['find_files', 'convert', 'FileResult', 'SCHEMAS']
+
+SCHEMAS = ('native', 'unified')
+
+# Plain .mmf and .mxp files larger than this are split into byte ranges.
+_SPLIT_SIZE = 8 * 1024 * 1024
+
+# Workers write JSON Lines beyond this many bytes to a temporary file.
+_BUFFER_SIZE = 4 * 1024 * 1024
+
+# Encodings that byte ranges can be decoded in separately.
+_ascii_compatible = ('utf-8', 'cp437', 'cp1252')
+
+
+class FileResult:
+    """Represents the result of converting one file.
+
+    Attributes:
+        path: File name of the file.
+        format: Format of the file (one of detect.FORMATS), or None.
+        recipes: Integer number of recipes written.
+        bytes: Integer number of bytes of the file.
+        seconds: Float number of seconds spent parsing and converting the
+            file, summed over worker processes.
+        error: Error message string if the file could not be parsed, or None.
+    """
+
+    __slots__ = ('path', 'format', 'recipes', 'bytes', 'seconds', 'error')
+
+    def __init__(self, path):
+        """Initializes FileResult with no recipes."""
+        self.path = path
+        self.format = None
+        self.recipes = 0
+        self.bytes = 0
+        self.seconds = 0.0
+        self.error = None
+
+
+def find_files(paths):
+    """Expands file names, directories and glob patterns into file names.
+
+    Directories are searched recursively. Glob patterns may use '**' to
+    match any number of directories.
+
+    Yields:
+        Each file name, in sorted order for each path. A file found through
+        several paths (e.g. a directory and a glob pattern within it) is
+        yielded only the first time.
+
+    Raises:
+        FileNotFoundError: If a path does not exist and matches nothing.
+    """
+    seen = set()
+    for name in _expand(paths):
+        key = os.path.realpath(name)
+        if key not in seen:
+            seen.add(key)
+            yield name
+
+
+def _expand(paths):
+    """Yields each file name that find_files finds, perhaps more than once."""
+    for path in paths:
+        if os.path.isdir(path):
+            yield from _walk(path)
+        elif os.path.exists(path):
+            yield path
+        else:
+            matches = sorted(glob.glob(path, recursive=True))
+            if not matches:
+                raise FileNotFoundError('No such file or directory: %r' % path)
+            for match in matches:
+                if os.path.isdir(match):
+                    yield from _walk(match)
+                else:
+                    yield match
+
+
+def _walk(directory):
+    for root, dirs, files in os.walk(directory):
+        dirs.sort()
+        for name in sorted(files):
+            yield os.path.join(root, name)
+
+
+def convert(paths, output, schema='native', workers=None, ordered=False,
+            split_size=_SPLIT_SIZE):
+    """Converts files to JSON Lines.
+
+    Args:
+        paths: Iterable of file names.
+        output: Binary file object to write JSON Lines to.
+        schema: 'native' to write the attributes of the Recipe class of each
+            format, or 'unified' to write the same keys for every format.
+        workers: Number of worker processes, or None for the CPU count.
+        ordered: Boolean indicating whether recipes are written in the order
+            of the files (True), or as soon as each file or range of a file
+            is done (False), which is faster.
+        split_size: Size in bytes above which plain .mmf and .mxp files are
+            split into ranges.
+
+    Returns:
+        A list of a FileResult for each file, in the order of paths. A file
+        that appears more than once in paths (under any name) is converted
+        once, and has one FileResult, at its first appearance.
+    """
+    if schema not in SCHEMAS:
+        raise ValueError('schema must be one of %s' % ', '.join(SCHEMAS))
+    workers = workers or os.cpu_count() or 1
+    results = {}
+    ranges = []
+    seen = set()
+    for path in paths:
+        key = os.path.realpath(path)
+        if key in seen:
+            continue
+        seen.add(key)
+        results[path] = FileResult(path)
+        ranges.extend(_plan(path, workers, split_size))
+    for path, format, count, size, seconds, error, data, spill in map_ranges(
+            _convert_range, (schema,), ranges, workers, ordered):
+        result = results[path]
+        result.format = result.format or format
+        result.recipes += count
+        result.bytes += size
+        result.seconds += seconds
+        result.error = result.error or error
+        if spill is None:
+            output.write(data)
+        else:
+            try:
+                with open(spill, 'rb') as f:
+                    shutil.copyfileobj(f, output, _BUFFER_SIZE)
+            finally:
+                os.remove(spill)
+    return list(results.values())
+
+
+def _plan(path, workers, split_size):
+    """Returns a list of tuples of the file name, format, encoding and start
+    and end byte offsets (None for the whole file) of each range of a file
+    to convert."""
+    try:
+        size = os.path.getsize(path)
+        if size <= split_size or detect_compression(path) is not None:
+            return [(path, None, None, 0, None)]
+        with open(path, 'rb') as f:
+            head = f.read(SAMPLE_SIZE)
+        format = detect.sniff_format(head)
+        if format not in ('mmf', 'mxp'):
+            return [(path, format, None, 0, None)]
+        encoding = detect_encoding(head, detect.DEFAULT_ENCODINGS[format])
+        if encoding not in _ascii_compatible:
+            return [(path, format, encoding, 0, None)]
+        chunk_size = max(split_size // 4, size // (workers * 4))
+        return [(path, format, encoding, start, end) for start, end in
+                _parser(format).split_file(path, workers, chunk_size)]
+    except OSError:
+        # Reported when the file is converted.
+        return [(path, None, None, 0, None)]
+
+
+def _parser(format):
+    """Returns the module for a format."""
+    return importlib.import_module('.' + format, __package__)
+
+
+def _convert_range(schema, path, format, encoding, start, end):
+    """Converts a range of a file (or the whole file if end is None).
+
+    Returns:
+        A list with a tuple of the file name, format, number of recipes,
+        number of bytes, seconds, error message or None, and the JSON Lines
+        as bytes and the file name of a temporary file they continue in (or
+        None), see _Output.
+    """
+    begin = time.perf_counter()
+    to_record = records.to_dict if schema == 'native' else records.to_unified
+    output = _Output()
+    error = None
+    try:
+        if end is None:
+            size = os.path.getsize(path)
+            with detect.open(path, format, encoding) as recipes:
+                format = recipes.format
+                for recipe in recipes:
+                    output.write(json.dumps(to_record(recipe)))
+        else:
+            size = end - start
+            parser = _parser(format)
+            with open(path, 'rb') as f:
+                f.seek(start)
+                data = f.read(size)
+            for recipe_lines in parser.split_recipe_buffer(data, encoding):
+                output.write(json.dumps(to_record(parser.parse_recipe(recipe_lines))))
+        data, spill = output.finish()
+    except Exception as e:
+        output.discard()
+        size = 0
+        data, spill = b'', None
+        error = '%s: %s' % (type(e).__name__, e)
+    return [(path, format, output.count, size, time.perf_counter() - begin, error,
+             data, spill)]
+
+
+class _Output:
+    """JSON Lines written by a worker process.
+
+    Results are pickled back to the main process whole, so once the lines
+    of a range (e.g. of a large compressed file, which is not split) pass
+    _BUFFER_SIZE bytes, they are written a chunk at a time to a temporary
+    file instead, which the main process copies to the output.
+    """
+
+    __slots__ = ('count', '_lines', '_size', '_file')
+
+    def __init__(self):
+        self.count = 0
+        self._lines = []
+        self._size = 0
+        self._file = None
+
+    def write(self, line):
+        """Adds a line (without a newline)."""
+        self._lines.append(line)
+        self._size += len(line) + 1
+        self.count += 1
+        if self._size >= _BUFFER_SIZE:
+            if self._file is None:
+                self._file = tempfile.NamedTemporaryFile(
+                    'wb', prefix='recipeformats-', suffix='.jsonl', delete=False)
+            self._file.write(self._encode())
+
+    def finish(self):
+        """Returns a tuple of the bytes of the lines and None, or of empty
+        bytes and the file name of the temporary file with the lines."""
+        if self._file is None:
+            return self._encode(), None
+        with self._file:
+            self._file.write(self._encode())
+        return b'', self._file.name
+
+    def discard(self):
+        """Forgets the lines and removes the temporary file, if any."""
+        self.count = 0
+        self._lines = []
+        if self._file is not None:
+            self._file.close()
+            os.remove(self._file.name)
+            self._file = None
+
+    def _encode(self):
+        data = ''.join(line + '\n' for line in self._lines).encode('utf-8')
+        self._lines = []
+        self._size = 0
+        return data
+
+
+def _report(results, seconds, file, quiet=False):
+    """Writes the results of each file (only errors if quiet) and the totals."""
+    for r in results:
+        if r.error is not None:
+            print('%s: error: %s' % (r.path, r.error), file=file)
+        elif not quiet:
+            print('%s: %s %d recipes %.2f MB %.3f s' % (
+                r.path, r.format, r.recipes, r.bytes / 1e6, r.seconds), file=file)
+    recipes = sum(r.recipes for r in results)
+    size = sum(r.bytes for r in results)
+    errors = sum(1 for r in results if r.error is not None)
+    print('%d files (%d errors), %d recipes, %.2f MB in %.3f s: '
+          '%.0f recipes/s, %.2f MB/s' % (
+              len(results), errors, recipes, size / 1e6, seconds,
+              recipes / seconds if seconds else 0,
+              size / 1e6 / seconds if seconds else 0), file=file)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m recipeformats convert',
+        description='Convert recipe files to JSON Lines.')
+    parser.add_argument('paths', nargs='+', metavar='PATH',
+                        help='file, directory (searched recursively) or glob pattern')
+    parser.add_argument('-o', '--output', help='file to write to (default stdout)')
+    parser.add_argument('--schema', choices=SCHEMAS, default='native',
+                        help='attributes of each format, or keys common to all (default native)')
+    parser.add_argument('-j', '--workers', type=int,
+                        help='number of worker processes (default CPU count)')
+    parser.add_argument('--ordered', action='store_true',
+                        help='write recipes in the order of the files')
+    parser.add_argument('-q', '--quiet', action='store_true',
+                        help='only write the totals to stderr, not each file')
+    args = parser.parse_args(argv)
+
+    try:
+        paths = list(find_files(args.paths))
+    except FileNotFoundError as e:
+        parser.error(str(e))
+    start = time.perf_counter()
+    if args.output:
+        with open(args.output, 'wb') as f:
+            results = convert(paths, f, args.schema, args.workers, args.ordered)
+    else:
+        results = convert(paths, sys.stdout.buffer, args.schema, args.workers, args.ordered)
+        sys.stdout.buffer.flush()
+    seconds = time.perf_counter() - start
+    _report(results, seconds, sys.stderr, args.quiet)
+    return 1 if any(r.error is not None for r in results) else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,227 @@
+"""Detection of the format of recipe files and a single entry point to parse
+any of them.
+
+detect_format looks at the first SNIFF_SIZE bytes of a file (after
+decompressing it, see sources.open_source) for a Meal-Master header, a
+MasterCook 'Exported from' header, or an 'mx2' or 'fdx' root element.
+
+open detects the format of a file and returns a RecipeFile, which yields
+each recipe in the file as it is parsed. The recipes are the Recipe objects
+of the module for the format (mmf, mxp, mx2 or fdx).
+
+Example:
+    with recipeformats.open('upload.bin') as recipes:
+        for recipe in recipes:
+            pass
+"""
+
+import importlib
+import io
+import re
+
+from .charsets import BOMS, detect_encoding, SAMPLE_SIZE
+from .sources import detect_compression, open_source
+
+__all__ = ['open', 'detect_format', 'sniff_format', 'RecipeFile', 'FORMATS',
+           'SNIFF_SIZE', 'DEFAULT_ENCODINGS']
+
+FORMATS = ('mmf', 'mxp', 'mx2', 'fdx')
+
+# Number of bytes at the start of a file that are looked at.
+SNIFF_SIZE = 8 * 1024
+
+# A Meal-Master header line followed by a title line (whose key the parser
+# matches in any case).
+_mmf_re = re.compile(
+    r'^(?:---------- |MMMMM----- ).*\S.*$(?:\n.*){0,3}?\n *Title:',
+    re.MULTILINE | re.IGNORECASE)
+_mxp_re = re.compile(
+    r'^\s*\*\s*Exported from\b.*\*[^\S\n]*$', re.MULTILINE | re.IGNORECASE)
+_mx2_re = re.compile(r'<mx2[\s>]')
+_fdx_re = re.compile(r'<fdx[\s>]')
+
+_format_res = (('mmf', _mmf_re), ('mxp', _mxp_re), ('mx2', _mx2_re),
+               ('fdx', _fdx_re))
+
+# Encoding of each plain text format when detect_encoding finds no evidence.
+DEFAULT_ENCODINGS = {'mmf': 'cp437', 'mxp': 'cp1252'}
+
+
+def sniff_format(head):
+    """Detects the format of recipes from the first bytes of a file.
+
+    Args:
+        head: A bytes-like object with the first bytes of the file.
+
+    Returns:
+        One of FORMATS, or None if no format was recognized. If markers of
+        several formats are found, the one that appears first wins.
+    """
+    head = bytes(head[:SNIFF_SIZE])
+    for bom, encoding in BOMS:
+        if head.startswith(bom):
+            text = head.decode(encoding, 'ignore')
+            break
+    else:
+        # Every marker is ASCII, so any ASCII-compatible encoding will do.
+        text = head.decode('latin-1')
+    text = text.replace('\r\n', '\n')
+    found = None
+    for name, regex in _format_res:
+        match = regex.search(text)
+        if match and (found is None or match.start() < found[1]):
+            found = (name, match.start())
+    return found[0] if found else None
+
+
+def detect_format(filename, member=None):
+    """Detects the format of a plain or compressed recipe file.
+
+    Args:
+        filename: File name of the file.
+        member: Name of the member to read from a zip file (see open).
+
+    Returns:
+        One of FORMATS, or None if no format was recognized.
+    """
+    with open_source(filename, member=_choose_member(filename, member)) as f:
+        return sniff_format(f.read(SNIFF_SIZE))
+
+
+def open(source, format=None, encoding=None, member=None):
+    """Opens a recipe file of any supported format for parsing.
+
+    Args:
+        source: File name of a plain or compressed (see sources.open_source)
+            .mmf, .mxp, .mx2 or .fdx file, or a seekable binary file object
+            positioned at the start of such a file. A file object is left
+            open.
+        format: One of FORMATS, or None to detect the format from the
+            contents of the file.
+        encoding: Text encoding of a .mmf or .mxp file, or None to detect it
+            (see charsets.detect_encoding). Ignored for XML formats.
+        member: Name of the member to read from a zip file. If omitted, the
+            only member is read, or else the first member with the extension
+            of a supported format (e.g. the .fdx file in a .fdxz file).
+
+    Returns:
+        A RecipeFile for the file.
+
+    Raises:
+        ValueError: If the format is not one of FORMATS or could not be
+            detected.
+    """
+    if format is not None and format not in FORMATS:
+        raise ValueError('format must be one of %s' % ', '.join(FORMATS))
+    file = open_source(source, member=_choose_member(source, member))
+    owned = file is not source
+    try:
+        if format is None or (encoding is None and format in DEFAULT_ENCODINGS):
+            start = file.tell()
+            head = file.read(SAMPLE_SIZE)
+            file.seek(start)
+            if format is None:
+                format = sniff_format(head)
+                if format is None:
+                    raise ValueError('%s is not a recognized recipe file'
+                                     % ('File' if hasattr(source, 'read') else source))
+            if encoding is None and format in DEFAULT_ENCODINGS:
+                encoding = detect_encoding(head, DEFAULT_ENCODINGS[format])
+        return RecipeFile(file, format, encoding, owned)
+    except Exception:
+        if owned:
+            file.close()
+        raise
+
+
+class RecipeFile:
+    """Represents an open recipe file that yields each recipe as it is parsed.
+
+    The file is read only once, from start to end. Use it as a context
+    manager or call close to close the file if not all recipes are read. A
+    file object passed to open is never closed, even when the RecipeFile is
+    garbage collected.
+
+    Attributes:
+        format: Format of the file (one of FORMATS).
+        encoding: Text encoding of a .mmf or .mxp file, or None.
+        info: An mx2.Info object for a .mx2 file, or None.
+    """
+
+    __slots__ = ('format', 'encoding', 'info', '_file', '_recipes', '_owned')
+
+    def __init__(self, file, format, encoding=None, owned=True):
+        """Initializes RecipeFile for a binary file object positioned at the
+        start of the file, which is closed by close if owned is True."""
+        self.format = format
+        self.encoding = encoding
+        self.info = None
+        self._file = file
+        self._owned = owned
+        # Only the parser for the format is imported, so that e.g. parsing
+        # a .mmf file does not load an XML parser.
+        parser = importlib.import_module('.' + format, __package__)
+        if format == 'mmf' or format == 'mxp':
+            self._file = io.TextIOWrapper(file, encoding=encoding)
+            self._recipes = parser.parse_recipes(self._file)
+        elif format == 'mx2':
+            self.info, self._recipes = parser.iter_recipes(file)
+        else:
+            self._recipes = parser.iter_recipes(file)
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self._recipes)
+        except StopIteration:
+            self.close()
+            raise
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def __del__(self):
+        # Otherwise a TextIOWrapper around a file object passed to open
+        # would close that file when it is garbage collected.
+        self.close()
+
+    def close(self):
+        """Closes the file (if it was opened by open)."""
+        if getattr(self, '_file', None) is None:
+            return
+        close = getattr(getattr(self, '_recipes', None), 'close', None)
+        if close is not None:
+            close()
+        if self._owned:
+            self._file.close()
+        elif isinstance(self._file, io.TextIOWrapper):
+            self._file.detach()
+        self._file = None
+
+
+_extensions = tuple('.' + format for format in FORMATS)
+
+
+def _choose_member(filename, member):
+    """Returns the name of the member to read from a zip file (a file name
+    or a file object, whose position is left unchanged), or None to let
+    open_source choose the only member."""
+    if member is not None or detect_compression(filename) != 'zip':
+        return member
+    import zipfile
+    start = filename.tell() if hasattr(filename, 'read') else None
+    with zipfile.ZipFile(filename) as bundle:
+        names = [info.filename for info in bundle.infolist() if not info.is_dir()]
+    if start is not None:
+        filename.seek(start)
+    if len(names) == 1:
+        return None
+    for name in names:
+        if name.lower().endswith(_extensions):
+            return name
+    return None
@@ -1,28 +1,419 @@
 """Recipe parsing for Food Data Exchange (Living Cookbook) format (.fdx) files.
 
 Use parse_file to parse a file.
+Use iter_recipes to parse a file incrementally, one recipe at a time.
+Use extract_images to write the images in a file to a directory.
+All three accept gzip, bzip2, xz and single-file zip compressed files (see
+sources.open_source).
 """
 
+import binascii
+import hashlib
+import os
+import re
+from xml.parsers import expat
 import xml.etree.ElementTree as ET
 
-__all__ = ['parse_file', 'Recipe', 'RecipeIngredient', 'RecipeProcedure',
-           'RecipeAuthorNote', 'RecipeTip', 'RecipeReview', 'RecipeMeasure',
-           'RecipeImage']
+from .sources import detect_compression, open_source
 
+__all__ = ['parse_file', 'iter_recipes', 'IMAGE_MODES', 'Recipe',
+           'RecipeIngredient', 'RecipeProcedure', 'RecipeAuthorNote',
+           'RecipeTip', 'RecipeReview', 'RecipeMeasure', 'RecipeImage',
+           'LazyRecipeImage', 'extract_images', 'ExtractedImage']
 
-def parse_file(filename):
+
+def parse_file(source, images='eager'):
     """Parses a .fdx file.
 
     Args:
-        filename: File name of the .fdx file to parse.
+        source: File name or binary file object of the .fdx file to parse.
+        images: How to read the base 64 text of images (see IMAGE_MODES):
+            'eager' keeps the text of every image in RecipeImage.value.
+            'lazy' keeps only the position of the text in the file, and reads
+                it when RecipeImage.value is accessed (not for compressed
+                files, see iter_recipes).
+            'skip' keeps only the file type, description and size.
 
     Returns: 
         A list of Recipe objects.
     """
-    fdx = ET.parse(filename).getroot()
+    if images != 'eager':
+        return list(iter_recipes(source, images))
+    if hasattr(source, 'read'):
+        fdx = ET.parse(source).getroot()
+    else:
+        with open_source(source) as f:
+            fdx = ET.parse(f).getroot()
     return [Recipe.parse(e) for e in fdx.findall('./Recipes/Recipe')]
 
 
+def iter_recipes(source, images='eager'):
+    """Parses a .fdx file incrementally.
+
+    Each Recipe is yielded as soon as the end of its element is read. Only
+    the elements of one recipe are held in memory at a time, so memory use
+    does not grow with the size of the file.
+
+    Args:
+        source: File name or binary file object of the .fdx file to parse.
+            A file object must stay open while lazy images are accessed, and
+            should be seekable without decompressing (each access seeks to
+            the image).
+        images: How to read the base 64 text of images (see parse_file).
+            'lazy' is not supported for compressed files, since each access
+            would decompress the file from the start up to the image.
+
+    Yields:
+        A Recipe for each './Recipes/Recipe' element.
+
+    Raises:
+        ValueError: If images is not one of IMAGE_MODES, or is 'lazy' and
+            source is the file name of a compressed file.
+    """
+    if images not in IMAGE_MODES:
+        raise ValueError('images must be one of %s' % ', '.join(IMAGE_MODES))
+    if (images == 'lazy' and not hasattr(source, 'read') and
+            detect_compression(source) is not None):
+        raise ValueError("images='lazy' is not supported for compressed "
+                         "files; use 'eager' or 'skip'")
+    if hasattr(source, 'read'):
+        yield from _RecipeReader(source, images).read()
+    else:
+        with open_source(source) as f:
+            yield from _RecipeReader(f, images, source).read()
+
+
+IMAGE_MODES = ('eager', 'lazy', 'skip')
+
+# Tags of elements containing base 64 image text, and the tag of the parent
+# element they must be in (None for any parent).
+_image_tags = {
+    'RecipeImage': 'Recipe',
+    'SourceImage': 'Recipe',
+    'ProcedureImage': None,
+    'RecipeImages': 'RecipeImages',
+}
+
+
+class _RecipeReader:
+    """Reads the 'Recipe' elements of a .fdx file with expat.
+
+    Elements are only built inside './Recipes/Recipe'. Unless images are
+    read eagerly, the text of image elements is never stored. Instead a
+    RecipeImage is made when the image element ends, and handed to
+    Recipe.parse.
+    """
+
+    def __init__(self, file, images, filename=None):
+        self.file = file
+        self.images = images
+        self.source = filename if filename is not None else file
+        self.base = file.tell() if images == 'lazy' else 0
+        self.parser = None
+        self.tags = []
+        self.builder = None
+        self.recipes = []
+        self.image = None
+        self.read_images = {}
+
+    def read(self, chunk_size=64 * 1024):
+        """Yields each Recipe in the file."""
+        self.parser = parser = expat.ParserCreate()
+        parser.buffer_text = True
+        parser.buffer_size = chunk_size
+        parser.StartElementHandler = self.start
+        parser.EndElementHandler = self.end
+        parser.CharacterDataHandler = self.data
+        while True:
+            data = self.file.read(chunk_size)
+            try:
+                parser.Parse(data, not data)
+            except expat.ExpatError as e:
+                raise ET.ParseError(str(e)) from e
+            yield from self.recipes
+            self.recipes.clear()
+            if not data:
+                break
+
+    def start(self, tag, attrib):
+        self.tags.append(tag)
+        if self.builder is None:
+            if len(self.tags) == 3 and tag == 'Recipe' and self.tags[1] == 'Recipes':
+                self.builder = ET.TreeBuilder()
+            else:
+                return
+        self.builder.start(tag, attrib)
+        if (self.images != 'eager' and tag in _image_tags and
+                _image_tags[tag] in (None, self.tags[-2])):
+            self.image = _ImageText()
+            if self.images == 'lazy':
+                # Character data is only reported at its real position in
+                # the file when it is not buffered.
+                self.parser.buffer_text = False
+
+    def data(self, data):
+        if self.image is not None:
+            if self.images == 'lazy' and self.image.offset is None:
+                self.image.offset = self.base + self.parser.CurrentByteIndex
+                self.parser.buffer_text = True
+            self.image.add(data)
+        elif self.builder is not None:
+            self.builder.data(data)
+
+    def end(self, tag):
+        self.tags.pop()
+        if self.builder is None:
+            return
+        e = self.builder.end(tag)
+        if self.image is not None:
+            end = self.base + self.parser.CurrentByteIndex
+            self.read_images[e] = self.image.to_recipe_image(e, self.source, end)
+            self.image = None
+            self.parser.buffer_text = True
+        if len(self.tags) == 2:
+            self.builder.close()
+            self.builder = None
+            self.recipes.append(Recipe.parse(e, self.read_images))
+            self.read_images.clear()
+
+
+def extract_images(source, directory):
+    """Writes each image in a .fdx file to its own file in a directory.
+
+    The base 64 text of each image is decoded a piece at a time as it is
+    read and written straight to the image file, so no image is ever held
+    in memory as a whole. Image files are named after the recipe ID and the
+    kind of image, e.g. '42-recipe.jpg', '42-procedure-1.gif' or
+    '42-image-2.png'. Existing files are never overwritten: if a file with
+    the name exists (e.g. for a repeated recipe ID, or an ID that differs
+    only in characters not allowed in file names), a number is added to the
+    name, e.g. '42-recipe_2.jpg'.
+
+    Args:
+        source: File name or binary file object of the .fdx file.
+        directory: Directory to write image files to (created if needed).
+
+    Yields:
+        An ExtractedImage for each image, in the order they appear.
+    """
+    os.makedirs(directory, exist_ok=True)
+    if hasattr(source, 'read'):
+        yield from _ImageExtractor(source, directory).read()
+    else:
+        with open_source(source) as f:
+            yield from _ImageExtractor(f, directory).read()
+
+
+class ExtractedImage:
+    """Represents an image written to a file by extract_images.
+
+    Attributes:
+        recipe_id: Id string of the recipe the image is in.
+        kind: Kind of image string:
+            'recipe' = Recipe.recipe_image
+            'source' = Recipe.source_image
+            'procedure' = RecipeProcedure.procedure_image
+            'image' = One of Recipe.images
+        file_type: Extension of image file name (e.g. 'JPG', 'GIF').
+        description: Description string for image.
+        path: Path of the written image file.
+        size: Number of bytes written.
+        sha256: SHA-256 digest of the image file as a hex string.
+    """
+
+    __slots__ = ('recipe_id', 'kind', 'file_type', 'description', 'path',
+                 'size', 'sha256')
+
+    def __init__(self, recipe_id, kind, file_type, description, path, size, sha256):
+        self.recipe_id = recipe_id
+        self.kind = kind
+        self.file_type = file_type
+        self.description = description
+        self.path = path
+        self.size = size
+        self.sha256 = sha256
+
+    def __repr__(self):
+        return "{%s} {%s} {%s} {%d}" % (self.recipe_id, self.kind, self.path, self.size)
+
+
+# Kind of image for each image element tag.
+_image_kinds = {
+    'RecipeImage': 'recipe',
+    'SourceImage': 'source',
+    'ProcedureImage': 'procedure',
+    'RecipeImages': 'image',
+}
+
+_unsafe_re = re.compile(r'[^A-Za-z0-9_.-]')
+
+
+class _ImageExtractor:
+    """Reads the image elements of a .fdx file with expat and writes their
+    decoded text to files."""
+
+    def __init__(self, file, directory):
+        self.file = file
+        self.directory = directory
+        self.tags = []
+        self.recipes = 0
+        self.recipe_id = ''
+        self.counts = {}
+        self.image = None
+        self.writer = None
+        self.extracted = []
+
+    def read(self, chunk_size=64 * 1024):
+        """Yields an ExtractedImage for each image in the file."""
+        parser = expat.ParserCreate()
+        parser.buffer_text = True
+        parser.buffer_size = chunk_size
+        parser.StartElementHandler = self.start
+        parser.EndElementHandler = self.end
+        parser.CharacterDataHandler = self.data
+        try:
+            while True:
+                data = self.file.read(chunk_size)
+                try:
+                    parser.Parse(data, not data)
+                except expat.ExpatError as e:
+                    raise ET.ParseError(str(e)) from e
+                yield from self.extracted
+                self.extracted.clear()
+                if not data:
+                    break
+        finally:
+            if self.writer is not None:
+                self.writer.close()
+
+    def start(self, tag, attrib):
+        self.tags.append(tag)
+        if len(self.tags) == 3 and tag == 'Recipe' and self.tags[1] == 'Recipes':
+            self.recipes += 1
+            self.recipe_id = attrib.get('ID', '')
+            self.counts = {}
+        elif (len(self.tags) > 3 and self.tags[2] == 'Recipe' and
+                tag in _image_tags and _image_tags[tag] in (None, self.tags[-2])):
+            kind = _image_kinds[tag]
+            file_type = attrib.get('FileType', '')
+            path, file = _create_file(self.get_path(kind, file_type))
+            self.image = ExtractedImage(self.recipe_id, kind, file_type,
+                                        attrib.get('Description', ''), path, 0, '')
+            self.writer = _Base64Writer(file)
+
+    def data(self, data):
+        if self.writer is not None:
+            self.writer.write(data)
+
+    def end(self, tag):
+        self.tags.pop()
+        if self.writer is not None:
+            self.writer.close()
+            self.image.size = self.writer.size
+            self.image.sha256 = self.writer.hash.hexdigest()
+            self.extracted.append(self.image)
+            self.image = None
+            self.writer = None
+
+    def get_path(self, kind, file_type):
+        """Returns the path of the file for the next image of a kind in the
+        current recipe."""
+        name = _unsafe_re.sub('_', self.recipe_id) or 'recipe%d' % self.recipes
+        name += '-' + kind
+        if kind in ('procedure', 'image'):
+            self.counts[kind] = self.counts.get(kind, 0) + 1
+            name += '-%d' % self.counts[kind]
+        extension = _unsafe_re.sub('_', file_type.lower()) or 'bin'
+        return os.path.join(self.directory, name + '.' + extension)
+
+
+def _create_file(path):
+    """Creates and opens a new file for writing in binary mode.
+
+    If a file with the path exists, a number is added to the name (e.g.
+    'a.jpg' becomes 'a_2.jpg') until the name is not taken.
+
+    Returns:
+        A tuple of the path of the file created and the open file.
+    """
+    root, extension = os.path.splitext(path)
+    number = 1
+    while True:
+        try:
+            return path, open(path, 'xb')
+        except FileExistsError:
+            number += 1
+            path = '%s_%d%s' % (root, number, extension)
+
+
+class _Base64Writer:
+    """Decodes base 64 text a piece at a time and writes it to a binary
+    file."""
+
+    def __init__(self, file):
+        self.file = file
+        self.hash = hashlib.sha256()
+        self.size = 0
+        self.pending = ''
+
+    def write(self, text):
+        """Decodes and writes all complete groups of 4 base 64 characters."""
+        text = self.pending + ''.join(text.split())
+        n = len(text) // 4 * 4
+        self.pending = text[n:]
+        if n:
+            self.write_bytes(binascii.a2b_base64(text[:n]))
+
+    def write_bytes(self, data):
+        self.file.write(data)
+        self.hash.update(data)
+        self.size += len(data)
+
+    def close(self):
+        """Writes any remaining characters and closes the file."""
+        if len(self.pending.rstrip('=')) > 1:
+            # Missing padding at the end of the text.
+            self.write_bytes(binascii.a2b_base64(self.pending + '=' * (-len(self.pending) % 4)))
+        self.pending = ''
+        self.file.close()
+
+
+class _ImageText:
+    """Keeps track of the size and position of base 64 image text."""
+
+    def __init__(self):
+        self.offset = None
+        self.characters = 0
+        self.padding = 0
+
+    def add(self, data):
+        """Counts base 64 characters and padding in a piece of text."""
+        data = ''.join(data.split())
+        if data:
+            self.characters += len(data)
+            unpadded = data.rstrip('=')
+            if unpadded:
+                self.padding = len(data) - len(unpadded)
+            else:
+                self.padding += len(data)
+
+    def to_recipe_image(self, e, source, end):
+        """Returns a RecipeImage (or LazyRecipeImage if the offset is known)
+        for an image element."""
+        if self.offset is not None:
+            image = LazyRecipeImage(source, self.offset, end - self.offset)
+        else:
+            image = RecipeImage()
+        image.file_type = e.get('FileType', '')
+        image.description = e.get('Description', '')
+        image.size = self.size()
+        return image
+
+    def size(self):
+        """Returns the number of bytes the base 64 text decodes to."""
+        return self.characters // 4 * 3 - self.padding
+
+
 class Recipe:
     """Represents a recipe in a Food Data Exchange .fdx file.
 
@@ -65,6 +456,16 @@ class Recipe:
             Values are decimal string in the nutrient's standard units (e.g. '1.25')
     """
 
+    __slots__ = ('name', 'id', 'cookbook_id', 'cookbook_chapter_id',
+                 'servings', 'yield_', 'oven_temperature_f',
+                 'oven_temperature_c', 'preparation_time', 'cooking_time',
+                 'inactive_time', 'ready_in_time', 'degree_of_difficulty',
+                 'recipe_types', 'author', 'source', 'source_page_number',
+                 'web_page', 'copyright', 'comments', 'color_flag',
+                 'create_date', 'recipe_image', 'source_image', 'ingredients',
+                 'procedures', 'author_notes', 'tips', 'reviews', 'measures',
+                 'images', 'user_data', 'nutrition')
+
     def __init__(self):
         self.name = ''
         self.id = ''
@@ -101,7 +502,7 @@ class Recipe:
         self.nutrition = {}
 
     @staticmethod
-    def parse(r):
+    def parse(r, images=None):
         recipe = Recipe()
         recipe.name = r.get('Name', '')
         recipe.id = r.get('ID', '')
@@ -125,15 +526,15 @@ class Recipe:
         recipe.comments = r.get('Comments', '')
         recipe.color_flag = r.get('ColorFlag', '')
         recipe.create_date = r.get('CreateDate', '')
-        recipe.recipe_image = RecipeImage.find_and_parse(r, 'RecipeImage')
-        recipe.source_image = RecipeImage.find_and_parse(r, 'SourceImage')
+        recipe.recipe_image = RecipeImage.find_and_parse(r, 'RecipeImage', images)
+        recipe.source_image = RecipeImage.find_and_parse(r, 'SourceImage', images)
         recipe.ingredients = [RecipeIngredient.parse(e) for e in r.findall('./RecipeIngredients/RecipeIngredient')]
-        recipe.procedure = [RecipeProcedure.parse(e) for e in r.findall('./RecipeProcedures/RecipeProcedure')]
+        recipe.procedures = [RecipeProcedure.parse(e, images) for e in r.findall('./RecipeProcedures/RecipeProcedure')]
         recipe.author_notes = [RecipeAuthorNote.parse(e) for e in r.findall('./RecipeAuthorNotes/RecipeAuthorNote')]
         recipe.tips = [RecipeTip.parse(e) for e in r.findall('./RecipeTips/RecipeTip')]
         recipe.reviews = [RecipeReview.parse(e) for e in r.findall('./RecipeReviews/RecipeReview')]
         recipe.measures = [RecipeMeasure.parse(e) for e in r.findall('./RecipeMeasures/RecipeMeasure')]
-        recipe.images = [RecipeImage.parse(e) for e in r.findall('./RecipeImages/RecipeImages')]
+        recipe.images = [RecipeImage.parse(e, images) for e in r.findall('./RecipeImages/RecipeImages')]
         recipe.nutrition = {name: value for name, value in _find(r, 'RecipeNutrition').items()}
         recipe.user_data = [r.get('UserData' + str(i + 1), '') for i in range(15)]
         return recipe
@@ -162,6 +563,11 @@ class RecipeIngredient:
         recipe_name: Name string of linked recipe when link_type == 'Recipe'.
     """
 
+    __slots__ = ('quantity', 'unit', 'ingredient', 'heading', 'link_type',
+                 'ingredient_id', 'ingredient_name', 'measure_id', 'measure',
+                 'measure_gram_weight', 'measure_quantity', 'recipe_id',
+                 'recipe_name')
+
     def __init__(self):
         self.quantity = ''
         self.unit = ''
@@ -202,20 +608,22 @@ class RecipeProcedure:
     Attributes:
         procedure_text: Text string.
         heading: Heading string ('Y' or 'N').
-        image: Image object or None.
+        procedure_image: RecipeImage object or None.
     """
 
+    __slots__ = ('procedure_text', 'heading', 'procedure_image')
+
     def __init__(self):
         self.procedure_text = ''
         self.heading = ''
         self.procedure_image = None
 
     @staticmethod
-    def parse(e):
+    def parse(e, images=None):
         procedure = RecipeProcedure()
         procedure.procedure_text = e.findtext('ProcedureText', '').strip()
         procedure.heading = e.get('Heading', '')
-        procedure.procedure_image = RecipeImage.find_and_parse(e, 'ProcedureImage')
+        procedure.procedure_image = RecipeImage.find_and_parse(e, 'ProcedureImage', images)
         return procedure
 
 
@@ -227,6 +635,8 @@ class RecipeAuthorNote:
         heading: Heading string ('True' or '')
     """
 
+    __slots__ = ('text', 'heading')
+
     def __init__(self):
         self.text = ''
         self.heading = ''
@@ -247,6 +657,8 @@ class RecipeTip:
         heading: Heading string ('True' or '')
     """
 
+    __slots__ = ('text', 'heading')
+
     def __init__(self):
         self.text = ''
         self.heading = ''
@@ -268,6 +680,8 @@ class RecipeReview:
         reviewer: Name of reviewer string.
     """
 
+    __slots__ = ('review_date', 'rating', 'reviewer')
+
     def __init__(self):
         self.review_date = ''
         self.rating = ''
@@ -293,6 +707,8 @@ class RecipeMeasure:
             'Volume', 'Mass', 'Weight (Mass)', 'Unit', others?
     """
 
+    __slots__ = ('measure_id', 'description', 'gram_weight', 'measure_type')
+
     def __init__(self):
         self.measure_id = ''
         self.description = ''
@@ -313,37 +729,88 @@ class RecipeImage:
     """Represents an image in a Food Data Exchange .fdx file.
 
     Attributes:
-        value: Bytes of image file encoded as a base 64 string.
+        value: Bytes of image file encoded as a base 64 string
+            (empty when images are skipped).
         file_type: Extension of image file name (e.g. 'JPG', 'GIF').
         description: Description string for image.
             (only used for Recipe.images; not recipe_image, source_image, or procedure_image)
+        size: Number of bytes of the image file.
     """
 
-    def __init(self):
+    __slots__ = ('value', 'file_type', 'description', 'size')
+
+    def __init__(self):
         self.value = ''
         self.file_type = ''
         self.description = ''
+        self.size = 0
 
     def __repr__(self):
         return "{%s} {%s} {%s}" % (self.file_type, self.description, self.value[:50] + '...')
 
     @staticmethod
-    def find_and_parse(element, tag):
+    def find_and_parse(element, tag, images=None):
         image = element.find(tag)
         if image is None:
             return None
         else:
-            return RecipeImage.parse(image)
+            return RecipeImage.parse(image, images)
 
     @staticmethod
-    def parse(e):
+    def parse(e, images=None):
+        """Parses a RecipeImage from an image Element.
+
+        Args:
+            e: Image Element.
+            images: Dictionary of RecipeImage objects already read for image
+                Elements whose text was not kept, or None.
+        """
+        if images is not None and e in images:
+            return images.pop(e)
         image = RecipeImage()
         image.value = e.text.strip()
         image.file_type = e.get('FileType', '')
         image.description = e.get('Description', '')
+        text = _ImageText()
+        text.add(image.value)
+        image.size = text.size()
         return image
 
 
+class LazyRecipeImage(RecipeImage):
+    """Represents an image whose base 64 text is only read from the file when
+    value is accessed.
+
+    Attributes:
+        source: File name or binary file object the image is in.
+        offset: Byte offset of the image text in the file.
+        length: Number of bytes of the image text in the file.
+    """
+
+    __slots__ = ('source', 'offset', 'length')
+
+    def __init__(self, source, offset, length):
+        self.source = source
+        self.offset = offset
+        self.length = length
+        self.file_type = ''
+        self.description = ''
+        self.size = 0
+
+    @property
+    def value(self):
+        """Reads the base 64 text of the image from the file."""
+        if hasattr(self.source, 'read'):
+            self.source.seek(self.offset)
+            data = self.source.read(self.length)
+        else:
+            # iter_recipes only makes lazy images for plain files.
+            with open(self.source, 'rb') as f:
+                f.seek(self.offset)
+                data = f.read(self.length)
+        return data.decode('ascii').strip()
+
+
 def _find(element, tag):
     """Finds the first subelement with the given tag name.
 
@@ -0,0 +1,50 @@
+"""Writing of files that other processes may be reading.
+
+replace_file writes a file under a unique temporary name in the directory
+of the file and then renames it into place, so that readers never see a
+partially written file, concurrent writers never write to the same file,
+and a failed write leaves nothing behind. index.RecipeIndex.save and
+inverted.InvertedIndex.save write their files with it.
+
+Example:
+    with replace_file('archive.mmf.idx') as f:
+        f.write(data)
+"""
+
+import contextlib
+import os
+
+__all__ = ['replace_file']
+
+
+@contextlib.contextmanager
+def replace_file(path):
+    """Opens a new binary file that replaces path when the block exits.
+
+    The file is created with the same permissions as open would give it
+    (0o666 less the umask). If the block raises an exception, the file is
+    removed and path is left as it was.
+
+    Args:
+        path: File name of the file to write.
+
+    Yields:
+        A binary file object open for writing.
+    """
+    directory, name = os.path.split(os.path.abspath(path))
+    flags = os.O_WRONLY | os.O_CREAT | os.O_EXCL | getattr(os, 'O_BINARY', 0)
+    while True:
+        temp = os.path.join(directory, '.%s.%s.tmp' % (name, os.urandom(6).hex()))
+        try:
+            fd = os.open(temp, flags, 0o666)
+            break
+        except FileExistsError:
+            continue
+    try:
+        with open(fd, 'wb') as f:
+            yield f
+        os.replace(temp, path)
+    except BaseException:
+        with contextlib.suppress(FileNotFoundError):
+            os.remove(temp)
+        raise
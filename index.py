@@ -0,0 +1,257 @@
+"""Byte-offset indexes for random access into recipe files.
+
+An index records the byte offsets where each recipe starts and ends in a
+file, so that a single recipe can be read and parsed without scanning every
+line before it. An index can be saved next to the file it indexes in a
+sidecar file (e.g. 'archive.mmf.idx') and reused by later runs. If the file
+has only been appended to since the sidecar was written, the index is
+extended rather than rebuilt.
+
+Use mmf.build_index or mxp.build_index to build an index for a file.
+"""
+
+from array import array
+import hashlib
+import os
+import re
+import struct
+import sys
+
+from .files import replace_file
+
+__all__ = ['RecipeIndex', 'SIDECAR_SUFFIX']
+
+SIDECAR_SUFFIX = '.idx'
+
+_MAGIC = b'RFIDX\x01'
+
+# size, mtime_ns, number of recipes, head hash, tail hash
+_header = struct.Struct('<QqQ20s20s')
+
+# Number of bytes at the start and at the end of the indexed part of the file
+# that are hashed to check whether the file has changed.
+_HASH_LENGTH = 64 * 1024
+
+
+class RecipeIndex:
+    """Represents the byte offsets of each recipe in a file.
+
+    Attributes:
+        filename: File name of the indexed file.
+        encoding: Text encoding used to decode the lines of a recipe. Must be
+            compatible with ASCII (e.g. 'utf-8', 'cp437', 'cp1252').
+        starts: Array of byte offsets for the first line of each recipe.
+        ends: Array of byte offsets just past the last line of each recipe.
+        size: Number of bytes of the file that were scanned.
+        mtime_ns: Modification time of the file when it was scanned.
+        head_hash: SHA-1 digest of the first bytes of the scanned part.
+        tail_hash: SHA-1 digest of the last bytes of the scanned part.
+    """
+
+    def __init__(self, filename, encoding):
+        """Initializes RecipeIndex with no recipes."""
+        self.filename = filename
+        self.encoding = encoding
+        self.starts = array('Q')
+        self.ends = array('Q')
+        self.size = 0
+        self.mtime_ns = 0
+        self.head_hash = b''
+        self.tail_hash = b''
+
+    def __len__(self):
+        """Returns the number of recipes in the index."""
+        return len(self.starts)
+
+    def append(self, start, end):
+        """Adds the byte offsets of a recipe to the end of the index."""
+        self.starts.append(start)
+        self.ends.append(end)
+
+    def span(self, n):
+        """Returns a tuple of the start and end byte offsets of recipe n."""
+        return self.starts[n], self.ends[n]
+
+    def read_lines(self, n):
+        """Reads the lines of recipe n from the file.
+
+        Removes trailing whitespace including newline characters from the
+        end of each line, as split_recipe_lines does.
+
+        Returns:
+            A list of strings for the recipe.
+        """
+        start, end = self.span(n)
+        with open(self.filename, 'rb') as f:
+            f.seek(start)
+            data = f.read(end - start)
+        return _split_lines(data.decode(self.encoding))
+
+    def save(self, path):
+        """Writes the index to a sidecar file.
+
+        The file is written with files.replace_file, so that other
+        processes never see a partially written index and concurrent saves
+        do not clash.
+        """
+        starts, ends = self.starts, self.ends
+        if sys.byteorder == 'big':
+            starts, ends = array('Q', starts), array('Q', ends)
+            starts.byteswap()
+            ends.byteswap()
+        with replace_file(path) as f:
+            f.write(_MAGIC)
+            f.write(_header.pack(self.size, self.mtime_ns, len(starts),
+                                 self.head_hash, self.tail_hash))
+            starts.tofile(f)
+            ends.tofile(f)
+
+    @staticmethod
+    def load(path, filename, encoding):
+        """Reads an index from a sidecar file.
+
+        Returns:
+            A RecipeIndex, or None if the sidecar file does not exist or
+            is not a valid index.
+        """
+        index = RecipeIndex(filename, encoding)
+        try:
+            with open(path, 'rb') as f:
+                if f.read(len(_MAGIC)) != _MAGIC:
+                    return None
+                (index.size, index.mtime_ns, count, index.head_hash,
+                 index.tail_hash) = _header.unpack(f.read(_header.size))
+                index.starts.fromfile(f, count)
+                index.ends.fromfile(f, count)
+        except (OSError, EOFError, struct.error):
+            return None
+        if sys.byteorder == 'big':
+            index.starts.byteswap()
+            index.ends.byteswap()
+        return index
+
+
+def load_or_build(filename, encoding, scan, sidecar=False, extend_last=False):
+    """Returns an index for a file, reusing its sidecar file if possible.
+
+    Args:
+        filename: File name of the file to index.
+        encoding: Text encoding used later to decode each recipe.
+        scan: Function taking a binary file positioned at a byte offset and
+            that offset, and yielding a tuple of the start and end byte
+            offsets of each recipe from there to the end of the file.
+        sidecar: Boolean indicating whether to read and write the index in
+            a sidecar file named filename + SIDECAR_SUFFIX.
+        extend_last: Boolean indicating whether the last recipe in the file
+            could continue if more is appended (i.e. recipes only end where
+            the next one starts). If so, the last recipe is scanned again
+            when the index is extended.
+
+    Returns:
+        A RecipeIndex for the file.
+    """
+    path = filename + SIDECAR_SUFFIX
+    index = RecipeIndex.load(path, filename, encoding) if sidecar else None
+    with open(filename, 'rb') as f:
+        stat = os.fstat(f.fileno())
+        state = _compare(index, f, stat) if index is not None else 'stale'
+        if state == 'fresh':
+            return index
+        if state == 'appended':
+            offset = _truncate_for_extend(index, extend_last)
+        else:
+            index = RecipeIndex(filename, encoding)
+            offset = 0
+        f.seek(offset)
+        for start, end in scan(f, offset):
+            index.append(start, end)
+        index.size = f.seek(0, os.SEEK_END)
+        index.mtime_ns = os.fstat(f.fileno()).st_mtime_ns
+        index.head_hash, index.tail_hash = _hash_ends(f, index.size)
+    if sidecar:
+        index.save(path)
+    return index
+
+
+def _compare(index, file, stat):
+    """Returns whether a file is 'fresh' (unchanged), 'appended' (only added
+    to at the end), or 'stale' (otherwise changed) compared to an index."""
+    if stat.st_size < index.size:
+        return 'stale'
+    if stat.st_size == index.size and stat.st_mtime_ns != index.mtime_ns:
+        return 'stale'
+    if _hash_ends(file, index.size) != (index.head_hash, index.tail_hash):
+        return 'stale'
+    if stat.st_size == index.size:
+        return 'fresh'
+    return 'appended'
+
+
+def _truncate_for_extend(index, extend_last):
+    """Removes any recipes that must be scanned again to extend the index and
+    returns the byte offset to continue scanning from."""
+    if extend_last and len(index):
+        offset = index.starts.pop()
+        index.ends.pop()
+        return offset
+    elif len(index):
+        return index.ends[-1]
+    else:
+        return 0
+
+
+def _hash_ends(file, size):
+    """Returns a tuple of SHA-1 digests of the first and last bytes of the
+    first size bytes of a binary file."""
+    file.seek(0)
+    head = hashlib.sha1(file.read(min(size, _HASH_LENGTH))).digest()
+    file.seek(max(0, size - _HASH_LENGTH))
+    tail = hashlib.sha1(file.read(min(size, _HASH_LENGTH))).digest()
+    return head, tail
+
+
+def _split_lines(text):
+    """Splits text into lines with trailing whitespace removed."""
+    if text.endswith('\n'):
+        text = text[:-1]
+    return [line.rstrip() for line in text.split('\n')]
+
+
+def _compile_line_patterns(pattern, flags=0):
+    """Compiles a pattern for lines for use with _search_lines.
+
+    Returns:
+        A tuple of a pair of regular expressions for strings and a pair for
+        bytes. The first of each pair matches a line at the start of a
+        buffer, and the second searches for a newline followed by a line.
+    """
+    flags |= re.MULTILINE
+    pattern = '(?P<line>%s)' % pattern
+    return ((re.compile(pattern, flags), re.compile('\n' + pattern, flags)),
+            (re.compile(pattern.encode('ascii'), flags),
+             re.compile(b'\n' + pattern.encode('ascii'), flags)))
+
+
+def _search_lines(regexes, buffer, pos):
+    """Searches a string or bytes-like object for the first line at or after
+    pos (the start of a line) that matches a pattern.
+
+    Searching for a newline followed by the pattern is much faster than
+    searching with '^' and re.MULTILINE, since the regular expression engine
+    can skip ahead to each newline.
+
+    Args:
+        regexes: Pair of regular expressions from _compile_line_patterns.
+        buffer: A string or bytes-like object.
+        pos: Offset of the start of a line to search from.
+
+    Returns:
+        A match object with the line in the group named 'line', or None.
+    """
+    at_start, after_newline = regexes
+    if pos == 0:
+        match = at_start.match(buffer)
+        if match:
+            return match
+        return after_newline.search(buffer)
+    return after_newline.search(buffer, pos - 1)
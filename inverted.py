@@ -0,0 +1,434 @@
+"""Inverted indexes over the ingredients and categories of recipes.
+
+An InvertedIndex maps each word of the ingredient names of a stream of
+recipes, and each category, to a sorted array of the numbers of the recipes
+that have it (their positions in the stream, from 0). Queries combine these
+posting lists with intersect (AND), union (OR) and difference (NOT), so
+that a question such as "which recipes use buttermilk and are in category
+Breads" touches only the recipes that have each term rather than every
+recipe.
+
+Ingredient names are mmf Ingredient.text, mxp Ingredient.ingredient, mx2
+Ingredient.name and fdx RecipeIngredient.ingredient (headings are skipped).
+Words are the runs of letters of a name, case folded. Categories are
+matched whole, case folded and with runs of whitespace made single spaces.
+
+An index can be saved to a file and loaded again with load, which maps the
+file into memory instead of reading it, so that loading is instant however
+big the index is and only the pages of the posting lists that queries use
+are ever read.
+
+Example:
+    with recipeformats.open('archive.mmf') as recipes:
+        build(recipes).save('archive.inv')
+    with load('archive.inv') as index:
+        numbers = index.find(ingredients=['buttermilk'], categories=['Breads'])
+"""
+
+from array import array
+import bisect
+import collections
+import functools
+import mmap
+import re
+import struct
+import sys
+
+from .files import replace_file
+
+__all__ = ['InvertedIndex', 'MappedInvertedIndex', 'build', 'load',
+           'intersect', 'union', 'difference', 'words', 'normalize_category']
+
+_MAGIC = b'RFINV\x01\x00\x00'
+
+# number of recipes
+_header = struct.Struct('<Q')
+
+# number of terms, bytes of terms, number of postings
+_section = struct.Struct('<QQQ')
+
+_offset = struct.Struct('<Q')
+
+# Intersections use binary searches into the longer list when it is this
+# many times longer than the shorter one, and set operations otherwise.
+_GALLOP_RATIO = 16
+
+_word = re.compile(r'[^\W\d_]+')
+
+
+def words(text):
+    """Returns a list of the normalized words of an ingredient name."""
+    return _word.findall(text.casefold())
+
+
+def normalize_category(name):
+    """Returns the normalized form of a category name."""
+    return ' '.join(name.casefold().split())
+
+
+class _Queries:
+    """Queries shared by InvertedIndex and MappedInvertedIndex, which provide
+    __len__ and _postings."""
+
+    __slots__ = ()
+
+    def ingredient(self, text):
+        """Returns an array of the numbers of the recipes with an ingredient
+        name containing each word of text (perhaps in different
+        ingredients)."""
+        terms = words(text)
+        if not terms:
+            return array('I')
+        return intersect(*[self._postings(0, term) for term in terms])
+
+    def category(self, name):
+        """Returns an array of the numbers of the recipes in a category."""
+        return array('I', self._postings(1, normalize_category(name)))
+
+    def find(self, ingredients=(), categories=(), any_ingredients=(),
+             any_categories=(), exclude_ingredients=(), exclude_categories=()):
+        """Finds the recipes matching every condition given.
+
+        Args:
+            ingredients: Iterable of ingredient names (see ingredient) that
+                must all be used.
+            categories: Iterable of categories the recipes must all be in.
+            any_ingredients: Iterable of ingredient names of which at least
+                one must be used, if any are given.
+            any_categories: Iterable of categories of which the recipes must
+                be in at least one, if any are given.
+            exclude_ingredients: Iterable of ingredient names that must not
+                be used.
+            exclude_categories: Iterable of categories the recipes must not
+                be in.
+
+        Returns:
+            A sorted array of recipe numbers. With no conditions other than
+            exclusions, the exclusions are applied to every recipe.
+        """
+        required = [self.ingredient(text) for text in ingredients]
+        required.extend(self.category(name) for name in categories)
+        any_ingredients = list(any_ingredients)
+        any_categories = list(any_categories)
+        if any_ingredients:
+            required.append(union(*[self.ingredient(t) for t in any_ingredients]))
+        if any_categories:
+            required.append(union(*[self.category(n) for n in any_categories]))
+        result = intersect(*required) if required else range(len(self))
+        excluded = [self.ingredient(text) for text in exclude_ingredients]
+        excluded.extend(self.category(name) for name in exclude_categories)
+        if excluded:
+            return difference(result, *excluded)
+        return array('I', result)
+
+
+class InvertedIndex(_Queries):
+    """Represents an inverted index built in memory.
+
+    Attributes:
+        ingredients: Dictionary of each word of the ingredient names to an
+            array of the numbers of the recipes using it.
+        categories: Dictionary of each normalized category to an array of
+            the numbers of the recipes in it.
+        count: Number of recipes added.
+    """
+
+    __slots__ = ('ingredients', 'categories', 'count')
+
+    def __init__(self):
+        """Initializes InvertedIndex with no recipes."""
+        new_postings = functools.partial(array, 'I')
+        self.ingredients = collections.defaultdict(new_postings)
+        self.categories = collections.defaultdict(new_postings)
+        self.count = 0
+
+    def __len__(self):
+        """Returns the number of recipes in the index."""
+        return self.count
+
+    def add(self, recipe):
+        """Adds a Recipe of any format to the index.
+
+        Returns:
+            The number of the recipe.
+        """
+        number = self.count
+        format = type(recipe).__module__.rpartition('.')[2]
+        names, categories = _extractors[format](recipe)
+        terms = set()
+        for name in names:
+            terms.update(words(name))
+        ingredients = self.ingredients
+        for term in terms:
+            ingredients[term].append(number)
+        for name in set(map(normalize_category, categories)):
+            if name:
+                self.categories[name].append(number)
+        self.count = number + 1
+        return number
+
+    def _postings(self, section, term):
+        postings = self.categories if section else self.ingredients
+        return postings.get(term, ())
+
+    def save(self, path):
+        """Writes the index to a file that load can map into memory.
+
+        The file is written with files.replace_file, so that other
+        processes never see a partially written index and concurrent saves
+        do not clash. It gets the usual permissions (0o666 less the umask),
+        so other services can map a shared index.
+        """
+        with replace_file(path) as f:
+            f.write(_MAGIC)
+            f.write(_header.pack(self.count))
+            for postings in (self.ingredients, self.categories):
+                _write_section(f, postings)
+
+
+def _write_section(file, postings):
+    """Writes the terms and posting lists of a dictionary to a binary file.
+
+    A section is a header (_section), the byte offset of each term and of
+    the end of the last one, the offset of the first posting of each term
+    and of the end of the last one (all unsigned 64-bit), the UTF-8 terms in
+    sorted order, and the postings (unsigned 32-bit). Every part starts at
+    a multiple of 8 bytes, and all numbers are little-endian.
+    """
+    terms = sorted(term for term, numbers in postings.items() if numbers)
+    encoded = [term.encode('utf-8') for term in terms]
+    term_offsets = array('Q', [0])
+    posting_offsets = array('Q', [0])
+    for term, data in zip(terms, encoded):
+        term_offsets.append(term_offsets[-1] + len(data))
+        posting_offsets.append(posting_offsets[-1] + len(postings[term]))
+    term_bytes = term_offsets[-1]
+    posting_count = posting_offsets[-1]
+    file.write(_section.pack(len(terms), term_bytes, posting_count))
+    if sys.byteorder == 'big':
+        term_offsets.byteswap()
+        posting_offsets.byteswap()
+    term_offsets.tofile(file)
+    posting_offsets.tofile(file)
+    file.write(b''.join(encoded))
+    file.write(_padding(term_bytes))
+    for term in terms:
+        numbers = postings[term]
+        if sys.byteorder == 'big':
+            numbers = array('I', numbers)
+            numbers.byteswap()
+        numbers.tofile(file)
+    file.write(_padding(4 * posting_count))
+
+
+def _padding(length):
+    """Returns the zero bytes that pad length bytes to a multiple of 8."""
+    return bytes(-length % 8)
+
+
+def build(recipes):
+    """Builds an inverted index.
+
+    Args:
+        recipes: Iterable of Recipe objects of any format (e.g. from
+            parse_recipes, iter_recipes or recipeformats.open), numbered
+            from 0 in order.
+
+    Returns:
+        An InvertedIndex.
+    """
+    index = InvertedIndex()
+    for recipe in recipes:
+        index.add(recipe)
+    return index
+
+
+class MappedInvertedIndex(_Queries):
+    """Represents an inverted index in a file mapped into memory.
+
+    Terms are found by binary search of the sorted terms in the file, and
+    the posting lists of a query are copied out of the file, so nothing is
+    read until it is needed. Use close (or a with statement) to unmap the
+    file.
+
+    Attributes:
+        path: File name of the index.
+        count: Number of recipes in the index.
+    """
+
+    __slots__ = ('path', 'count', '_map', '_sections')
+
+    def __init__(self, path):
+        """Initializes MappedInvertedIndex by mapping a file from save.
+
+        Raises:
+            ValueError: If the file is not an inverted index.
+        """
+        self.path = path
+        with open(path, 'rb') as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        try:
+            if self._map[:len(_MAGIC)] != _MAGIC:
+                raise ValueError('not an inverted index: %r' % path)
+            position = len(_MAGIC)
+            self.count, = _header.unpack_from(self._map, position)
+            position += _header.size
+            self._sections = []
+            for _ in range(2):
+                section = _MappedSection(self._map, position)
+                self._sections.append(section)
+                position = section.end
+        except (ValueError, struct.error):
+            self._map.close()
+            raise ValueError('not an inverted index: %r' % path) from None
+
+    def __len__(self):
+        """Returns the number of recipes in the index."""
+        return self.count
+
+    def close(self):
+        """Unmaps the file."""
+        self._map.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def terms(self, section):
+        """Returns a list of the ingredient words (section 'ingredients') or
+        normalized categories (section 'categories') in the index."""
+        mapped = self._sections[('ingredients', 'categories').index(section)]
+        return [mapped.term(n).decode('utf-8') for n in range(len(mapped))]
+
+    def _postings(self, section, term):
+        return self._sections[section].postings(term.encode('utf-8'))
+
+
+class _MappedSection:
+    """The terms and posting lists of one section of a mapped index file
+    (see _write_section), as a sequence of the encoded terms."""
+
+    __slots__ = ('map', 'length', 'term_offsets', 'posting_offsets', 'term_data',
+                 'posting_data', 'end')
+
+    def __init__(self, map, position):
+        self.map = map
+        self.length, term_bytes, posting_count = _section.unpack_from(map, position)
+        self.term_offsets = position + _section.size
+        self.posting_offsets = self.term_offsets + 8 * (self.length + 1)
+        self.term_data = self.posting_offsets + 8 * (self.length + 1)
+        self.posting_data = self.term_data + term_bytes + len(_padding(term_bytes))
+        self.end = self.posting_data + 4 * posting_count + len(_padding(4 * posting_count))
+        if self.end > len(map):
+            raise ValueError('truncated section')
+
+    def __len__(self):
+        return self.length
+
+    def __getitem__(self, n):
+        return self.term(n)
+
+    def term(self, n):
+        """Returns the UTF-8 bytes of term n."""
+        start, = _offset.unpack_from(self.map, self.term_offsets + 8 * n)
+        end, = _offset.unpack_from(self.map, self.term_offsets + 8 * (n + 1))
+        return self.map[self.term_data + start:self.term_data + end]
+
+    def postings(self, term):
+        """Returns an array of the postings of the UTF-8 bytes of a term."""
+        n = bisect.bisect_left(self, term)
+        numbers = array('I')
+        if n == self.length or self.term(n) != term:
+            return numbers
+        start, = _offset.unpack_from(self.map, self.posting_offsets + 8 * n)
+        end, = _offset.unpack_from(self.map, self.posting_offsets + 8 * (n + 1))
+        numbers.frombytes(self.map[self.posting_data + 4 * start:self.posting_data + 4 * end])
+        if sys.byteorder == 'big':
+            numbers.byteswap()
+        return numbers
+
+
+def load(path):
+    """Maps an index written by InvertedIndex.save into memory.
+
+    Returns:
+        A MappedInvertedIndex.
+
+    Raises:
+        ValueError: If the file is not an inverted index.
+    """
+    return MappedInvertedIndex(path)
+
+
+def intersect(*lists):
+    """Returns a sorted array of the numbers in every one of some sorted
+    sequences of numbers (AND)."""
+    if not lists:
+        return array('I')
+    lists = sorted(lists, key=len)
+    result = lists[0]
+    for other in lists[1:]:
+        if not result:
+            break
+        if len(other) > _GALLOP_RATIO * len(result):
+            result = _search_each(result, other)
+        else:
+            result = sorted(set(result).intersection(other))
+    return array('I', result)
+
+
+def _search_each(shorter, longer):
+    """Returns a list of the numbers of a short sorted sequence that are in a
+    long one, found by binary search."""
+    found = []
+    low = 0
+    end = len(longer)
+    for number in shorter:
+        low = bisect.bisect_left(longer, number, low)
+        if low == end:
+            break
+        if longer[low] == number:
+            found.append(number)
+    return found
+
+
+def union(*lists):
+    """Returns a sorted array of the numbers in any of some sorted sequences
+    of numbers (OR)."""
+    if len(lists) == 1:
+        return array('I', lists[0])
+    return array('I', sorted(set().union(*lists)))
+
+
+def difference(numbers, *lists):
+    """Returns a sorted array of the numbers of a sorted sequence that are in
+    none of some other sequences (NOT)."""
+    excluded = set().union(*lists)
+    if not excluded:
+        return array('I', numbers)
+    return array('I', [n for n in numbers if n not in excluded])
+
+
+def _mmf_terms(recipe):
+    return ([i.text for i in recipe.ingredients if not i.is_heading],
+            recipe.categories)
+
+
+def _mxp_terms(recipe):
+    return [i.ingredient for i in recipe.ingredients], recipe.categories
+
+
+def _mx2_terms(recipe):
+    return ([i.name for i in recipe.ingredients if i.code != 'S'],
+            recipe.categories)
+
+
+def _fdx_terms(recipe):
+    return ([i.ingredient for i in recipe.ingredients if i.heading != 'Y'],
+            recipe.recipe_types.split(','))
+
+
+_extractors = {'mmf': _mmf_terms, 'mxp': _mxp_terms, 'mx2': _mx2_terms,
+               'fdx': _fdx_terms}
@@ -0,0 +1,42 @@
+"""Helpers for records whose remaining lines are parsed on first access.
+
+mmf.LazyRecipe and mxp.LazyRecipe parse the title and other header
+attributes of a recipe right away, and keep the rest of its lines in a
+'_body' slot (a tuple of the current line and the remaining lines, or None
+once parsed). The attributes parsed from the body are properties made with
+lazy_slot, which call the _parse_body method of the record first.
+"""
+
+__all__ = ['lazy_slot', 'parse_body']
+
+
+def lazy_slot(cls, name):
+    """Returns a property for a lazy subclass of cls that parses the body of
+    the record before getting or setting the slot of cls with a name."""
+    slot = getattr(cls, name)
+
+    def get(self):
+        if self._body is not None:
+            self._parse_body()
+        return slot.__get__(self, cls)
+
+    def set(self, value):
+        if self._body is not None:
+            self._parse_body()
+        slot.__set__(self, value)
+
+    return property(get, set)
+
+
+def parse_body(record, stages):
+    """Parses the body of a lazy record with a sequence of stage functions,
+    each taking a line iterator, the current line and the record and
+    returning the new current line."""
+    current, lines = record._body
+    record._body = None
+    it = iter(lines)
+    try:
+        for stage in stages:
+            current = stage(it, current, record)
+    except StopIteration:
+        pass
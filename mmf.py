@@ -4,15 +4,36 @@ Use parse_recipes to parse multiple recipes.
 Use parse_recipe to parse a single recipe.
 Use split_recipe_lines to yield a list of lines for each recipe that can be
 passed into parse_recipe to parse only a single recipe out of multiple recipes.
+Use split_recipe_buffer to do the same for a whole string, bytes or mmap.
+Use parse_buffer to parse multiple recipes from bytes or mmap, detecting the
+text encoding if it is not given.
+Use scan_headers to parse only the title, categories and yield of each recipe.
+Pass a ResyncPolicy to split_recipe_lines or parse_recipes to limit the size
+of each recipe and report recipes with missing footers in damaged files.
+Use build_index to record the byte offsets of each recipe in a file and
+parse_recipe_at to parse a single recipe from the file using the index.
+Use parse_recipes_parallel to parse a large file with multiple processes,
+or split_file to split it into ranges of whole recipes for other workers.
 
 You may run into issues with text encoding, as Meal-Master is an old program.
-You may have to use something like encoding='cp437' depending on the file.
+You may have to use something like encoding='cp437' depending on the file,
+or let parse_buffer detect the encoding.
 """
 
+import mmap
+import os
 import re
 
-__all__ = ['Recipe', 'Ingredient', 'parse_recipes', 'parse_recipe',
-           'split_recipe_lines']
+from .charsets import _prepare_buffer
+from .index import load_or_build, _compile_line_patterns, _search_lines, _split_lines
+from .lazy import lazy_slot, parse_body
+from .parallel import split_ranges, map_ranges
+
+__all__ = ['Recipe', 'LazyRecipe', 'Ingredient', 'RecipeHeader',
+           'ResyncPolicy', 'ResyncDiagnostic', 'parse_recipes',
+           'parse_recipe', 'split_recipe_lines', 'split_recipe_buffer',
+           'parse_buffer', 'scan_headers', 'build_index', 'parse_recipe_at',
+           'parse_recipes_parallel', 'split_file']
 
 class Recipe:
     """Represents a Meal-Master recipe.
@@ -26,6 +47,9 @@ class Recipe:
         directions: A list of strings representing steps or paragraphs.
     """
 
+    __slots__ = ('title', 'categories', 'yield_', 'servings', 'ingredients',
+                 'directions')
+
     def __init__(self):
         """Initializes Recipe with default values."""
         self.title = ''
@@ -36,9 +60,33 @@ class Recipe:
         self.directions = []
 
 
+class LazyRecipe(Recipe):
+    """Represents a recipe that parses the rest of its lines on first access.
+
+    The ingredients and directions are parsed together when either of them
+    is first read or set. The other attributes are parsed right away.
+    """
+
+    __slots__ = ('_body',)
+
+    ingredients = lazy_slot(Recipe, 'ingredients')
+    directions = lazy_slot(Recipe, 'directions')
+
+    def __init__(self):
+        """Initializes LazyRecipe with default values and nothing to parse."""
+        self._body = None # tuple (current line, remaining lines)
+        super().__init__()
+
+    def _parse_body(self):
+        """Parses the remaining lines of the recipe."""
+        parse_body(self, _body_stages)
+
+
 class Ingredient:
     """Represents an ingredient or ingredient heading from a Meal-Master recipe."""
 
+    __slots__ = ('quantity', 'unit', 'text', 'is_heading')
+
     def __init__(self, quantity, unit, text, is_heading):
         """Initializes Ingredient with the specified values.
 
@@ -72,7 +120,92 @@ class Ingredient:
             return (self.quantity + ' ' + (self.unit + ' ' + self.text).strip()).strip()
 
 
-def parse_recipes(lines):
+class RecipeHeader:
+    """Represents the title, categories and yield of a Meal-Master recipe.
+
+    Attributes:
+        title: A string for the recipe title.
+        categories: A list of strings for each category.
+        yield_: A string (perhaps empty) for the yield (e.g. '24 muffins').
+        servings: An integer (perhaps 0) of the number of servings specified.
+        offset: An integer position of the first line of the recipe in the
+            scanned lines (0 for the first line).
+        length: An integer number of lines in the recipe.
+    """
+
+    __slots__ = ('title', 'categories', 'yield_', 'servings', 'offset', 'length')
+
+    def __init__(self):
+        """Initializes RecipeHeader with default values."""
+        self.title = ''
+        self.categories = []
+        self.yield_ = ''
+        self.servings = 0
+        self.offset = 0
+        self.length = 0
+
+
+class ResyncPolicy:
+    """Represents how split_recipe_lines recovers from malformed recipes.
+
+    A recipe that grows past max_lines or max_chars before its footer is
+    skipped, up to its footer or the next header, so that damaged files
+    cannot build up huge lists of lines. Each recipe that is skipped or
+    missing its footer is reported in diagnostics.
+
+    Attributes:
+        max_lines: Integer maximum number of lines in a recipe, or None for
+            no limit.
+        max_chars: Integer maximum number of characters in a recipe (not
+            counting trailing white space), or None for no limit.
+        header_ends_recipe: Boolean indicating whether a header before the
+            footer ends the recipe as if there were a footer (True) or
+            causes the recipe to be skipped (False).
+        diagnostics: A list of ResyncDiagnostic, one for each recipe that
+            was skipped or was missing its footer.
+    """
+
+    def __init__(self, max_lines=2000, max_chars=200000, header_ends_recipe=True):
+        """Initializes ResyncPolicy with the specified limits and no diagnostics."""
+        self.max_lines = max_lines
+        self.max_chars = max_chars
+        self.header_ends_recipe = header_ends_recipe
+        self.diagnostics = []
+
+    def report(self, start, end, reason, skipped):
+        """Adds a ResyncDiagnostic to diagnostics."""
+        self.diagnostics.append(ResyncDiagnostic(start, end, reason, skipped))
+
+
+class ResyncDiagnostic:
+    """Represents a malformed recipe found by split_recipe_lines.
+
+    Attributes:
+        start: Integer position of the first line of the recipe in the
+            split lines (0 for the first line).
+        end: Integer position just after the last line of the recipe, or of
+            the last line skipped after it.
+        reason: 'too long' if the recipe went over a limit of the policy,
+            'header before footer' if another header came first, or 'end
+            before footer' if the lines ended first.
+        skipped: Boolean indicating whether the recipe was skipped (True) or
+            yielded without a footer (False).
+    """
+
+    __slots__ = ('start', 'end', 'reason', 'skipped')
+
+    def __init__(self, start, end, reason, skipped):
+        """Initializes ResyncDiagnostic with the specified values."""
+        self.start = start
+        self.end = end
+        self.reason = reason
+        self.skipped = skipped
+
+    def __repr__(self):
+        return '{%d} {%d} {%s} {%s}' % (self.start, self.end, self.reason, self.skipped)
+
+
+def parse_recipes(lines, stats=None, lazy=False, resync=None):
     """Parses multiple recipes from the given lines.
 
     Parses multiple recipes when given an iterable of strings. The lines
@@ -80,40 +213,210 @@ def parse_recipes(lines):
 
     Args:
         lines: An iterable of strings containing the lines of multiple recipes.
+        stats: Optional profiling.ParseStats to record statistics for each
+            parsing stage in.
+        lazy: Boolean indicating whether to return LazyRecipe objects, whose
+            ingredients and directions are only parsed when first accessed.
+            Ignored if stats is given.
+        resync: Optional ResyncPolicy passed to split_recipe_lines.
 
     Yields:
         A Recipe corresponding to each of the recipes in the given lines.
     """
-    return (parse_recipe(recipe_lines) for recipe_lines in split_recipe_lines(lines))
+    return (parse_recipe(recipe_lines, stats, lazy)
+            for recipe_lines in split_recipe_lines(lines, resync))
 
 
-def split_recipe_lines(lines):
+def split_recipe_lines(lines, resync=None):
     """Breaks up multiple recipes into lists of lines for each recipe.
     
     Takes an iterable of lines corresponding to multiple recipes and yields
     a list of lines for each of the recipes. Removes trailing whitespace
     including newline characters from the end of each line.
 
+    Without a resync policy, a recipe without a footer continues until the
+    next footer, and a header before the footer starts the recipe over.
+
     Args:
         lines: An iterable of strings containing the lines of multiple recipes.
+        resync: Optional ResyncPolicy to limit the size of each recipe and
+            report recipes that are missing a footer.
 
     Yields:
         A list of strings for each recipe.
     """
-    found_recipe = False
-    recipe_lines = []
+    if resync is not None:
+        return _split_recipe_lines_resync(lines, resync)
+    return _split_recipe_lines(lines)
+
+
+def _split_recipe_lines(lines):
+    """Yields a list of lines for each recipe, as split_recipe_lines does
+    without a ResyncPolicy."""
+    recipe_lines = None # None when not in a recipe
     for line in lines:
         line = line.rstrip()
-        if _is_mmf_header(line):
-            found_recipe = True
-            recipe_lines = []
-        recipe_lines.append(line)
-        if found_recipe and _is_mmf_footer(line):
-            found_recipe = False
-            yield recipe_lines
+        # Headers and footers both start with '-' or 'M', so any other line
+        # needs no further checks.
+        if line[:1] in _marker_chars:
+            if _is_mmf_header(line):
+                recipe_lines = [line]
+                continue
+            if recipe_lines is not None and _is_mmf_footer(line):
+                recipe_lines.append(line)
+                yield recipe_lines
+                recipe_lines = None
+                continue
+        if recipe_lines is not None:
+            recipe_lines.append(line)
+
+
+def _split_recipe_lines_resync(lines, policy):
+    """Yields a list of lines for each recipe, as split_recipe_lines does
+    with a ResyncPolicy."""
+    max_lines = policy.max_lines if policy.max_lines is not None else float('inf')
+    max_chars = policy.max_chars if policy.max_chars is not None else float('inf')
+    recipe_lines = None # None when not in a recipe
+    skipping = False # whether skipping the rest of a recipe that is too long
+    start = 0
+    chars = 0
+    number = -1
+    for number, line in enumerate(lines):
+        line = line.rstrip()
+        if line[:1] in _marker_chars:
+            if _is_mmf_header(line):
+                if skipping:
+                    policy.report(start, number, 'too long', True)
+                elif recipe_lines is not None:
+                    skipped = not policy.header_ends_recipe
+                    policy.report(start, number, 'header before footer', skipped)
+                    if not skipped:
+                        yield recipe_lines
+                recipe_lines = [line]
+                skipping = False
+                start = number
+                chars = len(line)
+                continue
+            if _is_mmf_footer(line):
+                if skipping:
+                    policy.report(start, number + 1, 'too long', True)
+                    skipping = False
+                    continue
+                if recipe_lines is not None:
+                    recipe_lines.append(line)
+                    yield recipe_lines
+                    recipe_lines = None
+                    continue
+        if recipe_lines is not None:
+            recipe_lines.append(line)
+            chars += len(line)
+            if len(recipe_lines) > max_lines or chars > max_chars:
+                # Stop keeping lines and skip ahead to the next footer or header.
+                recipe_lines = None
+                skipping = True
+    if skipping:
+        policy.report(start, number + 1, 'too long', True)
+    elif recipe_lines is not None:
+        policy.report(start, number + 1, 'end before footer', True)
+
+
+def split_recipe_buffer(buffer, encoding='utf-8'):
+    """Breaks up multiple recipes in a buffer into lists of lines for each recipe.
+
+    Yields the same lists of lines as split_recipe_lines, but finds each
+    header and footer with a regular expression search over the whole
+    buffer, so the text between recipes (e.g. in Usenet digests) is skipped
+    without looking at each of its lines. Lines are separated by '\n'
+    (optionally preceded by '\r').
+
+    Args:
+        buffer: A string, or a bytes-like object (e.g. bytes or mmap.mmap)
+            containing multiple recipes.
+        encoding: Text encoding to decode each recipe with if buffer is not
+            a string. Must be compatible with ASCII (e.g. 'utf-8', 'cp437').
+
+    Yields:
+        A list of strings for each recipe.
+    """
+    if isinstance(buffer, str):
+        for start, end in _iter_recipe_spans(buffer):
+            yield _split_lines(buffer[start:end])
+    else:
+        for start, end in _iter_recipe_spans(buffer):
+            yield _split_lines(str(buffer[start:end], encoding))
+
+
+def parse_buffer(buffer, encoding=None, stats=None, lazy=False):
+    """Parses multiple recipes from a bytes-like object.
+
+    Args:
+        buffer: A bytes-like object (e.g. bytes or mmap.mmap) containing
+            multiple recipes.
+        encoding: Text encoding of the buffer, or None to detect it from
+            the first bytes of the buffer with charsets.detect_encoding
+            (falling back to 'cp437').
+        stats: Optional profiling.ParseStats to record statistics for each
+            parsing stage in.
+        lazy: Boolean indicating whether to return LazyRecipe objects (see
+            parse_recipes).
+
+    Yields:
+        A Recipe corresponding to each of the recipes in the buffer.
+    """
+    buffer, encoding = _prepare_buffer(buffer, encoding, 'cp437')
+    return (parse_recipe(recipe_lines, stats, lazy)
+            for recipe_lines in split_recipe_buffer(buffer, encoding))
+
+
+def scan_headers(lines):
+    """Parses only the title, categories and yield of multiple recipes.
 
+    Finds the same recipes as split_recipe_lines, but keeps only the few
+    lines at the start of each recipe that the title, categories and yield
+    can be on, and does not parse ingredients or directions. The offset and
+    length of each RecipeHeader can be used to parse the whole recipe later,
+    e.g. next(parse_recipes(lines[header.offset:header.offset + header.length])).
 
-def parse_recipe(lines):
+    Args:
+        lines: An iterable of strings containing the lines of multiple recipes.
+
+    Yields:
+        A RecipeHeader corresponding to each of the recipes in the given lines.
+    """
+    header_lines = None
+    for offset, line in enumerate(lines):
+        line = line.rstrip()
+        if line[:1] in _marker_chars:
+            if _is_mmf_header(line):
+                start = offset
+                header_lines = [line]
+                continue
+            if header_lines is not None and _is_mmf_footer(line):
+                header = RecipeHeader()
+                _parse_header_lines(header_lines, header)
+                header.offset = start
+                header.length = offset + 1 - start
+                header_lines = None
+                yield header
+                continue
+        # The header stages skip empty lines and look at no more than one
+        # other line each.
+        if header_lines is not None and line and len(header_lines) < len(_header_stages):
+            header_lines.append(line)
+
+
+def _parse_header_lines(lines, recipe):
+    """Runs only the header stages of parse_recipe over the given lines."""
+    it = iter(lines)
+    current = ''
+    try:
+        for stage in _header_stages:
+            current = stage(it, current, recipe)
+    except StopIteration:
+        pass
+
+
+def parse_recipe(lines, stats=None, lazy=False):
     """Parses a recipe from the given lines.
 
     Parses a single recipe when given an iterable of strings. These lines
@@ -121,10 +424,21 @@ def parse_recipe(lines):
 
     Args:
         lines: An iterable of strings containing the lines of the recipe.
+        stats: Optional profiling.ParseStats to record statistics for each
+            parsing stage in.
+        lazy: Boolean indicating whether to return a LazyRecipe, whose
+            ingredients and directions are only parsed when first accessed.
+            Ignored if stats is given.
 
     Returns:
         A Recipe corresponding to the given lines.
     """
+    if stats is not None:
+        recipe = Recipe()
+        stats.run(_stages, lines, recipe)
+        return recipe
+    if lazy:
+        return _parse_lazy_recipe(lines)
     recipe = Recipe()
     it = iter(lines)
     current = ''
@@ -140,6 +454,152 @@ def parse_recipe(lines):
     return recipe
 
 
+def _parse_lazy_recipe(lines):
+    """Returns a LazyRecipe with the header stages of parse_recipe run and
+    the remaining lines kept for the other stages."""
+    recipe = LazyRecipe()
+    it = iter(lines)
+    current = ''
+    try:
+        for stage in _header_stages:
+            current = stage(it, current, recipe)
+    except StopIteration:
+        return recipe
+    recipe._body = current, list(it)
+    return recipe
+
+
+def build_index(filename, encoding='utf-8', sidecar=False):
+    """Builds an index of the byte offsets of each recipe in a file.
+
+    Scans the raw bytes of the file once, using the same header and footer
+    rules as split_recipe_lines.
+
+    Args:
+        filename: File name of the .mmf file to index.
+        encoding: Text encoding used later to decode each recipe. Must be
+            compatible with ASCII (e.g. 'utf-8', 'cp437', 'cp1252').
+        sidecar: Boolean indicating whether to reuse and update a sidecar
+            index file (e.g. 'archive.mmf.idx') next to the file. The file
+            is only scanned again if it has changed, and only from the end
+            of the last recipe if it has only been appended to.
+
+    Returns:
+        A RecipeIndex for the file.
+    """
+    return load_or_build(filename, encoding, _scan_recipe_offsets, sidecar)
+
+
+def parse_recipe_at(index, n):
+    """Parses a single recipe from an indexed file.
+
+    Seeks directly to the recipe and reads only its lines.
+
+    Args:
+        index: A RecipeIndex returned from build_index.
+        n: Integer position of the recipe in the file (0 for the first).
+
+    Returns:
+        A Recipe corresponding to the recipe at position n.
+    """
+    return parse_recipe(index.read_lines(n))
+
+
+def _scan_recipe_offsets(file, offset=0):
+    """Yields a tuple of the start and end byte offsets of each recipe in a
+    binary file from the given byte offset."""
+    if os.fstat(file.fileno()).st_size <= offset:
+        return
+    with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        yield from _iter_recipe_spans(buffer, offset)
+
+
+# Header lines (which must contain more than white space after the dashes)
+# and footer lines including their newline, as split_recipe_lines finds
+# them after removing trailing white space.
+_header_pattern = r'(?:---------- |MMMMM----- ).*?\S'
+_footer_pattern = r'(?:-----|MMMMM)[^\S\n]*(?:\n|\Z)'
+_header_res = _compile_line_patterns(_header_pattern)
+_boundary_res = _compile_line_patterns(
+    '(?P<header>%s)|%s' % (_header_pattern, _footer_pattern))
+_footer_res = _compile_line_patterns(_footer_pattern)
+
+
+def _iter_recipe_spans(buffer, pos=0):
+    """Yields a tuple of the start and end offsets of each recipe in a string
+    or bytes-like object, from its header line to just past its footer line.
+
+    Only the header and footer lines are matched, so the text between
+    recipes is skipped over by the regular expression search.
+    """
+    binary = not isinstance(buffer, str)
+    header_res, boundary_res = _header_res[binary], _boundary_res[binary]
+    match = _search_lines(header_res, buffer, pos)
+    while match:
+        start = match.start('line')
+        match = _search_lines(boundary_res, buffer, match.end() + 1)
+        # A header before the footer starts the recipe over.
+        while match and match.group('header') is not None:
+            start = match.start('line')
+            match = _search_lines(boundary_res, buffer, match.end() + 1)
+        if not match:
+            return
+        yield start, match.end()
+        match = _search_lines(header_res, buffer, match.end())
+
+
+def parse_recipes_parallel(filename, workers=None, ordered=True,
+                           encoding='utf-8', chunk_size=None):
+    """Parses multiple recipes from a file using multiple processes.
+
+    Splits the file into byte ranges that end just after a recipe footer and
+    parses each range in a pool of worker processes.
+
+    Args:
+        filename: File name of the .mmf file to parse.
+        workers: Number of worker processes, or None for the CPU count.
+        ordered: Boolean indicating whether recipes are yielded in the order
+            they appear in the file (True) or in whatever order the ranges
+            are finished (False), which can be faster.
+        encoding: Text encoding of the file. Must be compatible with ASCII
+            (e.g. 'utf-8', 'cp437', 'cp1252').
+        chunk_size: Approximate size in bytes of each range, or None to
+            choose a size based on the file size and number of workers.
+
+    Yields:
+        A Recipe corresponding to each of the recipes in the file.
+    """
+    workers = workers or os.cpu_count() or 1
+    ranges = split_file(filename, workers, chunk_size)
+    return map_ranges(_parse_range, (filename, encoding), ranges, workers, ordered)
+
+
+def split_file(filename, workers, chunk_size=None):
+    """Splits a .mmf file into byte ranges of whole recipes, each ending just
+    after a recipe footer (see parallel.split_ranges).
+
+    Returns:
+        A list of tuples of the start and end byte offsets of each range.
+    """
+    return split_ranges(filename, _find_footer_boundary, workers, chunk_size)
+
+
+def _find_footer_boundary(file, offset):
+    """Returns the byte offset just after the first footer line that starts
+    at or after the given offset, or the end of the file."""
+    with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        match = _search_lines(_footer_res[True], buffer, offset)
+        return match.end() if match else len(buffer)
+
+
+def _parse_range(filename, encoding, start, end):
+    """Returns a list of Recipe parsed from a byte range of a file."""
+    with open(filename, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    return [parse_recipe(lines) for lines in split_recipe_buffer(data.decode(encoding))]
+
+
 def _skip_empty(it, current):
     """Skips empty lines from the iterator and returns the current (non-empty) line."""
     while _is_empty(current):
@@ -258,16 +718,19 @@ def _parse_ingredients(it, current, recipe):
     and empty lines.
     """
     ingredients = [] # list of tuples (text, is_heading)
+    match_line = _line_re.match
     try:
         while True:
-            heading = _get_ingredient_heading(current)
-            if heading:
-                ingredients.append((heading, True))
-            elif _is_ingredient(current):
+            match = match_line(current)
+            kind = match.lastgroup if match else 'text'
+            if kind == 'ingredient':
                 ingredients.append((current, False))
-            elif _is_empty(current):
-                pass
-            else:
+            elif kind == 'heading':
+                heading = match.group('heading').strip()
+                if not heading:
+                    break
+                ingredients.append((heading, True))
+            elif kind != 'blank':
                 break
             current = next(it)
     finally:
@@ -307,6 +770,27 @@ def _get_ingredient_heading(line):
     return match.group(1).strip()
 
 
+# Kinds of line for _parse_ingredients, which classifies each line with one
+# match. The alternatives are tried in order so that the first one that
+# matches decides the kind (e.g. a line of spaces long enough to be an
+# ingredient is an ingredient rather than blank). The heading and ingredient
+# alternatives are the same as _heading_re and _ingredient_re, blank is the
+# same as _is_empty, footer and header are the same as _is_mmf_footer and
+# _is_mmf_header, and metadata is the same as _test_metadata. Any line that
+# matches none of them is text.
+_line_re = re.compile(r"""
+    (?:MMMMM)?-----+(?P<heading>[^-]+)-----+
+  | (?P<ingredient>[\d\./\ ]{7}\ [A-Za-z\ ]{2}\ )
+  | (?P<blank>\s*\Z)
+  | (?P<footer>(?:-----|MMMMM)\Z)
+  | (?P<header>(?:----------|MMMMM-----)\ )
+  | (?P<metadata>\s*[^:\s][^:]*:)
+""", re.VERBOSE)
+
+# First characters of header and footer lines.
+_marker_chars = frozenset('-M')
+
+
 def _get_ingredients(line_pairs):
     """Gets a list of Ingredient from provided ingredients.
 
@@ -358,8 +842,9 @@ def _add_ingredients(ingredients, column1, column2):
     # then add the ingredient.
     previous = ''
     for ingredient in column1:
-        if ingredient.lstrip().startswith('-'):
-            previous = previous.rstrip() + ' ' + ingredient.lstrip()[1:].strip()
+        stripped = ingredient.lstrip()
+        if stripped.startswith('-'):
+            previous = previous.rstrip() + ' ' + stripped[1:].strip()
         else:
             if previous.lstrip():
                 ingredients.append(_get_ingredient(previous))
@@ -403,7 +888,8 @@ def _paragraphize_directions(lines):
     directions = []
     current = ''
     for line in lines:
-        if _is_empty(line):
+        stripped = line.strip()
+        if not stripped:
             if current:
                 directions.append(current)
                 current = ''
@@ -415,7 +901,26 @@ def _paragraphize_directions(lines):
                 current = ''
         else:
             if current: current += ' '
-            current += line.strip()
+            current += stripped
     if current:
         directions.append(current)
-    return directions
\ No newline at end of file
+    return directions
+
+
+# Stages of parse_recipe in the order they run, for profiling.ParseStats.
+_stages = (_parse_mmf_header,
+           _parse_title,
+           _parse_categories,
+           _parse_yield,
+           _parse_ingredients,
+           _parse_directions)
+
+# Stages of parse_recipe that scan_headers runs.
+_header_stages = (_parse_mmf_header,
+                  _parse_title,
+                  _parse_categories,
+                  _parse_yield)
+
+# Stages of parse_recipe that LazyRecipe runs on first access.
+_body_stages = (_parse_ingredients,
+                _parse_directions)
@@ -1,11 +1,19 @@
 """Recipe parsing for MasterCook 5+ format (.mx2) files.
 
 Use parse_file to parse a file.
+Use iter_recipes to parse a file incrementally, one recipe at a time.
+Both accept gzip, bzip2, xz and single-file zip compressed files (see
+sources.open_source).
 """
 
+import itertools
+import re
 import xml.etree.ElementTree as ET
 
-__all__ = ['Info', 'Recipe', 'Rating', 'Ingredient', 'parse_file']
+from .sources import open_source
+
+__all__ = ['Info', 'Recipe', 'Rating', 'Ingredient', 'parse_file',
+           'iter_recipes']
 
 
 class Info:
@@ -16,6 +24,8 @@ class Info:
         date: Date string (e.g. 'September 19, 2014').
     """
 
+    __slots__ = ('source', 'date')
+
     def __init__(self, source, date):
         """Initializes Info with provided values."""
         self.source = source
@@ -49,6 +59,13 @@ class Recipe:
         directions: List of direction strings.
     """
 
+    __slots__ = ('name', 'author', 'source', 'copyright', 'servings',
+                 'preparation_time', 'total_time', 'cuisine', 'description',
+                 'note', 'serving_ideas', 'suggested_wine', 'yield_',
+                 'alternate_source', 'alternate_source_label',
+                 'alternate_time', 'alternate_time_label', 'categories',
+                 'ratings', 'ingredients', 'directions')
+
     def __init__(self):
         """Initializes Recipe with default values."""
         self.name = ''
@@ -82,6 +99,8 @@ class Rating:
         value: Integer value (0-10).
     """
 
+    __slots__ = ('name', 'value')
+
     def __init__(self, name, value):
         """Initializes Rating with provided values."""
         self.name = name
@@ -107,6 +126,8 @@ class Ingredient:
             'T' = Text
     """
 
+    __slots__ = ('quantity', 'unit', 'name', 'preparation', 'code')
+
     def __init__(self, quantity, unit, name, preparation, code):
         """Initializes Ingredient with provided values."""
         self.quantity = quantity
@@ -120,38 +141,163 @@ class Ingredient:
         return '{%s} {%s} {%s} {%s} {%s}' % (self.quantity, self.unit, self.name, self.preparation, self.code)
 
 
-def parse_file(filename):
+def parse_file(source):
     """Parses a .mx2 file.
 
     Args:
-        filename: File name of the .mx2 file to parse.
+        source: File name or text or binary file object of the .mx2 file to
+            parse.
 
     Returns: 
         A tuple containing an Info object and a list of Recipe objects.
     """
-    with open(filename) as f:
-        s = _load_mx2_into_string(f)
+    if hasattr(source, 'read'):
+        s = _load_mx2_into_string(source)
+    else:
+        with open_source(source, 'r') as f:
+            s = _load_mx2_into_string(f)
     return _parse_string(s)
 
 
+def iter_recipes(source):
+    """Parses a .mx2 file incrementally.
+
+    Only one recipe is held in memory at a time, so memory use does not grow
+    with the size of the file.
+
+    Args:
+        source: File name or binary file object of the .mx2 file to parse.
+            A file object is left open.
+
+    Returns:
+        A tuple containing an Info object and an iterator of Recipe objects.
+        A file opened from a file name is closed when the iterator is
+        exhausted, when its close method is called, or when it is garbage
+        collected.
+    """
+    owned = not hasattr(source, 'read')
+    file = open_source(source, 'rb') if owned else source
+    try:
+        events = _iter_events(file)
+        for event, element in events:
+            if event == 'start':
+                info = _parse_info(element)
+                break
+        else:
+            raise ET.ParseError('no element found')
+    except Exception:
+        if owned:
+            file.close()
+        raise
+    return info, _RecipeIterator(_iter_recipes(events, element), file if owned else None)
+
+
 def _load_mx2_into_string(file):
-    """Loads a .mx2 file into a string. Fixes the XML declaration if necessary."""
-    return ''.join(_get_mx2_iterator(file))
+    """Loads a .mx2 file into a string (or bytes for a binary file). Fixes the
+    XML declaration if necessary."""
+    lines = _get_mx2_iterator(file)
+    first = next(lines, '')
+    return first[:0].join(itertools.chain((first,), lines))
 
 
 def _get_mx2_iterator(file):
     """Fixes the XML declaration on the first line of the file and then returns
     the rest of the lines unchanged.
 
-    MasterCook outputs files with an XML declaration that is not well-formed.
+    Works with the str lines of a text file or the bytes lines of a binary
+    file.
     """
-    first = True
-    for line in file:
-        if first and line == '<?xml version="1.0" standalone="yes" encoding="ISO-8859-1"?>\n':
-            yield '<?xml version="1.0" encoding="ISO-8859-1" standalone="yes"?>\n'
-        else:
-            first = False
-            yield line
+    lines = iter(file)
+    for line in lines:
+        yield _fix_declaration(line)
+        break
+    yield from lines
+
+
+# MasterCook puts standalone before encoding, which is not well-formed.
+_declaration_re = re.compile(rb'^<\?xml version="1.0" standalone="yes" encoding="([^"]*)"\?>')
+_declaration_str_re = re.compile(_declaration_re.pattern.decode('ascii'))
+
+
+def _fix_declaration(line):
+    """Returns the first line (str or bytes) of a .mx2 file with a malformed
+    MasterCook XML declaration made well-formed."""
+    if isinstance(line, str):
+        return _declaration_str_re.sub(
+            r'<?xml version="1.0" encoding="\1" standalone="yes"?>', line, count=1)
+    return _declaration_re.sub(
+        rb'<?xml version="1.0" encoding="\1" standalone="yes"?>', line, count=1)
+
+
+def _iter_events(file, chunk_size=64 * 1024):
+    """Yields start and end events with elements from a binary .mx2 file.
+
+    Fixes the XML declaration at the start of the file if necessary.
+    """
+    parser = ET.XMLPullParser(events=('start', 'end'))
+    data = _fix_declaration(file.readline(1024))
+    while data:
+        parser.feed(data)
+        yield from parser.read_events()
+        data = file.read(chunk_size)
+    parser.close()
+    yield from parser.read_events()
+
+
+class _RecipeIterator:
+    """Iterator of the Recipe objects of a .mx2 file that closes the file (if
+    not None) when exhausted, closed or garbage collected."""
+
+    __slots__ = ('_recipes', '_file')
+
+    def __init__(self, recipes, file):
+        self._recipes = recipes
+        self._file = file
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        try:
+            return next(self._recipes)
+        except BaseException:
+            self.close()
+            raise
+
+    def close(self):
+        """Stops iterating and closes the file."""
+        self._recipes.close()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    def __del__(self):
+        self.close()
+
+
+def _iter_recipes(events, mx2):
+    """Yields each Recipe from events after the start of the 'mx2' Element.
+
+    Each outermost 'RcpE' Element is removed from its parent once it has been
+    parsed, along with any embedded 'RcpE' Elements, so that parsed elements
+    do not accumulate.
+    """
+    parents = [mx2]
+    depth = 0
+    for event, element in events:
+        if event == 'start':
+            parents.append(element)
+            if element.tag == 'RcpE':
+                depth += 1
+            continue
+        parents.pop()
+        if element.tag != 'RcpE':
+            continue
+        depth -= 1
+        if depth == 0:
+            for rcpe in element.iter('RcpE'):
+                yield _parse_recipe(rcpe)
+            parents[-1].remove(element)
 
 
 def _parse_string(string):
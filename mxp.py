@@ -4,12 +4,31 @@ Use parse_recipes to parse multiple recipes.
 Use parse_recipe to parse a single recipe.
 Use split_recipe_lines to yield a list of lines for each recipe that can be
 passed into parse_recipe to parse only a single recipe out of multiple recipes.
+Use split_recipe_buffer to do the same for a whole string, bytes or mmap.
+Use parse_buffer to parse multiple recipes from bytes or mmap, detecting the
+text encoding if it is not given.
+Use scan_headers to parse only the title, recipe by, serving size,
+preparation time and categories of each recipe.
+Use build_index to record the byte offsets of each recipe in a file and
+parse_recipe_at to parse a single recipe from the file using the index.
+Use parse_recipes_parallel to parse a large file with multiple processes,
+or split_file to split it into ranges of whole recipes for other workers.
 """
 
+import itertools
+import mmap
+import os
 import re
 
-__all__ = ['Recipe', 'Ingredient', 'parse_recipes', 'parse_recipe',
-           'split_recipe_lines']
+from .charsets import _prepare_buffer
+from .index import load_or_build, _compile_line_patterns, _search_lines, _split_lines
+from .lazy import lazy_slot, parse_body
+from .parallel import split_ranges, map_ranges
+
+__all__ = ['Recipe', 'LazyRecipe', 'Ingredient', 'RecipeHeader', 'parse_recipes',
+           'parse_recipe', 'split_recipe_lines', 'split_recipe_buffer',
+           'parse_buffer', 'scan_headers', 'build_index', 'parse_recipe_at',
+           'parse_recipes_parallel', 'split_file']
 
 class Recipe:
     """Represents a MasterCook 1-4 recipe.
@@ -25,6 +44,9 @@ class Recipe:
         notes: A list of strings representing notes.
     """
 
+    __slots__ = ('title', 'recipe_by', 'serving_size', 'preparation_time',
+                 'categories', 'ingredients', 'directions', 'notes')
+
     def __init__(self):
         """Initializes Recipe with default values."""
         self.title = ''
@@ -37,9 +59,34 @@ class Recipe:
         self.notes = []
 
 
+class LazyRecipe(Recipe):
+    """Represents a recipe that parses the rest of its lines on first access.
+
+    The ingredients, directions and notes are parsed together when one of
+    them is first read or set. The other attributes are parsed right away.
+    """
+
+    __slots__ = ('_body',)
+
+    ingredients = lazy_slot(Recipe, 'ingredients')
+    directions = lazy_slot(Recipe, 'directions')
+    notes = lazy_slot(Recipe, 'notes')
+
+    def __init__(self):
+        """Initializes LazyRecipe with default values and nothing to parse."""
+        self._body = None # tuple (current line, remaining lines)
+        super().__init__()
+
+    def _parse_body(self):
+        """Parses the remaining lines of the recipe."""
+        parse_body(self, _body_stages)
+
+
 class Ingredient:
     """Represents an ingredient from a MasterCook 1-4 recipe."""
 
+    __slots__ = ('amount', 'measure', 'ingredient', 'preparation_method')
+
     def __init__(self, amount, measure, ingredient, preparation_method):
         """Initializes Ingredient with the specified values.
 
@@ -68,7 +115,36 @@ class Ingredient:
         return text
 
 
-def parse_recipes(lines):
+class RecipeHeader:
+    """Represents the title and other details at the start of a MasterCook
+    1-4 recipe.
+
+    Attributes:
+        title: A string for the recipe title.
+        recipe_by: A string for the recipe source/author.
+        serving_size: A string for the serving size.
+        preparation_time: A string for the preparation time.
+        categories: A list of strings for each category.
+        offset: An integer position of the first line of the recipe in the
+            scanned lines (0 for the first line).
+        length: An integer number of lines in the recipe.
+    """
+
+    __slots__ = ('title', 'recipe_by', 'serving_size', 'preparation_time',
+                 'categories', 'offset', 'length')
+
+    def __init__(self):
+        """Initializes RecipeHeader with default values."""
+        self.title = ''
+        self.recipe_by = ''
+        self.serving_size = ''
+        self.preparation_time = ''
+        self.categories = []
+        self.offset = 0
+        self.length = 0
+
+
+def parse_recipes(lines, stats=None, lazy=False):
     """Parses multiple recipes from the given lines.
 
     Parses multiple recipes when given an iterable of strings. The lines
@@ -76,11 +152,16 @@ def parse_recipes(lines):
 
     Args:
         lines: An iterable of strings containing the lines of multiple recipes.
+        stats: Optional profiling.ParseStats to record statistics for each
+            parsing stage in.
+        lazy: Boolean indicating whether to return LazyRecipe objects, whose
+            ingredients, directions and notes are only parsed when first accessed.
+            Ignored if stats is given.
 
     Yields:
         A Recipe corresponding to each of the recipes in the given lines.
     """
-    return (parse_recipe(recipe_lines) for recipe_lines in split_recipe_lines(lines))
+    return (parse_recipe(recipe_lines, stats, lazy) for recipe_lines in split_recipe_lines(lines))
 
 
 def split_recipe_lines(lines):
@@ -110,7 +191,122 @@ def split_recipe_lines(lines):
         yield recipe_lines
 
 
-def parse_recipe(lines):
+def split_recipe_buffer(buffer, encoding='utf-8'):
+    """Breaks up multiple recipes in a buffer into lists of lines for each recipe.
+
+    Yields the same lists of lines as split_recipe_lines, but finds each
+    header with a regular expression search over the whole buffer, so the
+    text before the first recipe is skipped without looking at each of its
+    lines. Lines are separated by '\n' (optionally preceded by '\r').
+
+    Args:
+        buffer: A string, or a bytes-like object (e.g. bytes or mmap.mmap)
+            containing multiple recipes.
+        encoding: Text encoding to decode each recipe with if buffer is not
+            a string. Must be compatible with ASCII (e.g. 'utf-8', 'cp1252').
+
+    Yields:
+        A list of strings for each recipe.
+    """
+    if isinstance(buffer, str):
+        for start, end in _iter_recipe_spans(buffer):
+            yield _split_lines(buffer[start:end])
+    else:
+        for start, end in _iter_recipe_spans(buffer):
+            yield _split_lines(str(buffer[start:end], encoding))
+
+
+def parse_buffer(buffer, encoding=None, stats=None, lazy=False):
+    """Parses multiple recipes from a bytes-like object.
+
+    Args:
+        buffer: A bytes-like object (e.g. bytes or mmap.mmap) containing
+            multiple recipes.
+        encoding: Text encoding of the buffer, or None to detect it from
+            the first bytes of the buffer with charsets.detect_encoding
+            (falling back to 'cp1252').
+        stats: Optional profiling.ParseStats to record statistics for each
+            parsing stage in.
+        lazy: Boolean indicating whether to return LazyRecipe objects (see
+            parse_recipes).
+
+    Yields:
+        A Recipe corresponding to each of the recipes in the buffer.
+    """
+    buffer, encoding = _prepare_buffer(buffer, encoding, 'cp1252')
+    return (parse_recipe(recipe_lines, stats, lazy)
+            for recipe_lines in split_recipe_buffer(buffer, encoding))
+
+
+def scan_headers(lines):
+    """Parses only the details at the start of multiple recipes.
+
+    Finds the same recipes as split_recipe_lines, but stops parsing each
+    recipe after its categories, without parsing ingredients, directions or
+    notes. The offset and length of each RecipeHeader can be used to parse
+    the whole recipe later, e.g.
+    next(parse_recipes(lines[header.offset:header.offset + header.length])).
+
+    Args:
+        lines: An iterable of strings containing the lines of multiple recipes.
+
+    Yields:
+        A RecipeHeader corresponding to each of the recipes in the given lines.
+    """
+    recipe_lines = _RecipeLines(enumerate(lines))
+    for line in recipe_lines:
+        pass # skip to the first header
+    while recipe_lines.next_header is not None:
+        start, line = recipe_lines.next_header
+        recipe_lines.next_header = None
+        header = RecipeHeader()
+        it = itertools.chain((line,), recipe_lines)
+        current = ''
+        try:
+            for stage in _header_stages:
+                current = stage(it, current, header)
+        except StopIteration:
+            pass
+        for line in recipe_lines:
+            pass # skip to the next header
+        header.offset = start
+        if recipe_lines.next_header is not None:
+            header.length = recipe_lines.next_header[0] - start
+        else:
+            header.length = recipe_lines.end - start
+        yield header
+
+
+class _RecipeLines:
+    """Iterator over numbered lines that yields lines with trailing white
+    space removed until the next header line, which it keeps in next_header
+    as a tuple of its position and the line. end is the position just after
+    the last line read."""
+
+    __slots__ = ('numbered', 'next_header', 'end')
+
+    def __init__(self, numbered):
+        self.numbered = numbered
+        self.next_header = None
+        self.end = 0
+
+    def __iter__(self):
+        return self
+
+    def __next__(self):
+        if self.next_header is not None:
+            raise StopIteration
+        offset, line = next(self.numbered)
+        self.end = offset + 1
+        line = line.rstrip()
+        # Every header has a '*', so most lines need no further checks.
+        if '*' in line and _is_mxp_header(line):
+            self.next_header = offset, line
+            raise StopIteration
+        return line
+
+
+def parse_recipe(lines, stats=None, lazy=False):
     """Parses a recipe from the given lines.
 
     Parses a single recipe when given an iterable of strings. These lines
@@ -118,10 +314,21 @@ def parse_recipe(lines):
 
     Args:
         lines: An iterable of strings containing the lines of the recipe.
+        stats: Optional profiling.ParseStats to record statistics for each
+            parsing stage in.
+        lazy: Boolean indicating whether to return a LazyRecipe, whose
+            ingredients, directions and notes are only parsed when first accessed.
+            Ignored if stats is given.
 
     Returns:
         A Recipe corresponding to the given lines.
     """
+    if stats is not None:
+        recipe = Recipe()
+        stats.run(_stages, lines, recipe)
+        return recipe
+    if lazy:
+        return _parse_lazy_recipe(lines)
     recipe = Recipe()
     it = iter(lines)
     current = ''
@@ -139,6 +346,141 @@ def parse_recipe(lines):
     return recipe
 
 
+def _parse_lazy_recipe(lines):
+    """Returns a LazyRecipe with the header stages of parse_recipe run and
+    the remaining lines kept for the other stages."""
+    recipe = LazyRecipe()
+    it = iter(lines)
+    current = ''
+    try:
+        for stage in _header_stages:
+            current = stage(it, current, recipe)
+    except StopIteration:
+        return recipe
+    recipe._body = current, list(it)
+    return recipe
+
+
+def build_index(filename, encoding='utf-8', sidecar=False):
+    """Builds an index of the byte offsets of each recipe in a file.
+
+    Scans the raw bytes of the file once, using the same header rules as
+    split_recipe_lines. Each recipe ends where the next header starts or at
+    the end of the file.
+
+    Args:
+        filename: File name of the .mxp file to index.
+        encoding: Text encoding used later to decode each recipe. Must be
+            compatible with ASCII (e.g. 'utf-8', 'cp1252').
+        sidecar: Boolean indicating whether to reuse and update a sidecar
+            index file (e.g. 'archive.mxp.idx') next to the file. The file
+            is only scanned again if it has changed, and only from the start
+            of the last recipe if it has only been appended to.
+
+    Returns:
+        A RecipeIndex for the file.
+    """
+    return load_or_build(filename, encoding, _scan_recipe_offsets, sidecar,
+                         extend_last=True)
+
+
+def parse_recipe_at(index, n):
+    """Parses a single recipe from an indexed file.
+
+    Seeks directly to the recipe and reads only its lines.
+
+    Args:
+        index: A RecipeIndex returned from build_index.
+        n: Integer position of the recipe in the file (0 for the first).
+
+    Returns:
+        A Recipe corresponding to the recipe at position n.
+    """
+    return parse_recipe(index.read_lines(n))
+
+
+def _scan_recipe_offsets(file, offset=0):
+    """Yields a tuple of the start and end byte offsets of each recipe in a
+    binary file from the given byte offset."""
+    if os.fstat(file.fileno()).st_size <= offset:
+        return
+    with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        yield from _iter_recipe_spans(buffer, offset)
+
+
+# Header lines, as _is_mxp_header finds them.
+_header_res = _compile_line_patterns(
+    r'[^\S\n]*\*[^\S\n]*exported from.*\*[^\S\n]*$', re.IGNORECASE)
+
+
+def _iter_recipe_spans(buffer, pos=0):
+    """Yields a tuple of the start and end offsets of each recipe in a string
+    or bytes-like object, from its header line to the next header line or
+    the end of the buffer.
+
+    Only the header lines are matched, so the text before the first recipe
+    is skipped over by the regular expression search.
+    """
+    header_res = _header_res[not isinstance(buffer, str)]
+    match = _search_lines(header_res, buffer, pos)
+    while match:
+        start = match.start('line')
+        match = _search_lines(header_res, buffer, match.end() + 1)
+        yield start, match.start('line') if match else len(buffer)
+
+
+def parse_recipes_parallel(filename, workers=None, ordered=True,
+                           encoding='utf-8', chunk_size=None):
+    """Parses multiple recipes from a file using multiple processes.
+
+    Splits the file into byte ranges that start at a recipe header and
+    parses each range in a pool of worker processes.
+
+    Args:
+        filename: File name of the .mxp file to parse.
+        workers: Number of worker processes, or None for the CPU count.
+        ordered: Boolean indicating whether recipes are yielded in the order
+            they appear in the file (True) or in whatever order the ranges
+            are finished (False), which can be faster.
+        encoding: Text encoding of the file. Must be compatible with ASCII
+            (e.g. 'utf-8', 'cp1252').
+        chunk_size: Approximate size in bytes of each range, or None to
+            choose a size based on the file size and number of workers.
+
+    Yields:
+        A Recipe corresponding to each of the recipes in the file.
+    """
+    workers = workers or os.cpu_count() or 1
+    ranges = split_file(filename, workers, chunk_size)
+    return map_ranges(_parse_range, (filename, encoding), ranges, workers, ordered)
+
+
+def split_file(filename, workers, chunk_size=None):
+    """Splits a .mxp file into byte ranges of whole recipes, each starting at
+    a recipe header (see parallel.split_ranges).
+
+    Returns:
+        A list of tuples of the start and end byte offsets of each range.
+    """
+    return split_ranges(filename, _find_header_boundary, workers, chunk_size)
+
+
+def _find_header_boundary(file, offset):
+    """Returns the byte offset of the first header line that starts at or
+    after the given offset, or the end of the file."""
+    with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+        match = _search_lines(_header_res[True], buffer, offset)
+        return match.start('line') if match else len(buffer)
+
+
+def _parse_range(filename, encoding, start, end):
+    """Returns a list of Recipe parsed from a byte range of a file."""
+    with open(filename, 'rb') as f:
+        f.seek(start)
+        data = f.read(end - start)
+    return [parse_recipe(lines) for lines in split_recipe_buffer(data.decode(encoding))]
+
+
 def _skip_empty(it, current):
     """Skips empty lines from the iterator and returns the current (non-empty) line."""
     while _is_empty(current):
@@ -357,4 +699,27 @@ def _parse_notes(it, current, recipe):
         # Add the notes when we reach end of iterable
         # and StopIteration is raised.
         recipe.notes = notes
-    return current
\ No newline at end of file
+    return current
+
+
+# Stages of parse_recipe in the order they run, for profiling.ParseStats.
+_stages = (_parse_mxp_header,
+           _parse_title,
+           _parse_recipe_by,
+           _parse_serving_size_preparation_time,
+           _parse_categories,
+           _parse_ingredients,
+           _parse_directions,
+           _parse_notes)
+
+# Stages of parse_recipe that scan_headers runs.
+_header_stages = (_parse_mxp_header,
+                  _parse_title,
+                  _parse_recipe_by,
+                  _parse_serving_size_preparation_time,
+                  _parse_categories)
+
+# Stages of parse_recipe that LazyRecipe runs on first access.
+_body_stages = (_parse_ingredients,
+                _parse_directions,
+                _parse_notes)
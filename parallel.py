@@ -0,0 +1,101 @@
+"""Parsing of large recipe files with multiple processes.
+
+A file is split into byte ranges that each contain only whole recipes, and
+each range is parsed in a separate worker process.
+
+Use mmf.parse_recipes_parallel or mxp.parse_recipes_parallel to parse a
+Meal-Master or MasterCook file; mmf.split_file and mxp.split_file return
+the ranges. convert.convert also converts many files (and ranges of large
+ones) to JSON Lines with map_ranges.
+"""
+
+from collections import deque
+import os
+
+__all__ = ['split_ranges', 'map_ranges']
+
+# Ranges are kept small enough that several are handed to each worker, which
+# evens out the work when some parts of a file are denser than others.
+_MAX_CHUNK_SIZE = 4 * 1024 * 1024
+_MIN_CHUNK_SIZE = 64 * 1024
+
+
+def split_ranges(filename, find_boundary, workers, chunk_size=None):
+    """Splits a file into byte ranges aligned to recipe boundaries.
+
+    Args:
+        filename: File name of the file to split.
+        find_boundary: Function taking a binary file and a byte offset and
+            returning the byte offset of the first recipe boundary at or
+            after that offset (or the size of the file if there is none).
+        workers: Number of worker processes the ranges will be parsed in.
+        chunk_size: Approximate size in bytes of each range, or None to
+            choose a size based on the file size and number of workers.
+
+    Returns:
+        A list of tuples of the start and end byte offsets of each range.
+    """
+    size = os.path.getsize(filename)
+    if chunk_size is None:
+        chunk_size = size // (workers * 4)
+        chunk_size = max(_MIN_CHUNK_SIZE, min(_MAX_CHUNK_SIZE, chunk_size))
+    ranges = []
+    with open(filename, 'rb') as f:
+        start = 0
+        while start < size:
+            end = find_boundary(f, start + chunk_size) if start + chunk_size < size else size
+            ranges.append((start, end))
+            start = end
+    return ranges
+
+
+def map_ranges(function, args, ranges, workers=None, ordered=True):
+    """Calls a function for each range in a pool of worker processes.
+
+    Only a few ranges per worker are submitted at a time, so that results
+    waiting to be consumed do not pile up in memory.
+
+    Args:
+        function: Module-level function taking the values in args followed
+            by the values in a tuple of ranges, and returning a list of
+            results.
+        args: Tuple of leading arguments for each call of function.
+        ranges: Iterable of tuples of start and end byte offsets. A tuple may
+            have other arguments for its range before the offsets (e.g. the
+            file name when ranges of several files are parsed).
+        workers: Number of worker processes, or None for the CPU count.
+        ordered: Boolean indicating whether results are yielded in the order
+            of the ranges (True), or as soon as each range is done (False).
+
+    Yields:
+        Each result from each call of function.
+    """
+    # Imported here since it is slow to import and rarely needed.
+    import concurrent.futures
+    workers = workers or os.cpu_count() or 1
+    ranges = iter(ranges)
+    executor = concurrent.futures.ProcessPoolExecutor(workers)
+    pending = deque()
+
+    def submit():
+        for item in ranges:
+            pending.append(executor.submit(function, *args, *item))
+            if len(pending) >= workers * 2:
+                break
+
+    try:
+        submit()
+        while pending:
+            if ordered:
+                done = [pending.popleft()]
+            else:
+                done, _ = concurrent.futures.wait(
+                    pending, return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    pending.remove(future)
+            for future in done:
+                results = future.result()
+                submit()
+                yield from results
+    finally:
+        executor.shutdown(cancel_futures=True)
@@ -0,0 +1,225 @@
+"""Conversion of parsed recipes to and from plain dictionaries.
+
+to_dict converts a Recipe (or any other record object of mmf, mxp, mx2 or
+fdx) to a dictionary of its attributes, with nested records converted too,
+so that it can be written as JSON. from_dict converts such a dictionary
+back to a record object of a given class.
+
+to_unified converts a Recipe of any format to a dictionary with the same
+keys for every format (see UNIFIED_KEYS), keeping only what the formats
+have in common.
+
+Lazy objects (mmf.LazyRecipe, mxp.LazyRecipe, fdx.LazyRecipeImage) are
+converted like the class they extend, which parses or reads the rest of
+them.
+"""
+
+import importlib
+
+__all__ = ['to_dict', 'from_dict', 'to_unified', 'recipe_class',
+           'UNIFIED_KEYS']
+
+# Class of the records in each attribute that holds records (either a single
+# record, or a list of them), for each class that has any.
+_nested = {
+    ('mmf', 'Recipe'): {'ingredients': 'Ingredient'},
+    ('mxp', 'Recipe'): {'ingredients': 'Ingredient'},
+    ('mx2', 'Recipe'): {'ratings': 'Rating', 'ingredients': 'Ingredient'},
+    ('fdx', 'Recipe'): {
+        'recipe_image': 'RecipeImage',
+        'source_image': 'RecipeImage',
+        'ingredients': 'RecipeIngredient',
+        'procedures': 'RecipeProcedure',
+        'author_notes': 'RecipeAuthorNote',
+        'tips': 'RecipeTip',
+        'reviews': 'RecipeReview',
+        'measures': 'RecipeMeasure',
+        'images': 'RecipeImage',
+    },
+    ('fdx', 'RecipeProcedure'): {'procedure_image': 'RecipeImage'},
+}
+
+
+def recipe_class(format):
+    """Returns the Recipe class of a format ('mmf', 'mxp', 'mx2' or 'fdx')."""
+    return importlib.import_module('.' + format, __package__).Recipe
+
+
+def to_dict(record):
+    """Converts a record object to a dictionary of its attributes.
+
+    Attributes are the public __slots__ of the class (and its bases). Lists
+    of records and records within records are converted as well.
+
+    Returns:
+        A dictionary with a key for each attribute.
+    """
+    return {name: _to_value(getattr(record, name))
+            for name in _fields(type(record))}
+
+
+def from_dict(cls, data):
+    """Converts a dictionary from to_dict back to a record object.
+
+    Args:
+        cls: Class of the record (e.g. mmf.Recipe).
+        data: Dictionary with a key for each attribute. Missing attributes
+            keep the default value of the class.
+
+    Returns:
+        An object of class cls.
+    """
+    try:
+        record = cls()
+    except TypeError:
+        # Classes such as Ingredient take their values as arguments.
+        record = cls.__new__(cls)
+    module = cls.__module__.rpartition('.')[2]
+    nested = _nested.get((module, cls.__name__), {})
+    for name in _fields(cls):
+        if name not in data:
+            continue
+        value = data[name]
+        if name in nested and value is not None:
+            nested_cls = getattr(importlib.import_module(cls.__module__), nested[name])
+            if isinstance(value, list):
+                value = [from_dict(nested_cls, v) for v in value]
+            else:
+                value = from_dict(nested_cls, value)
+        setattr(record, name, value)
+    return record
+
+
+def _to_value(value):
+    """Converts an attribute value for to_dict."""
+    if isinstance(value, list):
+        return [_to_value(v) for v in value]
+    if hasattr(type(value), '__slots__'):
+        return to_dict(value)
+    return value
+
+
+_field_cache = {}
+
+
+def _fields(cls):
+    """Returns a tuple of the public slot names of a record class.
+
+    Slots added by lazy subclasses only hold parsing state, so the fields
+    are those of the first class in the MRO that is not lazy.
+    """
+    try:
+        return _field_cache[cls]
+    except KeyError:
+        pass
+    mro = [c for c in cls.__mro__ if c is not object]
+    while len(mro) > 1 and mro[0].__name__.startswith('Lazy'):
+        mro.pop(0)
+    fields = []
+    for c in reversed(mro):
+        slots = c.__dict__.get('__slots__', ())
+        if isinstance(slots, str):
+            slots = (slots,)
+        fields.extend(s for s in slots if not s.startswith('_'))
+    _field_cache[cls] = fields = tuple(fields)
+    return fields
+
+
+UNIFIED_KEYS = ('format', 'title', 'author', 'source', 'categories',
+                'servings', 'yield', 'preparation_time', 'ingredients',
+                'directions', 'notes')
+
+
+def to_unified(recipe):
+    """Converts a Recipe of any format to a dictionary with the same keys for
+    every format.
+
+    Returns:
+        A dictionary with the keys in UNIFIED_KEYS:
+            format: Format string of the recipe ('mmf', 'mxp', 'mx2', 'fdx').
+            title, author, source, servings, yield, preparation_time:
+                Strings (perhaps empty).
+            categories, directions, notes: Lists of strings.
+            ingredients: List of dictionaries with the keys 'quantity',
+                'unit' and 'text' (strings) and 'heading' (boolean).
+    """
+    format = type(recipe).__module__.rpartition('.')[2]
+    unified = dict.fromkeys(UNIFIED_KEYS, '')
+    unified.update(format=format, categories=[], directions=[], notes=[])
+    unified.update(_unifiers[format](recipe))
+    return unified
+
+
+def _ingredient(quantity, unit, text, heading=False):
+    return {'quantity': quantity, 'unit': unit, 'text': text, 'heading': heading}
+
+
+def _unify_mmf(recipe):
+    return {
+        'title': recipe.title,
+        'categories': recipe.categories,
+        'servings': str(recipe.servings) if recipe.servings else '',
+        'yield': recipe.yield_,
+        'ingredients': [_ingredient(i.quantity, i.unit, i.text, i.is_heading)
+                        for i in recipe.ingredients],
+        'directions': recipe.directions,
+    }
+
+
+def _unify_mxp(recipe):
+    return {
+        'title': recipe.title,
+        'author': recipe.recipe_by,
+        'categories': recipe.categories,
+        'servings': recipe.serving_size,
+        'preparation_time': recipe.preparation_time,
+        'ingredients': [
+            _ingredient(i.amount, i.measure,
+                        _join(i.ingredient, ' -- ', i.preparation_method))
+            for i in recipe.ingredients],
+        'directions': recipe.directions,
+        'notes': recipe.notes,
+    }
+
+
+def _unify_mx2(recipe):
+    return {
+        'title': recipe.name,
+        'author': recipe.author,
+        'source': recipe.source,
+        'categories': recipe.categories,
+        'servings': recipe.servings,
+        'yield': recipe.yield_,
+        'preparation_time': recipe.preparation_time,
+        'ingredients': [
+            _ingredient(i.quantity, i.unit, _join(i.name, ', ', i.preparation),
+                        i.code == 'S')
+            for i in recipe.ingredients],
+        'directions': recipe.directions,
+        'notes': [recipe.note] if recipe.note else [],
+    }
+
+
+def _unify_fdx(recipe):
+    return {
+        'title': recipe.name,
+        'author': recipe.author,
+        'source': recipe.source,
+        'categories': [c.strip() for c in recipe.recipe_types.split(',') if c.strip()],
+        'servings': recipe.servings,
+        'yield': recipe.yield_,
+        'preparation_time': recipe.preparation_time,
+        'ingredients': [_ingredient(i.quantity, i.unit, i.ingredient, i.heading == 'Y')
+                        for i in recipe.ingredients],
+        'directions': [p.procedure_text for p in recipe.procedures if p.procedure_text],
+        'notes': [n.text for n in recipe.author_notes if n.text],
+    }
+
+
+def _join(text, separator, extra):
+    """Returns text followed by separator and extra, or text if extra is empty."""
+    return text + separator + extra if extra else text
+
+
+_unifiers = {'mmf': _unify_mmf, 'mxp': _unify_mxp, 'mx2': _unify_mx2,
+             'fdx': _unify_fdx}
@@ -0,0 +1,295 @@
+"""A daemon that parses recipe files for other processes over a Unix socket.
+
+Short-lived processes that parse a few files each spend most of their time
+starting the interpreter, importing the parsers and compiling regular
+expressions. The daemon does all of that once: it imports every parser and
+then forks a pool of worker processes, which inherit the warm state and
+accept connections on the same socket. Each connection asks for one file
+to be parsed, and the recipes are streamed back as JSON Lines as they are
+parsed.
+
+Start the daemon:
+    python -m recipeformats.serve [--socket PATH] [--workers N]
+
+Parse with it (see Client.parse_recipes):
+    for recipe in Client().parse_recipes('archive.mmf'):
+        pass
+
+The daemon opens any file name a client sends it, with the permissions of
+the user running it. The socket is created readable and writable only by
+that user (mode 0600); keep it that way, in a directory only trusted users
+can reach.
+
+Protocol: the client sends one JSON object on a line, with the key 'path'
+(a file name the daemon opens) if the daemon should read the file itself,
+and optionally 'format', 'encoding' and 'member' (see detect.open). Without
+'path', the bytes of the file follow in chunks, each after a line with its
+length in decimal, and a line '0' ends them. The daemon replies with one
+JSON object per line: first {'format': ..., 'encoding': ..., 'info': ...},
+then {'recipe': ...} for each recipe (see records.to_dict), and finally
+{'done': number of recipes}. If parsing fails, the last line is
+{'error': message} instead.
+"""
+
+import argparse
+import importlib
+import json
+import os
+import signal
+import socket
+import socketserver
+import sys
+import tempfile
+
+from . import detect, records
+
+__all__ = ['Client', 'ServerError', 'make_server', 'serve', 'DEFAULT_SOCKET']
+
+# Size of the chunks a client sends a file in.
+_CHUNK_SIZE = 64 * 1024
+
+# Files sent by clients are kept in memory up to this size, and in a
+# temporary file beyond it.
+_SPOOL_SIZE = 8 * 1024 * 1024
+
+DEFAULT_SOCKET = os.environ.get('RECIPEFORMATS_SOCKET') or os.path.join(
+    tempfile.gettempdir(), 'recipeformats-%d.sock' % os.getuid())
+
+
+class ServerError(Exception):
+    """Raised by Client when the daemon could not parse a file."""
+
+
+class _Handler(socketserver.StreamRequestHandler):
+    """Parses the file requested on a connection and writes its recipes."""
+
+    # Recipes are written in batches rather than one send per line.
+    wbufsize = 64 * 1024
+
+    def handle(self):
+        try:
+            request = json.loads(self.rfile.readline())
+            self._parse(request, self.wfile)
+        except (BrokenPipeError, ConnectionResetError):
+            # The client stopped reading (e.g. it broke out of
+            # Client.parse_recipes), so no one is left to tell.
+            return
+        except Exception as e:
+            self._write(self.wfile, {'error': '%s: %s' % (type(e).__name__, e)})
+
+    def _parse(self, request, writer):
+        if 'path' in request:
+            self._write_recipes(request['path'], request, writer)
+        else:
+            with tempfile.SpooledTemporaryFile(_SPOOL_SIZE) as data:
+                self._receive(data)
+                data.seek(0)
+                self._write_recipes(data, request, writer)
+
+    def _receive(self, data):
+        """Copies the chunks of a file sent by the client to a file object."""
+        while True:
+            size = int(self.rfile.readline())
+            if size == 0:
+                return
+            chunk = self.rfile.read(size)
+            if len(chunk) != size:
+                raise EOFError('connection closed before the file was sent')
+            data.write(chunk)
+
+    def _write_recipes(self, source, request, writer):
+        with detect.open(source, request.get('format'), request.get('encoding'),
+                         request.get('member')) as recipes:
+            info = records.to_dict(recipes.info) if recipes.info is not None else None
+            self._write(writer, {'format': recipes.format,
+                                 'encoding': recipes.encoding, 'info': info})
+            count = 0
+            for recipe in recipes:
+                self._write(writer, {'recipe': records.to_dict(recipe)})
+                count += 1
+        self._write(writer, {'done': count})
+
+    def finish(self):
+        try:
+            super().finish()
+        except (BrokenPipeError, ConnectionResetError):
+            # Closing wfile flushes what is left of its buffer again.
+            self.rfile.close()
+
+    @staticmethod
+    def _write(writer, message):
+        writer.write(json.dumps(message).encode('utf-8') + b'\n')
+
+
+class _Server(socketserver.UnixStreamServer):
+
+    # Connections are short, so let many wait for a worker.
+    request_queue_size = 128
+
+
+def make_server(path=DEFAULT_SOCKET):
+    """Creates a server listening on a Unix socket, replacing any stale
+    socket file.
+
+    The socket is only readable and writable by the current user. Call
+    serve_forever on the server to handle connections in the current
+    process.
+    """
+    if os.path.exists(path):
+        os.remove(path)
+    # Set the mode as the socket file is created, so that no other user
+    # can connect in between.
+    umask = os.umask(0o177)
+    try:
+        return _Server(path, _Handler)
+    finally:
+        os.umask(umask)
+
+
+def serve(path=DEFAULT_SOCKET, workers=None):
+    """Runs the daemon until it is interrupted or terminated.
+
+    Args:
+        path: File name of the Unix socket to listen on.
+        workers: Number of worker processes, or None for the CPU count.
+    """
+    workers = workers or os.cpu_count() or 1
+    # Import every parser and compile its regular expressions before
+    # forking, so that each worker starts warm.
+    for format in detect.FORMATS:
+        importlib.import_module('.' + format, __package__)
+    server = make_server(path)
+    # Every worker waits for the same socket, so a worker that loses the
+    # race for a connection must not block in accept.
+    server.socket.setblocking(False)
+    children = []
+    try:
+        for _ in range(workers):
+            pid = os.fork()
+            if pid == 0:
+                signal.signal(signal.SIGTERM, signal.SIG_DFL)
+                signal.signal(signal.SIGINT, signal.SIG_IGN)
+                try:
+                    server.serve_forever()
+                finally:
+                    os._exit(0)
+            children.append(pid)
+        signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+        for pid in children:
+            os.waitpid(pid, 0)
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for pid in children:
+            try:
+                os.kill(pid, signal.SIGTERM)
+            except ProcessLookupError:
+                pass
+        server.server_close()
+        if os.path.exists(path):
+            os.remove(path)
+
+
+class Client:
+    """Parses recipe files with a running daemon.
+
+    Attributes:
+        path: File name of the Unix socket of the daemon.
+    """
+
+    def __init__(self, path=DEFAULT_SOCKET):
+        """Initializes Client for the daemon listening on path."""
+        self.path = path
+
+    def parse_recipes(self, source, format=None, encoding=None, member=None):
+        """Parses multiple recipes with the daemon.
+
+        Can be used in place of parse_recipes of mmf or mxp, or iter_recipes
+        of fdx. The Info of a .mx2 file is not returned.
+
+        Args:
+            source: File name the daemon can open, bytes of a file, binary
+                file object, or iterable of strings of the lines of a file
+                (which are sent encoded as UTF-8). File objects and lines
+                are sent a chunk at a time as they are read.
+            format: One of detect.FORMATS, or None to detect it.
+            encoding: Text encoding of a .mmf or .mxp file, or None to detect
+                it.
+            member: Name of the member to read from a zip file.
+
+        Yields:
+            A Recipe of the module for the format for each recipe.
+
+        Raises:
+            ServerError: If the daemon could not parse the file.
+        """
+        request = {'format': format, 'encoding': encoding, 'member': member}
+        chunks = None
+        if isinstance(source, (str, os.PathLike)):
+            request['path'] = os.path.abspath(source)
+        elif isinstance(source, (bytes, bytearray, memoryview)):
+            chunks = (source,)
+        elif hasattr(source, 'read'):
+            chunks = iter(lambda: source.read(_CHUNK_SIZE), b'')
+        else:
+            chunks = _encode_lines(source)
+            request['encoding'] = request['encoding'] or 'utf-8'
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as sock:
+            sock.connect(self.path)
+            sock.sendall(json.dumps(request).encode('utf-8') + b'\n')
+            if chunks is not None:
+                for chunk in chunks:
+                    if chunk:
+                        sock.sendall(b'%d\n' % len(chunk))
+                        sock.sendall(chunk)
+                sock.sendall(b'0\n')
+            with sock.makefile('rb') as replies:
+                yield from self._read_replies(replies)
+
+    @staticmethod
+    def _read_replies(replies):
+        """Yields each Recipe from the lines of replies from the daemon."""
+        cls = None
+        for line in replies:
+            message = json.loads(line)
+            if 'recipe' in message:
+                yield records.from_dict(cls, message['recipe'])
+            elif 'format' in message:
+                cls = records.recipe_class(message['format'])
+            elif 'error' in message:
+                raise ServerError(message['error'])
+            else:
+                return
+        raise ServerError('connection closed before all recipes were sent')
+
+
+def _encode_lines(lines):
+    """Yields the lines of a file encoded as UTF-8, in chunks of about
+    _CHUNK_SIZE bytes."""
+    chunk = []
+    size = 0
+    for line in lines:
+        data = (line if line.endswith('\n') else line + '\n').encode('utf-8')
+        chunk.append(data)
+        size += len(data)
+        if size >= _CHUNK_SIZE:
+            yield b''.join(chunk)
+            chunk = []
+            size = 0
+    yield b''.join(chunk)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog='python -m recipeformats.serve',
+        description='Parse recipe files for other processes over a Unix socket.')
+    parser.add_argument('--socket', default=DEFAULT_SOCKET,
+                        help='file name of the socket (default %s)' % DEFAULT_SOCKET)
+    parser.add_argument('--workers', type=int,
+                        help='number of worker processes (default CPU count)')
+    args = parser.parse_args(argv)
+    serve(args.socket, args.workers)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+"""Transparent reading of compressed recipe files.
+
+Recipe archives are often stored compressed with gzip, bzip2 or xz, or
+bundled together in a zip file. open_source opens such a file and returns a
+file object that decompresses it as it is read, so it can be handed straight
+to a parser without writing a decompressed copy to disk. The compression is
+detected from the first bytes of the file rather than from its extension.
+
+Example:
+    with open_source('archive.mmf.gz', 'rt', encoding='cp437') as f:
+        for recipe in mmf.parse_recipes(f):
+            pass
+
+mx2.parse_file, mx2.iter_recipes, fdx.parse_file, fdx.iter_recipes and
+fdx.extract_images open file names with open_source, so compressed files
+can be passed to them directly. Byte-offset indexes and parallel parsing
+need random access to a plain file and do not support compressed files.
+"""
+
+import importlib
+import io
+
+__all__ = ['open_source', 'iter_sources', 'detect_compression',
+           'COMPRESSIONS']
+
+COMPRESSIONS = ('gzip', 'bz2', 'xz', 'zip')
+
+# Leading bytes of each kind of compressed file.
+_magic = (
+    (b'\x1f\x8b', 'gzip'),
+    (b'BZh', 'bz2'),
+    (b'\xfd7zXZ\x00', 'xz'),
+    (b'PK\x03\x04', 'zip'),
+    (b'PK\x05\x06', 'zip'),
+)
+
+# Module with an open function for each kind of compression. Modules are
+# only imported when a file compressed with them is opened.
+_modules = {
+    'gzip': 'gzip',
+    'bz2': 'bz2',
+    'xz': 'lzma',
+    'zip': 'zipfile',
+}
+
+
+def detect_compression(filename):
+    """Returns the kind of compression of a file.
+
+    Args:
+        filename: File name of the file, or a seekable binary file object
+            positioned at the start of the file (and left there).
+
+    Returns:
+        One of COMPRESSIONS, or None if the file is not compressed.
+    """
+    if hasattr(filename, 'read'):
+        start = filename.tell()
+        head = filename.read(6)
+        filename.seek(start)
+    else:
+        with open(filename, 'rb') as f:
+            head = f.read(6)
+    for magic, compression in _magic:
+        if head.startswith(magic):
+            return compression
+    return None
+
+
+def open_source(filename, mode='rb', encoding=None, errors=None, member=None):
+    """Opens a file for reading, decompressing it if it is compressed.
+
+    Args:
+        filename: File name of the plain or compressed file, or a seekable
+            binary file object positioned at the start of it. A file object
+            is never closed by closing the returned file object; if it is
+            not compressed, it is itself returned.
+        mode: 'rb' for a binary file object, or 'r' or 'rt' for a text file
+            object with universal newlines, as with open. Must be 'rb' for
+            a file object.
+        encoding: Text encoding for text mode (e.g. 'cp437'), or None for
+            the default encoding of open.
+        errors: How to handle encoding errors in text mode, as with open.
+        member: Name of the member to read from a zip file. May be omitted
+            if the zip file contains only one file.
+
+    Returns:
+        A file object for the decompressed contents of the file.
+    """
+    if mode not in ('r', 'rt', 'rb'):
+        raise ValueError('mode must be one of r, rt, rb')
+    if mode != 'rb' and hasattr(filename, 'read'):
+        raise ValueError('mode must be rb for a file object')
+    compression = detect_compression(filename)
+    if compression is None:
+        if hasattr(filename, 'read'):
+            return filename
+        if mode == 'rb':
+            return open(filename, 'rb')
+        return open(filename, 'r', encoding=encoding, errors=errors)
+    module = importlib.import_module(_modules[compression])
+    if compression == 'zip':
+        with module.ZipFile(filename) as bundle:
+            if member is None:
+                member = _only_member(filename, bundle)
+            # The member stays readable after the zip file is closed.
+            file = bundle.open(member)
+    else:
+        file = module.open(filename, 'rb')
+    return _wrap(file, mode, encoding, errors)
+
+
+def iter_sources(filename, mode='rb', encoding=None, errors=None):
+    """Opens each file in a zip file, or a single plain or compressed file.
+
+    Each file object is closed when the next one is requested, so it should
+    be read completely before continuing.
+
+    Args:
+        filename: File name of the zip, compressed or plain file.
+        mode: See open_source.
+        encoding: See open_source.
+        errors: See open_source.
+
+    Yields:
+        A tuple of the name of each file (the member name for a zip file, or
+        filename otherwise) and a file object for its contents.
+    """
+    if mode not in ('r', 'rt', 'rb'):
+        raise ValueError('mode must be one of r, rt, rb')
+    if detect_compression(filename) != 'zip':
+        with open_source(filename, mode, encoding, errors) as f:
+            yield filename, f
+        return
+    import zipfile
+    with zipfile.ZipFile(filename) as bundle:
+        for info in bundle.infolist():
+            if info.is_dir():
+                continue
+            with _wrap(bundle.open(info), mode, encoding, errors) as f:
+                yield info.filename, f
+
+
+def _wrap(file, mode, encoding, errors):
+    """Returns a binary file object as is, or wrapped for text mode."""
+    if mode == 'rb':
+        return file
+    return io.TextIOWrapper(file, encoding=encoding, errors=errors)
+
+
+def _only_member(filename, bundle):
+    """Returns the name of the only file in a zip file."""
+    names = [info.filename for info in bundle.infolist() if not info.is_dir()]
+    if len(names) != 1:
+        raise ValueError('%s contains %d files; member must be given'
+                         % (filename, len(names)))
+    return names[0]
@@ -0,0 +1,68 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+import recipeformats
+from recipeformats.benchmarks import corpus, startup, throughput
+
+
+class TestCorpus(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_every_entry_point_parses_every_recipe(self):
+        paths = {}
+        for format in corpus.FORMATS:
+            paths[format] = os.path.join(self.directory, 'corpus.' + format)
+            corpus.generate(format, paths[format], 25, image_size=100)
+        for name, (format, parse) in throughput.ENTRY_POINTS.items():
+            if not name.endswith('_parallel'):
+                self.assertEqual(parse(paths[format]), 25, name)
+
+    def test_when_same_seed(self):
+        a = os.path.join(self.directory, 'a.mmf')
+        b = os.path.join(self.directory, 'b.mmf')
+        corpus.generate('mmf', a, 10, seed=3)
+        corpus.generate('mmf', b, 10, seed=3)
+        with open(a, 'rb') as f, open(b, 'rb') as g:
+            self.assertEqual(f.read(), g.read())
+
+    def test_when_unknown_format(self):
+        with self.assertRaises(ValueError):
+            corpus.generate('txt', os.path.join(self.directory, 'a.txt'), 1)
+
+
+class TestStartup(unittest.TestCase):
+
+    def test_package_import_is_lazy(self):
+        seconds, modules = startup.measure(startup.TARGETS['recipeformats'], repeat=1)
+        self.assertGreater(seconds, 0)
+        self.assertEqual(modules, [])
+
+    def test_parser_import_loads_only_its_modules(self):
+        seconds, modules = startup.measure(startup.TARGETS['recipeformats.mmf'], repeat=1)
+        self.assertNotIn('xml.etree.ElementTree', modules)
+        self.assertNotIn('concurrent.futures', modules)
+
+    def test_lazy_attributes(self):
+        from recipeformats import mmf, detect
+        self.assertIs(recipeformats.mmf, mmf)
+        self.assertIs(recipeformats.open, detect.open)
+        self.assertIn('fdx', dir(recipeformats))
+        with self.assertRaises(AttributeError):
+            recipeformats.missing
+
+    def test_star_import_keeps_builtin_open(self):
+        namespace = {}
+        exec('from recipeformats import *', namespace)
+        self.assertNotIn('open', namespace)
+        self.assertIn('detect_format', namespace)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,110 @@
+import gzip
+import os
+import shutil
+import tempfile
+import unittest
+
+from recipeformats import cache, fdx, mx2, records
+from recipeformats.tests.test_fdx import FDX
+from recipeformats.tests.test_mx2 import MX2
+
+
+class TestParseCache(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.cache = cache.ParseCache(os.path.join(self.directory, 'cache.db'))
+
+    def tearDown(self):
+        self.cache.close()
+        shutil.rmtree(self.directory)
+
+    def write(self, name, text):
+        path = os.path.join(self.directory, name)
+        with open(path, 'w', encoding='iso-8859-1') as f:
+            f.write(text)
+        return path
+
+    def test_hit_same_as_parse(self):
+        path = self.write('a.mx2', MX2)
+        first = self.cache.parse(path)
+        second = self.cache.parse(path)
+        self.assertFalse(first.hit)
+        self.assertTrue(second.hit)
+        self.assertEqual(second.format, 'mx2')
+        self.assertEqual(second.info.date, 'September 19, 2014')
+        self.assertIsInstance(second.recipes[0], mx2.Recipe)
+        self.assertEqual([records.to_dict(r) for r in second.recipes],
+                         [records.to_dict(r) for r in mx2.parse_file(path)[1]])
+
+    def test_hit_builds_recipes_on_access(self):
+        path = self.write('a.mx2', MX2)
+        expected = self.cache.parse(path).recipes
+        recipes = self.cache.parse(path).recipes
+        self.assertEqual(len(recipes), 2)
+        self.assertIs(recipes[-1], recipes[1])
+        self.assertEqual([r.name for r in recipes[::-1]], ['Second Recipe', 'Test Recipe'])
+        self.assertEqual([records.to_dict(r) for r in recipes],
+                         [records.to_dict(r) for r in expected])
+        with self.assertRaises(IndexError):
+            recipes[2]
+
+    def test_hit_for_fdx(self):
+        path = os.path.join(self.directory, 'a.fdx')
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write(FDX)
+        expected = self.cache.parse(path)
+        actual = self.cache.parse(path)
+        self.assertTrue(actual.hit)
+        self.assertIsNone(actual.info)
+        self.assertIsInstance(actual.recipes[0].procedures[0].procedure_image, fdx.RecipeImage)
+        self.assertEqual([records.to_dict(r) for r in actual.recipes],
+                         [records.to_dict(r) for r in expected.recipes])
+
+    def test_hit_when_same_bytes_under_other_name(self):
+        self.cache.parse(self.write('a.mx2', MX2))
+        self.assertTrue(self.cache.parse(self.write('b', MX2)).hit)
+
+    def test_compressed_file(self):
+        path = os.path.join(self.directory, 'a.mx2.gz')
+        with gzip.open(path, 'wt', encoding='iso-8859-1') as f:
+            f.write(MX2)
+        self.assertEqual([r.name for r in self.cache.parse(path).recipes],
+                         ['Test Recipe', 'Second Recipe'])
+        self.assertTrue(self.cache.parse(path).hit)
+
+    def test_key_is_hash_of_parsed_bytes(self):
+        path = self.write('a.mx2', MX2)
+        self.cache.parse(path, format='mx2')
+        with open(path, 'rb') as f:
+            key = self.cache.key(f.read(), format='mx2')
+        keys = [row[0] for row in self.cache._db.execute('SELECT key FROM entries')]
+        self.assertEqual(keys, [key])
+
+    def test_miss_when_options_or_version_differ(self):
+        path = self.write('a.mx2', MX2)
+        self.cache.parse(path)
+        self.assertFalse(self.cache.parse(path, format='mx2').hit)
+        version = cache._version
+        try:
+            cache._version = 'other'
+            self.assertFalse(self.cache.parse(path).hit)
+        finally:
+            cache._version = version
+
+    def test_evicts_least_recently_used(self):
+        paths = [self.write('%d.mx2' % i, MX2.replace('Test Recipe', 'Recipe %d' % i))
+                 for i in range(3)]
+        self.cache.parse(paths[0])
+        size = self.cache.size()
+        self.cache.max_bytes = size * 2 + size // 2
+        self.cache.parse(paths[1])
+        self.cache.parse(paths[0])
+        self.cache.parse(paths[2])
+        self.assertLessEqual(self.cache.size(), self.cache.max_bytes)
+        self.assertTrue(self.cache.parse(paths[0]).hit)
+        self.assertFalse(self.cache.parse(paths[1]).hit)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,123 @@
+import codecs
+import mmap
+import os
+import tempfile
+import unittest
+
+from recipeformats import charsets, mmf, mxp
+
+
+MMF = '\n'.join([
+    '---------- Recipe via Meal-Master (tm) v8.05',
+    '      Title: %s',
+    '      1 c  Water',
+    '',
+    '  Bake at 350%s for 1 hour.\x14',
+    '-----',
+    '',
+    ])
+
+MXP = '\n'.join([
+    '                     * Exported from MasterCook *',
+    '',
+    '                               %s',
+    '',
+    '  1                cup  milk',
+    '',
+    ])
+
+
+class TestDetectEncoding(unittest.TestCase):
+
+    def test_when_ascii(self):
+        self.assertEqual(charsets.detect_encoding(b'abc\r\n'), 'cp437')
+        self.assertEqual(charsets.detect_encoding(b'abc\r\n', 'cp1252'), 'cp1252')
+
+    def test_when_paragraph_marks(self):
+        self.assertEqual(charsets.detect_encoding(b'abc\x14\r\n', 'cp1252'), 'cp437')
+
+    def test_when_bom(self):
+        self.assertEqual(charsets.detect_encoding(codecs.BOM_UTF8 + b'abc'), 'utf-8-sig')
+        self.assertEqual(charsets.detect_encoding('abc'.encode('utf-16')), 'utf-16')
+
+    def test_when_utf_8(self):
+        data = 'Crème brûlée at 150°C'.encode('utf-8')
+        self.assertEqual(charsets.detect_encoding(data), 'utf-8')
+
+    def test_when_utf_8_cut_off_at_end_of_sample(self):
+        data = b'a' * (charsets.SAMPLE_SIZE - 1) + 'é'.encode('utf-8')
+        self.assertEqual(charsets.detect_encoding(data), 'utf-8')
+
+    def test_when_cp437(self):
+        data = 'Crème brûlée at 350°F, ½ cup\r\n═══════'.encode('cp437')
+        self.assertEqual(charsets.detect_encoding(data, 'cp1252'), 'cp437')
+
+    def test_when_cp1252(self):
+        data = 'Don’t forget the “crème” at 350°F, ½ cup'.encode('cp1252')
+        self.assertEqual(charsets.detect_encoding(data, 'cp437'), 'cp1252')
+
+    def test_when_cp437_german(self):
+        data = 'Schöne Brötchen für Köln\r\nMöhren würfeln, Öl erhitzen'.encode('cp437')
+        self.assertEqual(charsets.detect_encoding(data, 'cp1252'), 'cp437')
+
+    def test_when_cp437_french(self):
+        data = 'Crème brûlée à la crêpe, pâté et rôti à point'.encode('cp437')
+        self.assertEqual(charsets.detect_encoding(data, 'cp1252'), 'cp437')
+
+    def test_when_cp437_letters_without_cp1252_context(self):
+        data = 'Gâteau: rôti, côte, mûre, où, voilà'.encode('cp437')
+        self.assertEqual(charsets.detect_encoding(data, 'cp1252'), 'cp437')
+
+    def test_when_cp1252_punctuation(self):
+        data = 'Serve “hot” with rice – or noodles, 10–12 minutes…\r\n'.encode('cp1252')
+        self.assertEqual(charsets.detect_encoding(data, 'cp437'), 'cp1252')
+
+    def test_only_prefix_is_sampled(self):
+        data = b'a' * charsets.SAMPLE_SIZE + 'é'.encode('cp1252')
+        self.assertEqual(charsets.detect_encoding(data, 'cp437'), 'cp437')
+
+
+class TestParseBuffer(unittest.TestCase):
+
+    def test_mmf_when_cp437(self):
+        data = (MMF % ('Crème', '°')).encode('cp437')
+        recipe = next(mmf.parse_buffer(data))
+        self.assertEqual(recipe.title, 'Crème')
+        self.assertEqual(recipe.directions, ['Bake at 350° for 1 hour.'])
+
+    def test_mmf_when_cp437_german(self):
+        data = (MMF % ('Schöne Brötchen für Köln', '°')).encode('cp437')
+        recipe = next(mmf.parse_buffer(data))
+        self.assertEqual(recipe.title, 'Schöne Brötchen für Köln')
+
+    def test_mmf_when_utf_8_bom(self):
+        data = codecs.BOM_UTF8 + (MMF % ('Crème', '°')).encode('utf-8')
+        actual = [r.title for r in mmf.parse_buffer(data)]
+        self.assertEqual(actual, ['Crème'])
+
+    def test_mmf_when_utf_16(self):
+        data = (MMF % ('Crème', '°')).encode('utf-16')
+        actual = [r.title for r in mmf.parse_buffer(data)]
+        self.assertEqual(actual, ['Crème'])
+
+    def test_mmf_when_encoding_given(self):
+        data = (MMF % ('Crème', '°')).encode('cp1252')
+        actual = [r.title for r in mmf.parse_buffer(data, 'cp1252')]
+        self.assertEqual(actual, ['Crème'])
+
+    def test_mxp_when_cp1252_mmap(self):
+        data = ((MXP % 'Mom’s Crème') * 2).encode('cp1252')
+        fd, filename = tempfile.mkstemp(suffix='.mxp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(data)
+            with open(filename, 'rb') as f:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                    actual = [r.title for r in mxp.parse_buffer(buffer)]
+        finally:
+            os.remove(filename)
+        self.assertEqual(actual, ['Mom’s Crème', 'Mom’s Crème'])
+
+
+if __name__ == '__main__':
+    unittest.main()
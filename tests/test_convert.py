@@ -0,0 +1,110 @@
+import gzip
+import io
+import json
+import os
+import shutil
+import tempfile
+import unittest
+from unittest import mock
+
+from recipeformats import convert, mmf, records
+from recipeformats.tests.test_mx2 import MX2
+
+
+MMF = '\r\n'.join([
+    '---------- Recipe via Meal-Master (tm) v8.05',
+    '      Title: %s',
+    ' Categories: Soups',
+    '      1 c  Water',
+    '',
+    '  Boil.',
+    '-----',
+    '',
+    ])
+
+
+class TestConvert(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.mmf = os.path.join(self.directory, 'a.mmf')
+        self.mmf_data = ''.join(MMF % ('Soup %d' % i) for i in range(200)).encode('cp437')
+        with open(self.mmf, 'wb') as f:
+            f.write(self.mmf_data)
+        os.mkdir(os.path.join(self.directory, 'sub'))
+        self.mx2 = os.path.join(self.directory, 'sub', 'b.mx2.gz')
+        with gzip.open(self.mx2, 'wb') as f:
+            f.write(MX2.encode('iso-8859-1'))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_find_files(self):
+        self.assertEqual(list(convert.find_files([self.directory])), [self.mmf, self.mx2])
+        pattern = os.path.join(self.directory, '**', '*.gz')
+        self.assertEqual(list(convert.find_files([pattern])), [self.mx2])
+        with self.assertRaises(FileNotFoundError):
+            list(convert.find_files([os.path.join(self.directory, '*.fdx')]))
+
+    def test_find_files_when_paths_overlap(self):
+        pattern = os.path.join(self.directory, '*.mmf')
+        other = os.path.join(self.directory, 'sub', '..', 'a.mmf')
+        self.assertEqual(list(convert.find_files([pattern, self.directory, other])),
+                         [self.mmf, self.mx2])
+
+    def test_when_path_repeated(self):
+        output = io.BytesIO()
+        other = os.path.join(self.directory, 'sub', '..', 'a.mmf')
+        results = convert.convert([self.mx2, self.mmf, self.mx2, other], output, workers=1)
+        self.assertEqual(len(output.getvalue().splitlines()), 202)
+        self.assertEqual([(r.path, r.recipes) for r in results],
+                         [(self.mx2, 2), (self.mmf, 200)])
+
+    def test_split_file_same_as_parse_buffer(self):
+        output = io.BytesIO()
+        results = convert.convert([self.mmf, self.mx2], output, workers=2,
+                                  ordered=True, split_size=1000)
+        lines = [json.loads(line) for line in output.getvalue().splitlines()]
+        expected = [records.to_dict(r) for r in mmf.parse_buffer(self.mmf_data)]
+        self.assertEqual(lines[:200], expected)
+        self.assertEqual([l['name'] for l in lines[200:]], ['Test Recipe', 'Second Recipe'])
+        self.assertEqual([(r.path, r.format, r.recipes, r.error) for r in results],
+                         [(self.mmf, 'mmf', 200, None), (self.mx2, 'mx2', 2, None)])
+        self.assertEqual(results[0].bytes, len(self.mmf_data))
+
+    def test_unified(self):
+        output = io.BytesIO()
+        convert.convert([self.mx2], output, 'unified', workers=1)
+        line = json.loads(output.getvalue().splitlines()[0])
+        self.assertEqual(tuple(line), records.UNIFIED_KEYS)
+        self.assertEqual((line['format'], line['title'], line['categories']),
+                         ('mx2', 'Test Recipe', ['Burgers', 'Fish']))
+
+    def test_large_output_written_to_temporary_file(self):
+        with mock.patch.object(convert, '_BUFFER_SIZE', 1000):
+            (result,) = convert._convert_range('native', self.mmf, None, None, 0, None)
+            path, format, count, size, seconds, error, data, spill = result
+            self.assertEqual((count, error, data), (200, None, b''))
+            try:
+                with open(spill, 'rb') as f:
+                    lines = f.read().splitlines()
+            finally:
+                os.remove(spill)
+            self.assertEqual(len(lines), 200)
+            output = io.BytesIO()
+            convert.convert([self.mmf], output, workers=1)
+            self.assertEqual(output.getvalue(), b''.join(line + b'\n' for line in lines))
+
+    def test_main_when_error(self):
+        bad = os.path.join(self.directory, 'c.txt')
+        with open(bad, 'w') as f:
+            f.write('Hello')
+        output = os.path.join(self.directory, 'out.jsonl')
+        status = convert.main(['-q', '-j', '1', '-o', output, self.mmf, bad])
+        self.assertEqual(status, 1)
+        with open(output) as f:
+            self.assertEqual(len(f.readlines()), 200)
+
+
+if __name__ == '__main__':
+    unittest.main()
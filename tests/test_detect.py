@@ -0,0 +1,148 @@
+import gc
+import gzip
+import io
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+
+import recipeformats
+from recipeformats import detect, fdx, mmf, mx2, mxp
+from recipeformats.tests.test_fdx import FDX
+from recipeformats.tests.test_mx2 import MX2
+
+
+MMF = '\r\n'.join([
+    'From: someone@example.com',
+    'Subject: MM: Recipes',
+    '',
+    '---------- Recipe via Meal-Master (tm) v8.05',
+    '',
+    '      Title: Crème',
+    '      1 c  Water',
+    '-----',
+    '',
+    ])
+
+MXP = '\r\n'.join([
+    '                     * Exported from MasterCook *',
+    '',
+    '                               Mom’s Pie',
+    '',
+    '  1                cup  milk',
+    '',
+    ])
+
+
+class TestSniffFormat(unittest.TestCase):
+
+    def test_formats(self):
+        self.assertEqual(detect.sniff_format(MMF.encode('cp437')), 'mmf')
+        self.assertEqual(detect.sniff_format(MXP.encode('cp1252')), 'mxp')
+        self.assertEqual(detect.sniff_format(MX2.encode('iso-8859-1')), 'mx2')
+        self.assertEqual(detect.sniff_format(FDX.encode('utf-8')), 'fdx')
+
+    def test_when_utf_16(self):
+        self.assertEqual(detect.sniff_format(MXP.encode('utf-16')), 'mxp')
+
+    def test_when_unknown(self):
+        self.assertIsNone(detect.sniff_format(b'---------- Not a recipe\n'))
+        self.assertIsNone(detect.sniff_format(b''))
+
+    def test_when_mmf_title_not_capitalized(self):
+        data = MMF.replace('Title:', 'TITLE:').encode('cp437')
+        self.assertEqual(detect.sniff_format(data), 'mmf')
+
+    def test_first_marker_wins(self):
+        data = (MXP + MMF).encode('cp1252')
+        self.assertEqual(detect.sniff_format(data), 'mxp')
+
+
+class TestOpen(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, name, data, opener=open):
+        path = os.path.join(self.directory, name)
+        with opener(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def test_mmf(self):
+        path = self.write('upload', MMF.encode('cp437'))
+        self.assertEqual(recipeformats.detect_format(path), 'mmf')
+        with recipeformats.open(path) as recipes:
+            self.assertEqual(recipes.format, 'mmf')
+            self.assertEqual(recipes.encoding, 'cp437')
+            actual = list(recipes)
+        self.assertIsInstance(actual[0], mmf.Recipe)
+        self.assertEqual([r.title for r in actual], ['Crème'])
+
+    def test_mxp_gzip(self):
+        path = self.write('upload.gz', MXP.encode('cp1252'), gzip.open)
+        with recipeformats.open(path) as recipes:
+            actual = list(recipes)
+        self.assertIsInstance(actual[0], mxp.Recipe)
+        self.assertEqual([r.title for r in actual], ['Mom’s Pie'])
+
+    def test_mx2(self):
+        path = self.write('upload', MX2.encode('iso-8859-1'))
+        with recipeformats.open(path) as recipes:
+            self.assertEqual(recipes.info.source, 'MasterCook')
+            actual = list(recipes)
+        self.assertIsInstance(actual[0], mx2.Recipe)
+        self.assertEqual(len(actual), 2)
+
+    def test_fdx_in_zip_with_images(self):
+        path = os.path.join(self.directory, 'upload.fdxz')
+        with zipfile.ZipFile(path, 'w') as bundle:
+            bundle.writestr('images/1.jpg', b'\xff\xd8')
+            bundle.writestr('recipes.fdx', FDX.encode('utf-8'))
+        with recipeformats.open(path) as recipes:
+            actual = list(recipes)
+        self.assertIsInstance(actual[0], fdx.Recipe)
+        self.assertEqual([r.name for r in actual], ['Test Recipe', 'Second Recipe'])
+
+    def test_compressed_file_object(self):
+        data = io.BytesIO()
+        with zipfile.ZipFile(data, 'w') as bundle:
+            bundle.writestr('images/1.jpg', b'\xff\xd8')
+            bundle.writestr('recipes.fdx', FDX.encode('utf-8'))
+        data.seek(0)
+        with recipeformats.open(data) as recipes:
+            actual = [r.name for r in recipes]
+        self.assertEqual(actual, ['Test Recipe', 'Second Recipe'])
+        self.assertFalse(data.closed)
+        data = io.BytesIO(gzip.compress(MXP.encode('cp1252')))
+        with recipeformats.open(data) as recipes:
+            self.assertEqual([r.title for r in recipes], ['Mom’s Pie'])
+        self.assertFalse(data.closed)
+
+    def test_when_format_and_encoding_given(self):
+        path = self.write('upload', MMF.encode('cp1252'))
+        with recipeformats.open(path, 'mmf', 'cp1252') as recipes:
+            self.assertEqual([r.title for r in recipes], ['Crème'])
+
+    def test_file_object_left_open_when_garbage_collected(self):
+        f = io.BytesIO((MMF + MMF).encode('cp437'))
+        recipes = recipeformats.open(f)
+        next(recipes)
+        del recipes
+        gc.collect()
+        self.assertFalse(f.closed)
+
+    def test_when_unknown(self):
+        path = self.write('upload', b'Hello')
+        with self.assertRaises(ValueError):
+            recipeformats.open(path)
+        with self.assertRaises(ValueError):
+            recipeformats.open(path, format='txt')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import contextlib
+import os
+import shutil
+import sqlite3
+import tempfile
+import unittest
+
+from recipeformats import export, mmf, mx2
+from recipeformats.tests.test_mx2 import MX2
+
+
+MMF = [
+    '---------- Recipe via Meal-Master (tm) v8.05',
+    '      Title: Walnut Brownies',
+    ' Categories: Desserts, Chocolate',
+    '      Yield: 16 brownies',
+    '',
+    '      1 c  Walnuts',
+    '      2 oz Chocolate',
+    '',
+    '  Melt the chocolate.',
+    '',
+    '  Stir in the walnuts.',
+    '-----',
+    ]
+
+
+class TestExport(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'recipes.db')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_tables(self):
+        ids = export.export_recipes(self.path, mmf.parse_recipes(MMF))
+        self.assertEqual(ids, [1])
+        with contextlib.closing(sqlite3.connect(self.path)) as db:
+            self.assertEqual(db.execute('SELECT format, title, yield FROM recipes').fetchall(),
+                             [('mmf', 'Walnut Brownies', '16 brownies')])
+            self.assertEqual(db.execute('SELECT position, quantity, unit, text, heading '
+                                        'FROM ingredients').fetchall(),
+                             [(0, '1', 'c', 'Walnuts', 0), (1, '2', 'oz', 'Chocolate', 0)])
+            self.assertEqual(db.execute('SELECT name FROM categories ORDER BY position').fetchall(),
+                             [('Desserts',), ('Chocolate',)])
+            self.assertEqual(db.execute('SELECT text FROM directions ORDER BY position').fetchall(),
+                             [('Melt the chocolate.',), ('Stir in the walnuts.',)])
+
+    def test_appends_in_batches(self):
+        export.export_recipes(self.path, mmf.parse_recipes(MMF))
+        recipes = mx2.parse_file(self.write_mx2())[1] * 3
+        ids = export.export_recipes(self.path, recipes, batch_size=2)
+        self.assertEqual(ids, [2, 3, 4, 5, 6, 7])
+        with contextlib.closing(sqlite3.connect(self.path)) as db:
+            self.assertEqual(db.execute('SELECT COUNT(*) FROM recipes').fetchone(), (7,))
+
+    def test_concurrent_exports(self):
+        def recipes():
+            for n in range(3):
+                yield from mmf.parse_recipes(MMF)
+                # Another process exports between the batches of this one.
+                export.export_recipes(self.path, mmf.parse_recipes(MMF))
+        ids = export.export_recipes(self.path, recipes(), batch_size=1)
+        self.assertEqual(ids, [1, 3, 5])
+        with contextlib.closing(sqlite3.connect(self.path)) as db:
+            self.assertEqual(db.execute('SELECT COUNT(*) FROM recipes').fetchone(), (6,))
+
+    def test_connection_not_committed(self):
+        with contextlib.closing(sqlite3.connect(self.path)) as db:
+            db.execute('CREATE TABLE notes (text TEXT)')
+            db.execute("INSERT INTO notes VALUES ('open')")
+            ids = export.export_recipes(db, mmf.parse_recipes(MMF), batch_size=1)
+            self.assertEqual(ids, [1])
+            self.assertTrue(db.in_transaction)
+            db.rollback()
+            self.assertEqual(db.execute('SELECT COUNT(*) FROM notes').fetchone(), (0,))
+            self.assertEqual(db.execute("SELECT COUNT(*) FROM sqlite_master "
+                                        "WHERE name = 'recipes'").fetchone(), (0,))
+
+    def test_search(self):
+        export.export_recipes(self.path, mmf.parse_recipes(MMF))
+        export.export_recipes(self.path, mx2.parse_file(self.write_mx2())[1])
+        self.assertEqual(export.search(self.path, 'walnuts'), [(1, 'Walnut Brownies')])
+        self.assertEqual(export.search(self.path, 'ingredients:flour'), [(3, 'Second Recipe')])
+        self.assertEqual(export.search(self.path, 'title:chocolate'), [])
+
+    def write_mx2(self):
+        path = os.path.join(self.directory, 'a.mx2')
+        with open(path, 'w', encoding='iso-8859-1') as f:
+            f.write(MX2)
+        return path
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,191 @@
+import base64
+import hashlib
+import os
+import shutil
+import tempfile
+import unittest
+
+from recipeformats import fdx
+
+
+FDX = '''<?xml version="1.0" encoding="UTF-8"?>
+<fdx Source="Living Cookbook" FileVersion="1.0" date="2014-09-19">
+  <Cookbooks>
+    <Cookbook Name="Test Cookbook" ID="1"/>
+  </Cookbooks>
+  <Recipes>
+    <Recipe Name="Test Recipe" ID="10" CookbookID="1" Servings="2" Author="Sam">
+      <RecipeImage FileType="JPG">
+        AAECAwQFBgcICQoLDA0ODxAREhMUFRYXGBkaGxwdHh8g
+        ISIjJCUmJw==
+      </RecipeImage>
+      <RecipeIngredients>
+        <RecipeIngredient Quantity="1" Unit="cup" Ingredient="milk"/>
+        <RecipeIngredient Quantity="2" Ingredient="eggs"/>
+      </RecipeIngredients>
+      <RecipeProcedures>
+        <RecipeProcedure>
+          <ProcedureText>Direction 1.</ProcedureText>
+          <ProcedureImage FileType="GIF">R0lGODlh</ProcedureImage>
+        </RecipeProcedure>
+      </RecipeProcedures>
+      <RecipeTips>
+        <RecipeTip>A tip.</RecipeTip>
+      </RecipeTips>
+      <RecipeImages>
+        <RecipeImages FileType="PNG" Description="Plated">iVBORw0KGgo=</RecipeImages>
+      </RecipeImages>
+      <RecipeNutrition Calories="100"/>
+    </Recipe>
+    <Recipe Name="Second Recipe" ID="11">
+      <RecipeIngredients>
+        <RecipeIngredient Quantity="2" Unit="cups" Ingredient="flour"/>
+      </RecipeIngredients>
+    </Recipe>
+  </Recipes>
+</fdx>
+'''
+
+
+def summarize(recipe):
+    return (recipe.name, recipe.id, recipe.servings, recipe.author,
+            [(i.quantity, i.unit, i.ingredient) for i in recipe.ingredients],
+            [t.text for t in recipe.tips], recipe.nutrition,
+            repr(recipe.recipe_image), repr(recipe.images))
+
+
+class TestIterRecipes(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.filename = tempfile.mkstemp(suffix='.fdx')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(FDX)
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    def test_same_as_parse_file(self):
+        expected = [summarize(r) for r in fdx.parse_file(self.filename)]
+        actual = [summarize(r) for r in fdx.iter_recipes(self.filename)]
+        self.assertEqual(actual, expected)
+        self.assertEqual(len(actual), 2)
+
+    def test_when_file_object(self):
+        with open(self.filename, 'rb') as f:
+            actual = [r.name for r in fdx.iter_recipes(f)]
+        self.assertEqual(actual, ['Test Recipe', 'Second Recipe'])
+
+
+class TestImages(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.filename = tempfile.mkstemp(suffix='.fdx')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(FDX)
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    def get_images(self, recipe):
+        return [recipe.recipe_image, recipe.procedures[0].procedure_image] + recipe.images
+
+    def test_when_eager(self):
+        recipe = fdx.parse_file(self.filename)[0]
+        actual = [(i.file_type, i.description, i.size, i.value) for i in self.get_images(recipe)]
+        expected = [
+            ('JPG', '', 40, 'AAECAwQFBgcICQoLDA0ODxAREhMUFRYXGBkaGxwdHh8g\n        ISIjJCUmJw=='),
+            ('GIF', '', 6, 'R0lGODlh'),
+            ('PNG', 'Plated', 8, 'iVBORw0KGgo='),
+            ]
+        self.assertEqual(actual, expected)
+        self.assertEqual([r.name for r in fdx.iter_recipes(self.filename, images='eager')],
+                         ['Test Recipe', 'Second Recipe'])
+
+    def test_when_skip(self):
+        recipe = fdx.parse_file(self.filename, images='skip')[0]
+        actual = [(i.file_type, i.description, i.size, i.value) for i in self.get_images(recipe)]
+        expected = [
+            ('JPG', '', 40, ''),
+            ('GIF', '', 6, ''),
+            ('PNG', 'Plated', 8, ''),
+            ]
+        self.assertEqual(actual, expected)
+        self.assertEqual(summarize(recipe)[:-2], summarize(fdx.parse_file(self.filename)[0])[:-2])
+
+    def test_when_lazy(self):
+        expected = fdx.parse_file(self.filename)[0]
+        actual = fdx.parse_file(self.filename, images='lazy')[0]
+        for image in self.get_images(actual):
+            self.assertIsInstance(image, fdx.LazyRecipeImage)
+            self.assertGreater(image.length, 0)
+        self.assertEqual(summarize(actual), summarize(expected))
+        self.assertEqual([i.value for i in self.get_images(actual)],
+                         [i.value for i in self.get_images(expected)])
+
+    def test_when_lazy_file_object(self):
+        with open(self.filename, 'rb') as f:
+            recipe = next(fdx.iter_recipes(f, images='lazy'))
+            self.assertEqual(recipe.images[0].value, 'iVBORw0KGgo=')
+
+    def test_when_invalid_mode(self):
+        with self.assertRaises(ValueError):
+            fdx.parse_file(self.filename, images='none')
+
+
+class TestExtractImages(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.filename = tempfile.mkstemp(suffix='.fdx')
+        with os.fdopen(fd, 'w', encoding='utf-8') as f:
+            f.write(FDX)
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        os.remove(self.filename)
+        shutil.rmtree(self.directory)
+
+    def test_extract_images(self):
+        actual = list(fdx.extract_images(self.filename, self.directory))
+        self.assertEqual([(i.recipe_id, i.kind, os.path.basename(i.path), i.size) for i in actual], [
+            ('10', 'recipe', '10-recipe.jpg', 40),
+            ('10', 'procedure', '10-procedure-1.gif', 6),
+            ('10', 'image', '10-image-1.png', 8),
+            ])
+        self.assertEqual(actual[2].description, 'Plated')
+        recipe = fdx.parse_file(self.filename)[0]
+        expected = [recipe.recipe_image, recipe.procedures[0].procedure_image] + recipe.images
+        for image, expected_image in zip(actual, expected):
+            with open(image.path, 'rb') as f:
+                data = f.read()
+            self.assertEqual(data, base64.b64decode(''.join(expected_image.value.split())))
+            self.assertEqual(image.sha256, hashlib.sha256(data).hexdigest())
+
+    def test_when_small_chunks(self):
+        with open(self.filename, 'rb') as f:
+            extractor = fdx._ImageExtractor(f, self.directory)
+            actual = [(os.path.basename(i.path), i.sha256) for i in extractor.read(chunk_size=5)]
+        other = os.path.join(self.directory, 'other')
+        expected = [(os.path.basename(i.path), i.sha256)
+                    for i in fdx.extract_images(self.filename, other)]
+        self.assertEqual(actual, expected)
+
+    def test_when_names_collide(self):
+        image = '<RecipeImage FileType="JPG">%s</RecipeImage>'
+        recipes = ''.join('<Recipe Name="%s" ID="%s">%s</Recipe>' % (id, id, image % data)
+                          for id, data in [('a/b', 'AAEC'), ('a_b', 'AwQF'), ('a_b', 'BgcI')])
+        with open(self.filename, 'w', encoding='utf-8') as f:
+            f.write('<fdx><Recipes>%s</Recipes></fdx>' % recipes)
+        actual = list(fdx.extract_images(self.filename, self.directory))
+        self.assertEqual([os.path.basename(i.path) for i in actual],
+                         ['a_b-recipe.jpg', 'a_b-recipe_2.jpg', 'a_b-recipe_3.jpg'])
+        contents = []
+        for image in actual:
+            with open(image.path, 'rb') as f:
+                contents.append(f.read())
+        self.assertEqual(contents, [b'\x00\x01\x02', b'\x03\x04\x05', b'\x06\x07\x08'])
+        again = list(fdx.extract_images(self.filename, self.directory))
+        self.assertEqual(os.path.basename(again[0].path), 'a_b-recipe_4.jpg')
+
+
+if __name__ == '__main__':
+    unittest.main()
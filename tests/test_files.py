@@ -0,0 +1,61 @@
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+
+from recipeformats import files
+
+
+class TestReplaceFile(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'a.idx')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def read(self):
+        with open(self.path, 'rb') as f:
+            return f.read()
+
+    def test_replaces_file(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'old')
+        with files.replace_file(self.path) as f:
+            f.write(b'new')
+            self.assertEqual(self.read(), b'old')
+        self.assertEqual(self.read(), b'new')
+        self.assertEqual(os.listdir(self.directory), ['a.idx'])
+
+    def test_when_error(self):
+        with open(self.path, 'wb') as f:
+            f.write(b'old')
+        with self.assertRaises(OSError):
+            with files.replace_file(self.path) as f:
+                f.write(b'new')
+                raise OSError('disk full')
+        self.assertEqual(self.read(), b'old')
+        self.assertEqual(os.listdir(self.directory), ['a.idx'])
+
+    def test_when_nested(self):
+        with files.replace_file(self.path) as first:
+            with files.replace_file(self.path) as second:
+                second.write(b'second')
+            first.write(b'first')
+        self.assertEqual(self.read(), b'first')
+        self.assertEqual(os.listdir(self.directory), ['a.idx'])
+
+    def test_mode_follows_umask(self):
+        umask = os.umask(0o022)
+        try:
+            with files.replace_file(self.path) as f:
+                f.write(b'new')
+        finally:
+            os.umask(umask)
+        self.assertEqual(stat.S_IMODE(os.stat(self.path).st_mode), 0o644)
+
+
+if __name__ == '__main__':
+    unittest.main()
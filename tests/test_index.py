@@ -0,0 +1,105 @@
+import os
+import shutil
+import tempfile
+import unittest
+
+from recipeformats import index, mmf, mxp
+
+
+MMF_RECIPE = '\n'.join([
+    '---------- Recipe via Meal-Master (tm) v8.05',
+    '      Title: %s',
+    '      1 c  Water',
+    '-----',
+    '',
+    ])
+
+MXP_RECIPE = '\n'.join([
+    '                     * Exported from MasterCook *',
+    '',
+    '                               %s',
+    '',
+    '  1                cup  milk',
+    '',
+    ])
+
+
+class TestSidecar(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, name, text, mode='w'):
+        filename = os.path.join(self.directory, name)
+        with open(filename, mode) as f:
+            f.write(text)
+        return filename
+
+    def titles(self, module, recipe_index):
+        return [module.parse_recipe_at(recipe_index, n).title
+                for n in range(len(recipe_index))]
+
+    def test_when_written(self):
+        filename = self.write('a.mmf', MMF_RECIPE % 'One')
+        mmf.build_index(filename, sidecar=True)
+        self.assertEqual(sorted(os.listdir(self.directory)), ['a.mmf', 'a.mmf.idx'])
+
+    def test_when_not_requested(self):
+        filename = self.write('a.mmf', MMF_RECIPE % 'One')
+        mmf.build_index(filename)
+        self.assertFalse(os.path.exists(filename + '.idx'))
+
+    def test_when_fresh(self):
+        filename = self.write('a.mmf', MMF_RECIPE % 'One' + MMF_RECIPE % 'Two')
+        expected = mmf.build_index(filename, sidecar=True)
+        actual = index.RecipeIndex.load(filename + '.idx', filename, 'utf-8')
+        self.assertEqual(actual.starts, expected.starts)
+        self.assertEqual(actual.ends, expected.ends)
+        self.assertEqual(actual.size, os.path.getsize(filename))
+        self.assertEqual(self.titles(mmf, mmf.build_index(filename, sidecar=True)), ['One', 'Two'])
+
+    def test_when_appended(self):
+        filename = self.write('a.mmf', MMF_RECIPE % 'One' + '---------- Recipe\n')
+        self.assertEqual(len(mmf.build_index(filename, sidecar=True)), 1)
+        self.write('a.mmf', '      Title: Two\n-----\n' + MMF_RECIPE % 'Three', 'a')
+        actual = mmf.build_index(filename, sidecar=True)
+        self.assertEqual(self.titles(mmf, actual), ['One', 'Two', 'Three'])
+        self.assertEqual(actual.starts, mmf.build_index(filename).starts)
+
+    def test_when_appended_mxp(self):
+        filename = self.write('a.mxp', MXP_RECIPE % 'One' + MXP_RECIPE % 'Two')
+        mxp.build_index(filename, sidecar=True)
+        self.write('a.mxp', 'More notes\n' + MXP_RECIPE % 'Three', 'a')
+        actual = mxp.build_index(filename, sidecar=True)
+        expected = mxp.build_index(filename)
+        self.assertEqual(self.titles(mxp, actual), ['One', 'Two', 'Three'])
+        self.assertEqual(actual.starts, expected.starts)
+        self.assertEqual(actual.ends, expected.ends)
+        self.assertEqual(mxp.parse_recipe_at(actual, 1).directions, ['More notes'])
+
+    def test_when_changed(self):
+        filename = self.write('a.mmf', MMF_RECIPE % 'One' + MMF_RECIPE % 'Two')
+        mmf.build_index(filename, sidecar=True)
+        self.write('a.mmf', MMF_RECIPE % 'Uno' + MMF_RECIPE % 'Two' + MMF_RECIPE % 'Three')
+        actual = mmf.build_index(filename, sidecar=True)
+        self.assertEqual(self.titles(mmf, actual), ['Uno', 'Two', 'Three'])
+
+    def test_when_truncated(self):
+        filename = self.write('a.mmf', MMF_RECIPE % 'One' + MMF_RECIPE % 'Two')
+        mmf.build_index(filename, sidecar=True)
+        self.write('a.mmf', MMF_RECIPE % 'One')
+        actual = mmf.build_index(filename, sidecar=True)
+        self.assertEqual(self.titles(mmf, actual), ['One'])
+
+    def test_when_sidecar_corrupt(self):
+        filename = self.write('a.mmf', MMF_RECIPE % 'One')
+        self.write('a.mmf.idx', 'not an index')
+        actual = mmf.build_index(filename, sidecar=True)
+        self.assertEqual(self.titles(mmf, actual), ['One'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,153 @@
+import os
+import shutil
+import stat
+import tempfile
+import unittest
+from unittest import mock
+
+from recipeformats import fdx, inverted, mmf, mx2
+from recipeformats.tests.test_fdx import FDX
+from recipeformats.tests.test_mx2 import MX2
+
+
+def mmf_recipe(title, categories, ingredients):
+    lines = [
+        '---------- Recipe via Meal-Master (tm) v8.05',
+        '      Title: %s' % title,
+        ' Categories: %s' % categories,
+        '',
+        ]
+    lines.extend(('      %s' if text.startswith('-') else '      1 c  %s') % text
+                 for text in ingredients)
+    lines.extend(['', '  Mix.', '-----'])
+    return lines
+
+
+MMF = (mmf_recipe('Buttermilk Biscuits', 'Breads', ['Flour', 'Buttermilk'])
+       + mmf_recipe('Corn Bread', 'Breads, Quick  Breads', ['Cornmeal', 'Buttermilk', 'Eggs'])
+       + mmf_recipe('Pancakes', 'Breakfast', ['Flour', 'Buttermilk', 'Eggs'])
+       + mmf_recipe('Yeast Rolls', 'BREADS', ['Flour', 'Milk', '-----FILLING-----']))
+
+
+class TestFunctions(unittest.TestCase):
+
+    def test_words(self):
+        self.assertEqual(inverted.words('1/2 Sour-Cream, (chilled) Crème'),
+                         ['sour', 'cream', 'chilled', 'crème'])
+
+    def test_normalize_category(self):
+        self.assertEqual(inverted.normalize_category(' Quick  BREADS '), 'quick breads')
+
+    def test_intersect(self):
+        self.assertEqual(list(inverted.intersect([1, 3, 5, 7], [3, 4, 5])), [3, 5])
+        self.assertEqual(list(inverted.intersect([2, 50], range(0, 100, 2), [50])), [50])
+        self.assertEqual(list(inverted.intersect([1], [])), [])
+        self.assertEqual(list(inverted.intersect()), [])
+
+    def test_intersect_when_lengths_differ(self):
+        self.assertEqual(list(inverted.intersect([5, 999, 2000], range(1000))), [5, 999])
+
+    def test_union(self):
+        self.assertEqual(list(inverted.union([1, 5], [2, 5], [9])), [1, 2, 5, 9])
+        self.assertEqual(list(inverted.union([4])), [4])
+
+    def test_difference(self):
+        self.assertEqual(list(inverted.difference([1, 2, 3, 4], [2], [4, 5])), [1, 3])
+        self.assertEqual(list(inverted.difference([1, 2])), [1, 2])
+
+
+class TestInvertedIndex(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.index = inverted.build(mmf.parse_recipes(MMF))
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def check_queries(self, index):
+        self.assertEqual(len(index), 4)
+        self.assertEqual(list(index.ingredient('buttermilk')), [0, 1, 2])
+        self.assertEqual(list(index.ingredient('Corn meal')), [])
+        self.assertEqual(list(index.ingredient('')), [])
+        self.assertEqual(list(index.category('breads')), [0, 1, 3])
+        self.assertEqual(list(index.category('Quick Breads')), [1])
+        self.assertEqual(list(index.find(ingredients=['buttermilk'], categories=['Breads'])),
+                         [0, 1])
+        self.assertEqual(list(index.find(ingredients=['flour'], exclude_ingredients=['eggs'])),
+                         [0, 3])
+        self.assertEqual(list(index.find(any_ingredients=['cornmeal', 'milk'])), [1, 3])
+        self.assertEqual(list(index.find(any_categories=['breakfast', 'quick breads'],
+                                         exclude_categories=['breads'])), [2])
+        self.assertEqual(list(index.find(exclude_ingredients=['buttermilk'])), [3])
+        self.assertEqual(list(index.find()), [0, 1, 2, 3])
+
+    def test_queries(self):
+        self.check_queries(self.index)
+
+    def test_skips_headings(self):
+        self.assertNotIn('filling', self.index.ingredients)
+
+    def test_mapped(self):
+        path = os.path.join(self.directory, 'recipes.inv')
+        self.index.save(path)
+        with inverted.load(path) as index:
+            self.check_queries(index)
+            self.assertEqual(index.terms('categories'), ['breads', 'breakfast', 'quick breads'])
+            self.assertIn('buttermilk', index.terms('ingredients'))
+
+    def test_mapped_when_empty(self):
+        path = os.path.join(self.directory, 'recipes.inv')
+        inverted.InvertedIndex().save(path)
+        with inverted.load(path) as index:
+            self.assertEqual(len(index), 0)
+            self.assertEqual(list(index.ingredient('flour')), [])
+            self.assertEqual(index.terms('ingredients'), [])
+
+    def test_save_mode_follows_umask(self):
+        path = os.path.join(self.directory, 'recipes.inv')
+        umask = os.umask(0o022)
+        try:
+            self.index.save(path)
+        finally:
+            os.umask(umask)
+        self.assertEqual(stat.S_IMODE(os.stat(path).st_mode), 0o644)
+
+    def test_save_removes_temporary_file_on_error(self):
+        path = os.path.join(self.directory, 'recipes.inv')
+        with mock.patch.object(inverted, '_write_section', side_effect=OSError('disk full')):
+            with self.assertRaises(OSError):
+                self.index.save(path)
+        self.assertEqual(os.listdir(self.directory), [])
+
+    def test_load_when_not_an_index(self):
+        path = os.path.join(self.directory, 'recipes.inv')
+        with open(path, 'wb') as f:
+            f.write(b'not an index at all')
+        with self.assertRaises(ValueError):
+            inverted.load(path)
+
+    def test_load_when_truncated(self):
+        path = os.path.join(self.directory, 'recipes.inv')
+        self.index.save(path)
+        with open(path, 'r+b') as f:
+            f.truncate(os.path.getsize(path) - 8)
+        with self.assertRaises(ValueError):
+            inverted.load(path)
+
+    def test_formats(self):
+        mx2_path = os.path.join(self.directory, 'a.mx2')
+        with open(mx2_path, 'w', encoding='iso-8859-1') as f:
+            f.write(MX2)
+        fdx_path = os.path.join(self.directory, 'a.fdx')
+        with open(fdx_path, 'w', encoding='utf-8') as f:
+            f.write(FDX)
+        recipes = mx2.parse_file(mx2_path)[1] + list(fdx.iter_recipes(fdx_path))
+        index = inverted.build(recipes)
+        self.assertEqual(list(index.ingredient('milk')), [0, 2])
+        self.assertEqual(list(index.ingredient('flour')), [1, 3])
+        self.assertEqual(list(index.category('fish')), [0])
+
+
+if __name__ == '__main__':
+    unittest.main()
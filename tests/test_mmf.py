@@ -1,3 +1,6 @@
+import mmap
+import os
+import tempfile
 import unittest
 
 from recipeformats import mmf
@@ -913,6 +916,39 @@ class TestIsIngredient(unittest.TestCase):
         self.assertEqual(actual, expected)
 
 
+class TestLineRe(unittest.TestCase):
+
+    def test_same_as_separate_checks(self):
+        lines = ['', '   ', ':', '    : value', ' Title: 21 Club Rice Pudding',
+                 '-----', 'MMMMM', '----- ', 'MMMMMM', '----------',
+                 '---------- ', 'MMMMM----- Anything goes here',
+                 '---------- Recipe via Meal-Master (tm) v8.05',
+                 '-----------------------------------', '----- -----',
+                 '---------------------------FILLING---------------------------',
+                 '      1 qt Milk', '     1 qt Milk', '        21 Apples',
+                 '  1 1/2 c  Whipped cream', '      1 c  Oil   : 1 t  Soda',
+                 'Chill before serving.', '-Slice thin']
+        for line in lines:
+            if mmf._get_ingredient_heading(line):
+                expected = 'heading'
+            elif mmf._is_ingredient(line):
+                expected = 'ingredient'
+            elif mmf._is_empty(line):
+                expected = 'blank'
+            elif mmf._is_mmf_footer(line):
+                expected = 'footer'
+            elif mmf._is_mmf_header(line):
+                expected = 'header'
+            elif mmf._test_metadata(line)[0]:
+                expected = 'metadata'
+            elif mmf._heading_re.match(line):
+                expected = 'heading'
+            else:
+                expected = 'text'
+            match = mmf._line_re.match(line)
+            self.assertEqual(match.lastgroup if match else 'text', expected, line)
+
+
 class TestGetIngredients(unittest.TestCase):
 
     def test_when_none(self):
@@ -1234,5 +1270,293 @@ class TestParagraphizeDirections(unittest.TestCase):
         self.assertEqual(actual, expected)
 
 
+class TestSplitRecipeBuffer(unittest.TestCase):
+
+    text = '\r\n'.join([
+        'Some text before the first recipe',
+        '-----',
+        '---------- ',
+        '---------- Recipe via Meal-Master (tm) v8.05',
+        '      Title: Restarted',
+        'MMMMM----- Recipe via Meal-Master (tm) v8.05',
+        '      Title: First',
+        '      1 c  Water',
+        '-----',
+        'Text between recipes',
+        'MMMMM',
+        ' MMMMM----- Not a header',
+        'MMMMM----- Recipe via Meal-Master (tm) v8.05',
+        '      Title: Second',
+        'MMMMM \t ',
+        '---------- Recipe via Meal-Master (tm) v8.05',
+        '      Title: Missing footer',
+        ]) + '\r\n'
+
+    def get_expected(self):
+        return list(mmf.split_recipe_lines(self.text.splitlines(True)))
+
+    def test_when_string(self):
+        actual = list(mmf.split_recipe_buffer(self.text))
+        self.assertEqual(len(actual), 2)
+        self.assertEqual(actual, self.get_expected())
+
+    def test_when_bytes(self):
+        actual = list(mmf.split_recipe_buffer(self.text.encode('cp437'), 'cp437'))
+        self.assertEqual(actual, self.get_expected())
+
+    def test_when_mmap(self):
+        with tempfile.TemporaryFile() as f:
+            f.write(self.text.encode('cp437'))
+            f.flush()
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                actual = list(mmf.split_recipe_buffer(buffer, 'cp437'))
+        self.assertEqual(actual, self.get_expected())
+
+    def test_when_footer_at_end_without_newline(self):
+        text = 'MMMMM----- Recipe via Meal-Master (tm) v8.05\n  Title: Last\nMMMMM'
+        actual = list(mmf.split_recipe_buffer(text))
+        expected = [['MMMMM----- Recipe via Meal-Master (tm) v8.05', '  Title: Last', 'MMMMM']]
+        self.assertEqual(actual, expected)
+
+    def test_when_empty(self):
+        actual = list(mmf.split_recipe_buffer(''))
+        expected = []
+        self.assertEqual(actual, expected)
+
+
+class TestSplitRecipeLines(unittest.TestCase):
+
+    lines = [
+        'Text before the first recipe',
+        'MMMMM----- Recipe via Meal-Master (tm) v8.05',
+        '      Title: Missing footer',
+        '---------- Recipe via Meal-Master (tm) v8.05',
+        '      Title: Long',
+        '      1 c  Water',
+        '  Line 1.',
+        '  Line 2.',
+        '  Line 3.',
+        '-----',
+        'Text between recipes',
+        'MMMMM----- Recipe via Meal-Master (tm) v8.05',
+        '      Title: Short',
+        'MMMMM',
+        'MMMMM----- Recipe via Meal-Master (tm) v8.05',
+        '      Title: At end',
+        ]
+
+    def test_without_resync(self):
+        actual = [lines[1] for lines in mmf.split_recipe_lines(self.lines)]
+        expected = ['      Title: Long', '      Title: Short']
+        self.assertEqual(actual, expected)
+
+    def test_when_header_ends_recipe(self):
+        policy = mmf.ResyncPolicy()
+        actual = [lines for lines in mmf.split_recipe_lines(self.lines, policy)]
+        expected = [self.lines[1:3], self.lines[3:10], self.lines[11:14]]
+        self.assertEqual(actual, expected)
+        actual = [repr(d) for d in policy.diagnostics]
+        expected = ['{1} {3} {header before footer} {False}',
+                    '{14} {16} {end before footer} {True}']
+        self.assertEqual(actual, expected)
+
+    def test_when_header_skips_recipe(self):
+        policy = mmf.ResyncPolicy(header_ends_recipe=False)
+        actual = [lines[1] for lines in mmf.split_recipe_lines(self.lines, policy)]
+        expected = ['      Title: Long', '      Title: Short']
+        self.assertEqual(actual, expected)
+        self.assertEqual(repr(policy.diagnostics[0]), '{1} {3} {header before footer} {True}')
+
+    def test_when_too_many_lines(self):
+        policy = mmf.ResyncPolicy(max_lines=4)
+        actual = [lines[1] for lines in mmf.split_recipe_lines(self.lines, policy)]
+        expected = ['      Title: Missing footer', '      Title: Short']
+        self.assertEqual(actual, expected)
+        self.assertEqual(repr(policy.diagnostics[1]), '{3} {10} {too long} {True}')
+
+    def test_when_too_many_chars(self):
+        policy = mmf.ResyncPolicy(max_chars=80)
+        actual = [lines[1] for lines in mmf.split_recipe_lines(self.lines, policy)]
+        expected = ['      Title: Missing footer', '      Title: Short']
+        self.assertEqual(actual, expected)
+
+    def test_parse_recipes(self):
+        policy = mmf.ResyncPolicy(max_lines=4)
+        actual = [r.title for r in mmf.parse_recipes(self.lines, resync=policy)]
+        expected = ['Missing footer', 'Short']
+        self.assertEqual(actual, expected)
+        self.assertEqual(len(policy.diagnostics), 3)
+
+
+class TestScanHeaders(unittest.TestCase):
+
+    lines = [
+        'Some text before the first recipe',
+        '---------- Recipe via Meal-Master (tm) v8.05',
+        '      Title: Restarted',
+        'MMMMM----- Recipe via Meal-Master (tm) v8.05',
+        '',
+        '      Title: First',
+        '',
+        ' Categories: Desserts, Soup',
+        '      Yield: 2 servings',
+        '',
+        '      1 c  Water',
+        '',
+        '  Boil.',
+        '-----',
+        'Text between recipes',
+        'MMMMM----- Recipe via Meal-Master (tm) v8.05',
+        '      Title: Second',
+        '      1 c  Water',
+        'MMMMM',
+        '---------- Recipe via Meal-Master (tm) v8.05',
+        '      Title: Missing footer',
+        ]
+
+    def test_when_same_as_parse_recipes(self):
+        actual = [(h.title, h.categories, h.yield_, h.servings)
+                  for h in mmf.scan_headers(self.lines)]
+        expected = [(r.title, r.categories, r.yield_, r.servings)
+                    for r in mmf.parse_recipes(self.lines)]
+        self.assertEqual(actual, expected)
+        self.assertEqual(actual[0], ('First', ['Desserts', 'Soup'], '', 2))
+
+    def test_offset_and_length(self):
+        headers = list(mmf.scan_headers(self.lines))
+        actual = [(h.offset, h.length) for h in headers]
+        expected = [(3, 11), (15, 4)]
+        self.assertEqual(actual, expected)
+        header = headers[1]
+        recipe = next(mmf.parse_recipes(self.lines[header.offset:header.offset + header.length]))
+        self.assertEqual(recipe.title, 'Second')
+        self.assertEqual([repr(i) for i in recipe.ingredients], ['{1} {c} {Water}'])
+
+    def test_when_empty(self):
+        actual = list(mmf.scan_headers([]))
+        expected = []
+        self.assertEqual(actual, expected)
+
+
+class TestLazyRecipe(unittest.TestCase):
+
+    lines = TestScanHeaders.lines
+
+    def test_when_same_as_parse_recipes(self):
+        expected = [(r.title, r.categories, r.yield_, r.servings, repr(r.ingredients), r.directions)
+                    for r in mmf.parse_recipes(self.lines)]
+        recipes = list(mmf.parse_recipes(self.lines, lazy=True))
+        actual = [(r.title, r.categories, r.yield_, r.servings, repr(r.ingredients), r.directions)
+                  for r in recipes]
+        self.assertEqual(actual, expected)
+        self.assertTrue(all(isinstance(r, mmf.LazyRecipe) for r in recipes))
+
+    def test_body_parsed_on_first_access(self):
+        recipe = mmf.parse_recipe(self.lines[3:14], lazy=True)
+        self.assertEqual(recipe.title, 'First')
+        self.assertIsNotNone(recipe._body)
+        self.assertEqual(recipe.directions, ['Boil.'])
+        self.assertIsNone(recipe._body)
+        self.assertEqual([repr(i) for i in recipe.ingredients], ['{1} {c} {Water}'])
+
+    def test_when_set_before_access(self):
+        recipe = mmf.parse_recipe(self.lines[3:14], lazy=True)
+        recipe.directions = ['Simmer.']
+        self.assertEqual(recipe.directions, ['Simmer.'])
+        self.assertEqual([repr(i) for i in recipe.ingredients], ['{1} {c} {Water}'])
+
+    def test_when_only_header(self):
+        recipe = mmf.parse_recipe(['MMMMM----- Recipe via Meal-Master (tm) v8.05',
+                                   '      Title: Empty'], lazy=True)
+        self.assertEqual(recipe.title, 'Empty')
+        self.assertEqual(recipe.ingredients, [])
+        self.assertEqual(recipe.directions, [])
+
+
+class TestBuildIndex(unittest.TestCase):
+
+    def setUp(self):
+        lines = [
+            'Some text before the first recipe',
+            '---------- Recipe via Meal-Master (tm) v8.05',
+            '      Title: First',
+            '-----',
+            'Text between recipes',
+            'MMMMM----- Recipe via Meal-Master (tm) v8.05',
+            '      Title: Second',
+            ' Categories: Soup',
+            '      1 c  Water',
+            'MMMMM   ',
+            '---------- Recipe via Meal-Master (tm) v8.05',
+            '      Title: Missing footer',
+            ]
+        fd, self.filename = tempfile.mkstemp(suffix='.mmf')
+        with os.fdopen(fd, 'w', newline='\r\n') as f:
+            f.write('\n'.join(lines) + '\n')
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    def test_when_multiple_recipes(self):
+        index = mmf.build_index(self.filename)
+        self.assertEqual(len(index), 2)
+        with open(self.filename, 'rb') as f:
+            data = f.read()
+        start, end = index.span(1)
+        self.assertTrue(data[start:end].startswith(b'MMMMM----- '))
+        self.assertTrue(data[start:end].endswith(b'MMMMM   \r\n'))
+
+    def test_when_same_as_split_recipe_lines(self):
+        index = mmf.build_index(self.filename)
+        with open(self.filename) as f:
+            expected = list(mmf.split_recipe_lines(f))
+        actual = [index.read_lines(n) for n in range(len(index))]
+        self.assertEqual(actual, expected)
+
+    def test_parse_recipe_at(self):
+        index = mmf.build_index(self.filename)
+        actual = mmf.parse_recipe_at(index, 1)
+        self.assertEqual(actual.title, 'Second')
+        self.assertEqual(actual.categories, ['Soup'])
+        self.assertEqual([repr(i) for i in actual.ingredients], ['{1} {c} {Water}'])
+
+
+class TestParseRecipesParallel(unittest.TestCase):
+
+    def setUp(self):
+        recipe = [
+            'MMMMM----- Recipe via Meal-Master (tm) v8.05',
+            '      Title: Recipe %d',
+            ' Categories: Test',
+            '      1 c  Water                               2 tb Salt',
+            '',
+            '  Boil.',
+            'MMMMM',
+            'Text between recipes',
+            ]
+        fd, self.filename = tempfile.mkstemp(suffix='.mmf')
+        with os.fdopen(fd, 'w') as f:
+            for n in range(40):
+                f.write('\n'.join(recipe) % n + '\n')
+            f.write('---------- Recipe via Meal-Master (tm) v8.05\n')
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    def get_expected(self):
+        with open(self.filename) as f:
+            return [(r.title, repr(r.ingredients), r.directions) for r in mmf.parse_recipes(f)]
+
+    def test_when_ordered(self):
+        recipes = mmf.parse_recipes_parallel(self.filename, workers=2, chunk_size=300)
+        actual = [(r.title, repr(r.ingredients), r.directions) for r in recipes]
+        self.assertEqual(actual, self.get_expected())
+
+    def test_when_unordered(self):
+        recipes = mmf.parse_recipes_parallel(self.filename, workers=2, ordered=False, chunk_size=300)
+        actual = [(r.title, repr(r.ingredients), r.directions) for r in recipes]
+        self.assertEqual(sorted(actual), sorted(self.get_expected()))
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,112 @@
+import os
+import tempfile
+import unittest
+
+from recipeformats import mx2
+
+
+MX2 = '''<?xml version="1.0" standalone="yes" encoding="ISO-8859-1"?>
+<!DOCTYPE mx2 SYSTEM "mx2.dtd">
+<mx2 source="MasterCook" date="September 19, 2014">
+  <Summ>
+    <Nam>Test Recipe</Nam>
+  </Summ>
+  <RcpE name="Test Recipe" author="Sam">
+    <Serv qty="2"/>
+    <PrpT elapsed="1:25"/>
+    <CatS>
+      <CatT>Burgers</CatT>
+      <CatT>Fish</CatT>
+    </CatS>
+    <IngR name="milk" unit="cup" qty="1">
+      <IPrp>please</IPrp>
+    </IngR>
+    <IngR name="eggs" qty="2"></IngR>
+    <DirS>
+      <DirT>Direction 1.</DirT>
+      <DirT>Direction 2.</DirT>
+    </DirS>
+    <RatS>
+      <RatE name="Taste" value="7"/>
+    </RatS>
+    <Yield unit="cake" qty="1"/>
+  </RcpE>
+  <RcpE name="Second Recipe">
+    <Srce>Internet</Srce>
+    <IngR name="flour" unit="cups" qty="2"></IngR>
+  </RcpE>
+</mx2>
+'''
+
+
+def summarize(recipe):
+    return (recipe.name, recipe.author, recipe.source, recipe.servings,
+            recipe.preparation_time, recipe.yield_, recipe.categories,
+            repr(recipe.ratings), repr(recipe.ingredients), recipe.directions)
+
+
+class TestFixDeclaration(unittest.TestCase):
+
+    def test_text_and_binary_lines(self):
+        bad = '<?xml version="1.0" standalone="yes" encoding="UTF-8"?>\r\n'
+        good = '<?xml version="1.0" encoding="UTF-8" standalone="yes"?>\r\n'
+        self.assertEqual(list(mx2._get_mx2_iterator([bad, bad])), [good, bad])
+        self.assertEqual(list(mx2._get_mx2_iterator([bad.encode('ascii')])),
+                         [good.encode('ascii')])
+
+    def test_when_well_formed(self):
+        line = '<?xml version="1.0" encoding="UTF-8"?>\n'
+        self.assertEqual(list(mx2._get_mx2_iterator([line])), [line])
+
+
+class TestIterRecipes(unittest.TestCase):
+
+    def setUp(self):
+        fd, self.filename = tempfile.mkstemp(suffix='.mx2')
+        with os.fdopen(fd, 'w', encoding='iso-8859-1') as f:
+            f.write(MX2)
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    def test_info(self):
+        info, recipes = mx2.iter_recipes(self.filename)
+        recipes.close()
+        self.assertEqual(info.source, 'MasterCook')
+        self.assertEqual(info.date, 'September 19, 2014')
+
+    def test_same_as_parse_file(self):
+        expected_info, expected_recipes = mx2.parse_file(self.filename)
+        info, recipes = mx2.iter_recipes(self.filename)
+        actual = [summarize(r) for r in recipes]
+        self.assertEqual(actual, [summarize(r) for r in expected_recipes])
+        self.assertEqual(len(actual), 2)
+
+    def test_closes_file_when_not_started(self):
+        info, recipes = mx2.iter_recipes(self.filename)
+        file = recipes._file
+        recipes.close()
+        self.assertTrue(file.closed)
+
+    def test_closes_file_when_exhausted(self):
+        info, recipes = mx2.iter_recipes(self.filename)
+        file = recipes._file
+        list(recipes)
+        self.assertTrue(file.closed)
+
+    def test_leaves_file_object_open(self):
+        with open(self.filename, 'rb') as f:
+            info, recipes = mx2.iter_recipes(f)
+            self.assertEqual(len(list(recipes)), 2)
+            self.assertFalse(f.closed)
+
+    def test_when_small_chunks(self):
+        with open(self.filename, 'rb') as f:
+            events = mx2._iter_events(f, chunk_size=7)
+            event, root = next(events)
+            actual = [r.name for r in mx2._iter_recipes(events, root)]
+        self.assertEqual(actual, ['Test Recipe', 'Second Recipe'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,3 +1,6 @@
+import mmap
+import os
+import tempfile
 import unittest
 
 from recipeformats import mxp
@@ -780,5 +783,165 @@ class TestTestIngredient(unittest.TestCase):
         self.assertEqual(repr(actual), expected)
 
 
+class TestSplitRecipeBuffer(unittest.TestCase):
+
+    text = '\r\n'.join([
+        'Text before the first recipe',
+        '* Exported from nowhere',
+        '                     * Exported from MasterCook *',
+        '',
+        '                               First',
+        '',
+        'Note mentioning * exported from nowhere *  at the end',
+        '  *  EXPORTED FROM MasterCook II  *  ',
+        '',
+        '                               Second',
+        ]) + '\r\n'
+
+    def get_expected(self):
+        return list(mxp.split_recipe_lines(self.text.splitlines(True)))
+
+    def test_when_string(self):
+        actual = list(mxp.split_recipe_buffer(self.text))
+        self.assertEqual(len(actual), 2)
+        self.assertEqual(actual, self.get_expected())
+
+    def test_when_bytes(self):
+        actual = list(mxp.split_recipe_buffer(self.text.encode('cp1252'), 'cp1252'))
+        self.assertEqual(actual, self.get_expected())
+
+    def test_when_mmap(self):
+        with tempfile.TemporaryFile() as f:
+            f.write(self.text.encode('cp1252'))
+            f.flush()
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buffer:
+                actual = list(mxp.split_recipe_buffer(buffer, 'cp1252'))
+        self.assertEqual(actual, self.get_expected())
+
+    def test_when_no_recipes(self):
+        actual = list(mxp.split_recipe_buffer('Just text\n'))
+        expected = []
+        self.assertEqual(actual, expected)
+
+
+class TestScanHeaders(unittest.TestCase):
+
+    lines = [
+        'Text before the first recipe',
+        '                     * Exported from MasterCook *',
+        '',
+        '                               First',
+        '',
+        'Recipe By     :Sam',
+        'Serving Size  : 2     Preparation Time :1:25',
+        'Categories    : Burgers                         Fish',
+        '                Main Dish',
+        '',
+        '  Amount  Measure       Ingredient -- Preparation Method',
+        '--------  ------------  --------------------------------',
+        '  1                cup  milk -- please',
+        '',
+        'Direction 1.',
+        '                     * Exported from MasterCook *',
+        '',
+        '                               Second',
+        ]
+
+    def test_when_same_as_parse_recipes(self):
+        actual = [(h.title, h.recipe_by, h.serving_size, h.preparation_time, h.categories)
+                  for h in mxp.scan_headers(self.lines)]
+        expected = [(r.title, r.recipe_by, r.serving_size, r.preparation_time, r.categories)
+                    for r in mxp.parse_recipes(self.lines)]
+        self.assertEqual(actual, expected)
+        self.assertEqual(actual[0], ('First', 'Sam', '2', '1:25', ['Burgers', 'Fish', 'Main Dish']))
+
+    def test_offset_and_length(self):
+        headers = list(mxp.scan_headers(self.lines))
+        actual = [(h.offset, h.length) for h in headers]
+        expected = [(1, 14), (15, 3)]
+        self.assertEqual(actual, expected)
+        header = headers[0]
+        recipe = next(mxp.parse_recipes(self.lines[header.offset:header.offset + header.length]))
+        self.assertEqual(recipe.directions, ['Direction 1.'])
+
+    def test_when_no_recipes(self):
+        actual = list(mxp.scan_headers(['Just text']))
+        expected = []
+        self.assertEqual(actual, expected)
+
+
+class TestLazyRecipe(unittest.TestCase):
+
+    lines = TestScanHeaders.lines + [
+        '                                    - - - - - - - - - - - - - - - - - - - ',
+        '',
+        'A note.',
+        ]
+
+    def get_values(self, recipes):
+        return [(r.title, r.recipe_by, r.categories, repr(r.ingredients), r.directions, r.notes)
+                for r in recipes]
+
+    def test_when_same_as_parse_recipes(self):
+        expected = self.get_values(mxp.parse_recipes(self.lines))
+        recipes = list(mxp.parse_recipes(self.lines, lazy=True))
+        actual = self.get_values(recipes)
+        self.assertEqual(actual, expected)
+        self.assertTrue(all(isinstance(r, mxp.LazyRecipe) for r in recipes))
+
+    def test_body_parsed_on_first_access(self):
+        recipe = mxp.parse_recipe(self.lines[1:15], lazy=True)
+        self.assertEqual(recipe.categories, ['Burgers', 'Fish', 'Main Dish'])
+        self.assertIsNotNone(recipe._body)
+        self.assertEqual(recipe.notes, [])
+        self.assertIsNone(recipe._body)
+        self.assertEqual(recipe.directions, ['Direction 1.'])
+
+
+class TestParseRecipesParallel(unittest.TestCase):
+
+    def setUp(self):
+        recipe = [
+            '                     * Exported from MasterCook *',
+            '',
+            '                               Recipe %d',
+            '',
+            'Recipe By     :Sam',
+            'Serving Size  : 2     Preparation Time :1:25',
+            'Categories    : Burgers                         Fish',
+            '',
+            '  Amount  Measure       Ingredient -- Preparation Method',
+            '--------  ------------  --------------------------------',
+            '  1                cup  milk -- please',
+            '',
+            'Direction 1.',
+            '                                    - - - - - - - - - - - - - - - - - - - ',
+            '',
+            'Note mentioning * exported from nowhere',
+            ]
+        fd, self.filename = tempfile.mkstemp(suffix='.mxp')
+        with os.fdopen(fd, 'w') as f:
+            f.write('Text before the first recipe\n')
+            for n in range(40):
+                f.write('\n'.join(recipe) % n + '\n')
+
+    def tearDown(self):
+        os.remove(self.filename)
+
+    def get_expected(self):
+        with open(self.filename) as f:
+            return [(r.title, repr(r.ingredients), r.directions, r.notes) for r in mxp.parse_recipes(f)]
+
+    def test_when_ordered(self):
+        recipes = mxp.parse_recipes_parallel(self.filename, workers=2, chunk_size=500)
+        actual = [(r.title, repr(r.ingredients), r.directions, r.notes) for r in recipes]
+        self.assertEqual(actual, self.get_expected())
+
+    def test_when_unordered(self):
+        recipes = mxp.parse_recipes_parallel(self.filename, workers=2, ordered=False, chunk_size=500)
+        actual = [(r.title, repr(r.ingredients), r.directions, r.notes) for r in recipes]
+        self.assertEqual(sorted(actual), sorted(self.get_expected()))
+
+
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
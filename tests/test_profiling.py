@@ -0,0 +1,72 @@
+import unittest
+
+from recipeformats import mmf, mxp, profiling
+
+
+MMF_LINES = [
+    '---------- Recipe via Meal-Master (tm) v8.05',
+    ' ',
+    '      Title: Potato Casserole',
+    ' Categories: Casserole, Potato',
+    '      Yield: 8 Servings',
+    ' ',
+    '      2 lb Frozen hash brown potatoes',
+    '      1 c  Onions; diced',
+    '',
+    '  Thaw potatoes about 30 min., then mix all ingredients in a large bowl.',
+    '  Place in a 9 X 13 baking dish. Bake at 350 for one hour. Serves 8',
+    '-----',
+    ]
+
+MXP_LINES = [
+    '* Exported from MasterCook *',
+    '',
+    '                               Test Recipe',
+    '',
+    'Recipe By     :Sam',
+    'Serving Size  : 2     Preparation Time :1:25',
+    'Categories    : Burgers                         Fish',
+    '',
+    '  Amount  Measure       Ingredient -- Preparation Method',
+    '--------  ------------  --------------------------------',
+    '  1                cup  milk -- please',
+    '',
+    'Direction 1.',
+    '                                    - - - - - - - - - - - - - - - - - - - ',
+    'A note.',
+    ]
+
+
+class TestParseStats(unittest.TestCase):
+
+    def test_mmf(self):
+        stats = profiling.ParseStats()
+        actual = mmf.parse_recipe(MMF_LINES, stats=stats)
+        expected = mmf.parse_recipe(MMF_LINES)
+        self.assertEqual(repr(actual.ingredients), repr(expected.ingredients))
+        self.assertEqual(actual.directions, expected.directions)
+        self.assertEqual(actual.servings, 8)
+        self.assertEqual(list(stats.stages), ['mmf_header', 'title', 'categories',
+                                              'yield', 'ingredients', 'directions'])
+        self.assertEqual(stats.recipes, 1)
+        self.assertEqual(stats.stages['ingredients'].lines, 4)
+        self.assertEqual(sum(s.lines for s in stats.stages.values()), len(MMF_LINES))
+        self.assertTrue(all(s.calls == 1 for s in stats.stages.values()))
+
+    def test_mxp(self):
+        stats = profiling.ParseStats()
+        recipes = list(mxp.parse_recipes(MXP_LINES * 3, stats=stats))
+        self.assertEqual([r.notes for r in recipes], [['A note.']] * 3)
+        self.assertEqual(stats.recipes, 3)
+        self.assertEqual(stats.stages['notes'].calls, 3)
+        self.assertEqual(stats.stages['ingredients'].lines, 3 * 4)
+        self.assertEqual(stats.to_dict()['stages']['title']['calls'], 3)
+
+    def test_when_stops_early(self):
+        stats = profiling.ParseStats()
+        mmf.parse_recipe(MMF_LINES[:3], stats=stats)
+        self.assertEqual(list(stats.stages), ['mmf_header', 'title'])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import io
+import json
+import unittest
+
+from recipeformats import fdx, mmf, records
+from recipeformats.tests.test_fdx import FDX
+
+
+MMF = '\n'.join([
+    '---------- Recipe via Meal-Master (tm) v8.05',
+    '      Title: Soup',
+    '      1 c  Water',
+    '',
+    '  Boil.',
+    '-----',
+    ])
+
+
+class TestRecords(unittest.TestCase):
+
+    def test_lazy_recipe_same_as_recipe(self):
+        lines = MMF.split('\n')
+        expected = records.to_dict(mmf.parse_recipe(lines))
+        actual = records.to_dict(mmf.parse_recipe(lines, lazy=True))
+        self.assertEqual(actual, expected)
+        self.assertEqual(actual['ingredients'],
+                         [{'quantity': '1', 'unit': 'c', 'text': 'Water', 'is_heading': False}])
+
+    def test_round_trip(self):
+        recipe = fdx.parse_file(io.BytesIO(FDX.encode('utf-8')))[0]
+        data = json.loads(json.dumps(records.to_dict(recipe)))
+        actual = records.from_dict(fdx.Recipe, data)
+        self.assertIsInstance(actual.procedures[0], fdx.RecipeProcedure)
+        self.assertIsInstance(actual.procedures[0].procedure_image, fdx.RecipeImage)
+        self.assertEqual(records.to_dict(actual), data)
+
+    def test_lazy_image_read(self):
+        with io.BytesIO(FDX.encode('utf-8')) as f:
+            recipe = next(fdx.iter_recipes(f, images='lazy'))
+            actual = records.to_dict(recipe)['images']
+        self.assertEqual(actual, [{'value': 'iVBORw0KGgo=', 'file_type': 'PNG',
+                                   'description': 'Plated', 'size': 8}])
+
+    def test_recipe_class(self):
+        self.assertIs(records.recipe_class('mmf'), mmf.Recipe)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,97 @@
+import io
+import os
+import shutil
+import stat
+import tempfile
+import threading
+import unittest
+from unittest import mock
+
+from recipeformats import mmf, mx2, records, serve
+from recipeformats.tests.test_mx2 import MX2
+
+
+MMF = '\n'.join([
+    '---------- Recipe via Meal-Master (tm) v8.05',
+    '      Title: %s',
+    ' Categories: Soups',
+    '      1 c  Water',
+    '',
+    '  Boil.',
+    '-----',
+    '',
+    ])
+
+
+class TestServe(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.socket = os.path.join(self.directory, 'serve.sock')
+        self.server = serve.make_server(self.socket)
+        self.thread = threading.Thread(target=self.server.serve_forever)
+        self.thread.start()
+        self.client = serve.Client(self.socket)
+
+    def tearDown(self):
+        self.server.shutdown()
+        self.thread.join()
+        self.server.server_close()
+        shutil.rmtree(self.directory)
+
+    def write(self, name, data):
+        path = os.path.join(self.directory, name)
+        with open(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def test_path(self):
+        data = ((MMF % 'One') + (MMF % 'Crème')).encode('cp437')
+        path = self.write('a.mmf', data)
+        actual = list(self.client.parse_recipes(path))
+        expected = list(mmf.parse_buffer(data))
+        self.assertIsInstance(actual[0], mmf.Recipe)
+        self.assertEqual([records.to_dict(r) for r in actual],
+                         [records.to_dict(r) for r in expected])
+
+    def test_bytes(self):
+        actual = list(self.client.parse_recipes(MX2.encode('iso-8859-1')))
+        self.assertIsInstance(actual[0], mx2.Recipe)
+        self.assertIsInstance(actual[0].ratings[0], mx2.Rating)
+        self.assertEqual([r.name for r in actual], ['Test Recipe', 'Second Recipe'])
+
+    def test_file_object_in_chunks(self):
+        data = ''.join(MMF % n for n in range(5000)).encode('ascii')
+        self.assertGreater(len(data), 2 * serve._CHUNK_SIZE)
+        actual = list(self.client.parse_recipes(io.BytesIO(data)))
+        self.assertEqual([r.title for r in actual], [str(n) for n in range(5000)])
+
+    def test_when_client_stops_reading(self):
+        data = ''.join(MMF % n for n in range(5000)).encode('ascii')
+        with mock.patch.object(self.server, 'handle_error') as handle_error:
+            recipes = self.client.parse_recipes(data)
+            self.assertEqual(next(recipes).title, '0')
+            recipes.close()
+            # The server handles one connection at a time, so the first one
+            # is done once this one is answered.
+            self.assertEqual(len(list(self.client.parse_recipes(data))), 5000)
+        handle_error.assert_not_called()
+
+    def test_socket_mode(self):
+        self.assertEqual(stat.S_IMODE(os.stat(self.socket).st_mode), 0o600)
+
+    def test_lines(self):
+        lines = (MMF % 'Crème').splitlines()
+        actual = list(self.client.parse_recipes(lines, format='mmf'))
+        self.assertEqual([r.title for r in actual], ['Crème'])
+        self.assertEqual(repr(actual[0].ingredients), '[{1} {c} {Water}]')
+
+    def test_when_error(self):
+        with self.assertRaises(serve.ServerError):
+            list(self.client.parse_recipes(b'Hello'))
+        with self.assertRaises(serve.ServerError):
+            list(self.client.parse_recipes(os.path.join(self.directory, 'missing')))
+
+
+if __name__ == '__main__':
+    unittest.main()
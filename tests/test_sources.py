@@ -0,0 +1,169 @@
+import bz2
+import gzip
+import io
+import lzma
+import os
+import shutil
+import tempfile
+import unittest
+import zipfile
+
+from recipeformats import fdx, mmf, mx2, sources
+from recipeformats.tests.test_fdx import FDX
+from recipeformats.tests.test_mx2 import MX2
+
+
+MMF = '\n'.join([
+    '---------- Recipe via Meal-Master (tm) v8.05',
+    '      Title: %s',
+    '      1 c  Water',
+    '-----',
+    '',
+    ])
+
+
+class TestOpenSource(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.data = (MMF % 'First').encode('ascii')
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def write(self, name, opener, data):
+        path = os.path.join(self.directory, name)
+        with opener(path, 'wb') as f:
+            f.write(data)
+        return path
+
+    def write_zip(self, name, members):
+        path = os.path.join(self.directory, name)
+        with zipfile.ZipFile(path, 'w', zipfile.ZIP_DEFLATED) as bundle:
+            for member, data in members:
+                bundle.writestr(member, data)
+        return path
+
+    def test_when_compressed(self):
+        for name, opener, expected in [
+                ('a.mmf', open, None),
+                ('a.mmf.gz', gzip.open, 'gzip'),
+                ('a.mmf.bz2', bz2.open, 'bz2'),
+                ('a.mmf.xz', lzma.open, 'xz'),
+                ]:
+            path = self.write(name, opener, self.data)
+            self.assertEqual(sources.detect_compression(path), expected)
+            with sources.open_source(path) as f:
+                self.assertEqual(f.read(), self.data)
+
+    def test_when_extension_does_not_match(self):
+        path = self.write('a.mmf', gzip.open, self.data)
+        with sources.open_source(path) as f:
+            self.assertEqual(f.read(), self.data)
+
+    def test_when_text_mode(self):
+        path = self.write('a.mmf.gz', gzip.open, self.data.replace(b'\n', b'\r\n'))
+        with sources.open_source(path, 'rt', encoding='cp437') as f:
+            actual = [r.title for r in mmf.parse_recipes(f)]
+        self.assertEqual(actual, ['First'])
+
+    def test_when_zip_with_one_member(self):
+        path = self.write_zip('a.zip', [('a.mmf', self.data)])
+        self.assertEqual(sources.detect_compression(path), 'zip')
+        with sources.open_source(path) as f:
+            self.assertEqual(f.read(), self.data)
+
+    def test_when_zip_with_many_members(self):
+        second = (MMF % 'Second').encode('ascii')
+        path = self.write_zip('a.zip', [('a.mmf', self.data), ('b.mmf', second)])
+        with self.assertRaises(ValueError):
+            sources.open_source(path)
+        with sources.open_source(path, member='b.mmf') as f:
+            self.assertEqual(f.read(), second)
+
+    def test_when_file_object(self):
+        plain = io.BytesIO(self.data)
+        self.assertIsNone(sources.detect_compression(plain))
+        self.assertIs(sources.open_source(plain), plain)
+        compressed = io.BytesIO(gzip.compress(self.data))
+        self.assertEqual(sources.detect_compression(compressed), 'gzip')
+        self.assertEqual(compressed.tell(), 0)
+        with sources.open_source(compressed) as f:
+            self.assertEqual(f.read(), self.data)
+        self.assertFalse(compressed.closed)
+        with self.assertRaises(ValueError):
+            sources.open_source(compressed, 'rt')
+
+    def test_when_invalid_mode(self):
+        path = self.write('a.mmf', open, self.data)
+        with self.assertRaises(ValueError):
+            sources.open_source(path, 'w')
+
+
+class TestIterSources(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_when_zip(self):
+        path = os.path.join(self.directory, 'a.zip')
+        with zipfile.ZipFile(path, 'w') as bundle:
+            bundle.writestr('a.mmf', MMF % 'First')
+            bundle.writestr('sub/', '')
+            bundle.writestr('sub/b.mmf', MMF % 'Second')
+        actual = [(name, [r.title for r in mmf.parse_recipes(f)])
+                  for name, f in sources.iter_sources(path, 'rt', 'ascii')]
+        self.assertEqual(actual, [('a.mmf', ['First']), ('sub/b.mmf', ['Second'])])
+
+    def test_when_not_zip(self):
+        path = os.path.join(self.directory, 'a.mmf.gz')
+        with gzip.open(path, 'wt') as f:
+            f.write(MMF % 'First')
+        actual = [(name, f.read()) for name, f in sources.iter_sources(path, 'rt')]
+        self.assertEqual(actual, [(path, MMF % 'First')])
+
+
+class TestParsers(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_mx2(self):
+        path = os.path.join(self.directory, 'a.mx2.xz')
+        with lzma.open(path, 'wb') as f:
+            f.write(MX2.encode('iso-8859-1'))
+        info, recipes = mx2.parse_file(path)
+        self.assertEqual([r.name for r in recipes], ['Test Recipe', 'Second Recipe'])
+        info, recipes = mx2.iter_recipes(path)
+        self.assertEqual([r.name for r in recipes], ['Test Recipe', 'Second Recipe'])
+        self.assertEqual(info.source, 'MasterCook')
+
+    def test_mx2_binary_file_object(self):
+        path = os.path.join(self.directory, 'a.zip')
+        with zipfile.ZipFile(path, 'w') as bundle:
+            bundle.writestr('a.mx2', MX2.encode('iso-8859-1'))
+        with sources.open_source(path) as f:
+            info, recipes = mx2.parse_file(f)
+        self.assertEqual(info.date, 'September 19, 2014')
+        self.assertEqual(len(recipes), 2)
+
+    def test_fdx(self):
+        path = os.path.join(self.directory, 'a.fdx.bz2')
+        with bz2.open(path, 'wb') as f:
+            f.write(FDX.encode('utf-8'))
+        self.assertEqual([r.name for r in fdx.parse_file(path)],
+                         ['Test Recipe', 'Second Recipe'])
+        with self.assertRaises(ValueError):
+            fdx.parse_file(path, images='lazy')
+        actual = [i.kind for i in fdx.extract_images(path, self.directory)]
+        self.assertEqual(actual, ['recipe', 'procedure', 'image'])
+
+
+if __name__ == '__main__':
+    unittest.main()